@@ -12,6 +12,8 @@
 use Illuminate\Validation\Rules;
 use Illuminate\View\View;
 use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\Http;
+use Illuminate\Support\Facades\Log;
 
 class AuthController extends Controller
 {
@@ -108,6 +110,9 @@ public function login(Request $request): RedirectResponse
             // Check approval status using optimized methods
             if ($this->fastAuthService->canUserLogin($user)) {
                 $request->session()->regenerate();
+                if ($user->isStudent()) {
+                    $this->warmRagStudentContext($user->id);
+                }
                 return $this->redirectToDashboard();
             } elseif ($this->fastAuthService->isUserPending($user)) {
                 Auth::logout();
@@ -176,4 +181,20 @@ private function redirectToDashboard(): RedirectResponse
         
         return redirect()->route($route);
     }
+
+    /**
+     * Warm the RAG service's student context cache after the login response is sent
+     * so the student's first chat message does not wait on the database
+     */
+    private function warmRagStudentContext(int $studentId): void
+    {
+        dispatch(function () use ($studentId) {
+            try {
+                $ragServiceUrl = config('rag.service_url', 'http://localhost:8001');
+                Http::timeout(5)->post("{$ragServiceUrl}/init-student-context?student_id={$studentId}");
+            } catch (\Exception $e) {
+                Log::warning('RAG student context warm-up failed: ' . $e->getMessage());
+            }
+        })->afterResponse();
+    }
 }
\ No newline at end of file
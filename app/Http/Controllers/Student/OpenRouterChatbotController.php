@@ -12,6 +12,7 @@
 use Illuminate\Support\Facades\Http;
 use Illuminate\Support\Facades\Log;
 use Illuminate\Support\Facades\Cache;
+use Symfony\Component\HttpFoundation\StreamedResponse;
 
 class OpenRouterChatbotController extends Controller
 {
@@ -97,31 +98,8 @@ public function chat(Request $request): JsonResponse
                     'message_preview' => substr($data['message'] ?? '', 0, 100)
                 ]);
                 
-                // Update conversation history with new messages
-                $conversationHistory[] = ['role' => 'user', 'content' => $query];
-                $conversationHistory[] = ['role' => 'assistant', 'content' => $data['message']];
-                
-                // Keep only last 10 messages (5 conversation turns)
-                $conversationHistory = array_slice($conversationHistory, -10);
-                
-                // Save conversation to database
-                \DB::table('chatbot_conversations')->updateOrInsert(
-                    [
-                        'student_id' => $studentId,
-                        'session_id' => $sessionId
-                    ],
-                    [
-                        'messages' => json_encode($conversationHistory),
-                        'last_message_at' => now(),
-                        'last_activity' => now(),
-                        'updated_at' => now(),
-                        'created_at' => $conversation ? $conversation->created_at : now()
-                    ]
-                );
-                
-                Log::info('Conversation history saved', [
-                    'total_messages' => count($conversationHistory)
-                ]);
+                // Update and save conversation history with new messages
+                $this->saveConversationHistory($studentId, $sessionId, $conversation, $conversationHistory, $query, $data['message']);
                 
                 // Log analytics
                 $responseTime = (microtime(true) - $startTime) * 1000; // milliseconds
@@ -139,33 +117,7 @@ public function chat(Request $request): JsonResponse
                 );
                 
                 // Check for special actions (like name update)
-                if (isset($data['special_action']) && $data['special_action']['type'] === 'update_name') {
-                    $newName = $data['special_action']['new_name'];
-                    
-                    Log::info('NAME UPDATE DETECTED', [
-                        'new_name' => $newName,
-                        'student_id' => $studentId
-                    ]);
-                    
-                    // Update student name in database
-                    $currentStudent = Auth::user();
-                    $oldName = $currentStudent->name;
-                    $currentStudent->name = $newName;
-                    $currentStudent->save();
-                    
-                    // Verify the update
-                    $currentStudent->refresh();
-                    
-                    Log::info('✏️ NAME UPDATED via RAG', [
-                        'student_id' => $studentId,
-                        'old_name' => $oldName,
-                        'new_name' => $newName,
-                        'verified_name' => $currentStudent->name
-                    ]);
-                    
-                    // Update message to confirm database save
-                    $data['message'] = "Perfect! I've updated your name to {$newName} ✓ Your profile has been updated in the database!";
-                }
+                $data = $this->applySpecialAction($data, $studentId);
                 
                 // Add mode metadata for MODE 1 if not present
                 if (!isset($data['mode'])) {
@@ -232,6 +184,201 @@ public function chat(Request $request): JsonResponse
         }
     }
     
+    /**
+     * Stream chatbot answers token by token from the RAG service (Server-Sent Events)
+     * Proxies /chat/stream so students see the first words within a few hundred milliseconds
+     */
+    public function chatStream(Request $request): StreamedResponse|JsonResponse
+    {
+        $request->validate([
+            'message' => 'required|string|max:500'
+        ]);
+        
+        $startTime = microtime(true);
+        $query = $request->input('message');
+        $studentId = Auth::id();
+        $sessionId = session()->getId();
+        $student = Auth::user();
+        
+        Log::info('OpenRouter Chatbot streaming query', [
+            'student_id' => $studentId,
+            'query' => $query,
+            'session_id' => $sessionId
+        ]);
+        
+        $conversation = \DB::table('chatbot_conversations')
+            ->where('student_id', $studentId)
+            ->where('session_id', $sessionId)
+            ->first();
+        
+        $conversationHistory = [];
+        if ($conversation && $conversation->messages) {
+            $conversationHistory = json_decode($conversation->messages, true) ?? [];
+        }
+        
+        try {
+            $response = Http::withOptions(['stream' => true])
+                ->withHeaders(['Accept' => 'text/event-stream'])
+                ->connectTimeout(5)
+                ->timeout(config('rag.stream_timeout', 60))
+                ->post($this->ragServiceUrl . '/chat/stream', [
+                    'student_id' => $studentId,
+                    'message' => $query,
+                    'student_name' => $student->name,
+                    'student_email' => $student->email,
+                    'conversation_history' => $conversationHistory
+                ]);
+            
+            if (!$response->successful()) {
+                Log::warning('OpenRouter RAG stream returned error', ['status' => $response->status()]);
+                return $this->fallbackResponse($query, $studentId);
+            }
+        } catch (\Illuminate\Http\Client\ConnectionException $e) {
+            Log::error('Cannot connect to OpenRouter RAG stream: ' . $e->getMessage());
+            return $this->fallbackResponse($query, $studentId);
+        }
+        
+        $body = $response->toPsrResponse()->getBody();
+        
+        return response()->stream(function () use ($body, $startTime, $studentId, $sessionId, $conversation, $conversationHistory, $query) {
+            $buffer = '';
+            $metadata = null;
+            
+            while (!$body->eof()) {
+                $chunk = $body->read(1024);
+                if ($chunk === '') {
+                    continue;
+                }
+                
+                // Forward each complete event to the browser as soon as it arrives
+                $buffer .= $chunk;
+                while (($pos = strpos($buffer, "\n\n")) !== false) {
+                    $event = substr($buffer, 0, $pos);
+                    $buffer = substr($buffer, $pos + 2);
+                    if (str_starts_with($event, 'event: metadata')) {
+                        $json = substr($event, strpos($event, 'data: ') + 6);
+                        $metadata = json_decode($json, true);
+                        if ($metadata) {
+                            // Run special actions (like a name update) before the final event so the
+                            // browser shows the same message that is saved in the conversation history
+                            $streamedMessage = $metadata['message'] ?? '';
+                            $metadata = $this->applySpecialAction($metadata, $studentId);
+                            if (($metadata['message'] ?? '') !== $streamedMessage) {
+                                $this->sendStreamEvent("event: message_override\ndata: " . json_encode(['message' => $metadata['message']]));
+                                $event = "event: metadata\ndata: " . json_encode($metadata);
+                            }
+                        }
+                    }
+                    $this->sendStreamEvent($event);
+                }
+            }
+            if ($buffer !== '') {
+                $this->sendStreamEvent($buffer);
+            }
+            
+            if (!$metadata) {
+                return;
+            }
+            
+            $this->saveConversationHistory($studentId, $sessionId, $conversation, $conversationHistory, $query, $metadata['message'] ?? '');
+            $this->logAnalytics(
+                $studentId,
+                $query,
+                $metadata['query_type'] ?? 'unknown',
+                $metadata['message'] ?? '',
+                $metadata['model_used'] ?? null,
+                (microtime(true) - $startTime) * 1000,
+                $metadata['tokens_used'] ?? null,
+                $metadata['from_cache'] ?? false,
+                false,
+                null
+            );
+        }, 200, [
+            'Content-Type' => 'text/event-stream',
+            'Cache-Control' => 'no-cache',
+            'X-Accel-Buffering' => 'no'
+        ]);
+    }
+    
+    /**
+     * Send one Server-Sent Event to the browser and flush it
+     */
+    private function sendStreamEvent(string $event): void
+    {
+        echo $event . "\n\n";
+        if (ob_get_level() > 0) {
+            ob_flush();
+        }
+        flush();
+    }
+    
+    /**
+     * Append the latest exchange to the conversation history and save it
+     */
+    private function saveConversationHistory(int $studentId, string $sessionId, $conversation, array $conversationHistory, string $query, string $reply): void
+    {
+        $conversationHistory[] = ['role' => 'user', 'content' => $query];
+        $conversationHistory[] = ['role' => 'assistant', 'content' => $reply];
+        
+        // Keep only last 10 messages (5 conversation turns)
+        $conversationHistory = array_slice($conversationHistory, -10);
+        
+        // Save conversation to database
+        \DB::table('chatbot_conversations')->updateOrInsert(
+            [
+                'student_id' => $studentId,
+                'session_id' => $sessionId
+            ],
+            [
+                'messages' => json_encode($conversationHistory),
+                'last_message_at' => now(),
+                'last_activity' => now(),
+                'updated_at' => now(),
+                'created_at' => $conversation ? $conversation->created_at : now()
+            ]
+        );
+        
+        Log::info('Conversation history saved', [
+            'total_messages' => count($conversationHistory)
+        ]);
+    }
+    
+    /**
+     * Apply special actions requested by the RAG service (like name update)
+     */
+    private function applySpecialAction(array $data, int $studentId): array
+    {
+        if (isset($data['special_action']) && $data['special_action']['type'] === 'update_name') {
+            $newName = $data['special_action']['new_name'];
+            
+            Log::info('NAME UPDATE DETECTED', [
+                'new_name' => $newName,
+                'student_id' => $studentId
+            ]);
+            
+            // Update student name in database
+            $currentStudent = Auth::user();
+            $oldName = $currentStudent->name;
+            $currentStudent->name = $newName;
+            $currentStudent->save();
+            
+            // Verify the update
+            $currentStudent->refresh();
+            
+            Log::info('✏️ NAME UPDATED via RAG', [
+                'student_id' => $studentId,
+                'old_name' => $oldName,
+                'new_name' => $newName,
+                'verified_name' => $currentStudent->name
+            ]);
+            
+            // Update message to confirm database save
+            $data['message'] = "Perfect! I've updated your name to {$newName} ✓ Your profile has been updated in the database!";
+        }
+        
+        return $data;
+    }
+    
     /**
      * Health check for RAG service
      */
@@ -11,6 +11,8 @@
 use Illuminate\View\View;
 use Illuminate\Support\Facades\Auth;
 use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Http;
+use Illuminate\Support\Facades\Log;
 
 class StudentAssessmentController extends Controller
 {
@@ -171,10 +173,28 @@ public function submit(Request $request, Assessment $assessment): RedirectRespon
             'submitted_at' => now(),
         ]);
 
+        $this->refreshRagStudentContext(Auth::id());
+
         return redirect()->route('student.assessments.result', $assessment)
             ->with('status', 'Assessment submitted successfully!');
     }
 
+    /**
+     * Refresh the student's cached RAG context after the response is sent
+     * so the chatbot sees the new result without slowing down the submission
+     */
+    private function refreshRagStudentContext(int $studentId): void
+    {
+        dispatch(function () use ($studentId) {
+            try {
+                $ragServiceUrl = config('rag.service_url', 'http://localhost:8001');
+                Http::timeout(5)->post("{$ragServiceUrl}/init-student-context?student_id={$studentId}&refresh=true");
+            } catch (\Exception $e) {
+                Log::warning('RAG student context refresh failed: ' . $e->getMessage());
+            }
+        })->afterResponse();
+    }
+
     public function result(Assessment $assessment): View|RedirectResponse
     {
         if (!Auth::check() || !Auth::user()->isStudent()) {
@@ -15,6 +15,9 @@
     
     'timeout' => env('RAG_SERVICE_TIMEOUT', 30),
     
+    // Streaming answers (/chat/stream) stay open for the whole completion
+    'stream_timeout' => env('RAG_SERVICE_STREAM_TIMEOUT', 60),
+    
     'enabled' => env('RAG_ENABLED', true),
     
     'auto_sync' => env('RAG_AUTO_SYNC', true),
@@ -3,15 +3,22 @@ Add comprehensive knowledge documents to ChromaDB for dynamic RAG responses
 This covers all 12+ query categories
 """
 import chromadb
-from sentence_transformers import SentenceTransformer
+from chunker_groq import Chunker
+from embedder_groq import create_embedder
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize
 chroma_client = chromadb.PersistentClient(path="./chromadb_storage")
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+embedding_model = create_embedder()  # EMBEDDING_BACKEND, same as the service's queries
+# Token-bounded chunks (with the document title on each) keep retrieved context small and within the model window
+chunker = Chunker(
+    max_tokens=int(os.getenv('CHUNK_MAX_TOKENS', 200)),
+    overlap_tokens=int(os.getenv('CHUNK_OVERLAP_TOKENS', 30))
+)
 
 # Get or create portal_info collection
 try:
@@ -477,23 +484,32 @@ DEALING WITH TEST ANXIETY AND BUILDING CONFIDENCE:
 
 # Add documents to collection
 try:
+    total_chunks = 0
     for doc in knowledge_docs:
-        # Generate embedding
-        embedding = embedding_model.encode(doc["text"]).tolist()
+        # First line ("ASSESSMENT RULES AND GUIDELINES:") is the title repeated on every chunk
+        title, _, body = doc["text"].strip().partition("\n")
+        chunks = chunker.split(body, title.strip())
         
-        # Add to collection
+        # Generate embeddings
+        embeddings = embedding_model.encode(chunks, normalize=True).tolist()
+        
+        # Add to collection (first chunk keeps the document id)
         collection.add(
-            embeddings=[embedding],
-            documents=[doc["text"]],
+            embeddings=embeddings,
+            documents=chunks,
             metadatas=[{
                 "category": doc["category"],
-                "type": "knowledge"
-            }],
-            ids=[doc["id"]]
+                "type": "knowledge",
+                "section": title.strip().rstrip(":"),
+                "chunk": index,
+                "chunks": len(chunks)
+            } for index in range(len(chunks))],
+            ids=[doc["id"] if index == 0 else f"{doc['id']}_{index}" for index in range(len(chunks))]
         )
-        logger.info(f"Added: {doc['id']}")
+        total_chunks += len(chunks)
+        logger.info(f"Added: {doc['id']} ({len(chunks)} chunks)")
     
-    logger.info(f"\n✅ Successfully added {len(knowledge_docs)} knowledge documents!")
+    logger.info(f"\n✅ Successfully added {len(knowledge_docs)} knowledge documents ({total_chunks} chunks)!")
     logger.info(f"Total documents in collection: {collection.count()}")
     
 except Exception as e:
@@ -0,0 +1,145 @@
+"""
+Knowledge Base Chunker for the Groq RAG System (same as python-rag/chunker.py)
+Heading-aware, token-bounded chunks with overlap: every chunk fits the embedding model's window and
+keeps its section title, so retrieval returns small, dense passages instead of whole sections
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from tokenizer_groq import Span, TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Break preferences inside a section, best first
+HEADING_BREAK = 4
+PARAGRAPH_BREAK = 3
+LINE_BREAK = 2
+SENTENCE_BREAK = 1
+
+SENTENCE_END = re.compile(r"[.!?:;]$")
+
+
+def section_slug(title: str) -> str:
+    """Stable ID fragment for a section title ("Aptitude Tips!" -> "aptitude-tips")"""
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "section"
+
+
+class Chunker:
+    """
+    Splits text into chunks of at most max_tokens tokens
+    - Prefers cutting before a heading, then at a blank line, a line break, a sentence end
+      (searching the last half of the window), and only then mid-sentence
+    - Consecutive chunks share about overlap_tokens tokens so a fact cut at a boundary
+      is still whole in one of them
+    - The section title is prepended to every chunk (and counted against max_tokens)
+    """
+
+    def __init__(self, max_tokens: int = 200, overlap_tokens: int = 30, counter: Optional[TokenCounter] = None):
+        if overlap_tokens >= max_tokens // 2:
+            raise ValueError("overlap_tokens must be less than half of max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.counter = counter or get_token_counter()
+
+    def _break_strength(self, text: str, spans: List[Span], i: int) -> int:
+        """How good a place the gap before token i is for a cut"""
+        gap = text[spans[i - 1][1]:spans[i][0]]
+        if "\n" in gap:
+            if text.startswith("#", spans[i][0]):
+                return HEADING_BREAK
+            return PARAGRAPH_BREAK if gap.count("\n") > 1 else LINE_BREAK
+        if SENTENCE_END.search(text[spans[i - 1][0]:spans[i - 1][1]]):
+            return SENTENCE_BREAK
+        return 0
+
+    def split(self, text: str, title: Optional[str] = None) -> List[str]:
+        """
+        Chunk one section body; title (e.g. "## Aptitude Tips") heads every chunk
+        """
+        text = text.strip()
+        header = f"{title}\n" if title else ""
+        budget = self.max_tokens - self.counter.count(header)
+        if budget <= self.overlap_tokens * 2:
+            raise ValueError(f"Title '{title}' leaves no room for content in {self.max_tokens} tokens")
+
+        spans = self.counter.spans(text)
+        if len(spans) <= budget:
+            return [header + text] if text else []
+
+        chunks = []
+        start = 0
+        while start < len(spans):
+            end = min(start + budget, len(spans))
+            if end < len(spans):
+                # Cut at the strongest break in the second half of the window
+                best, best_strength = end, 0
+                for i in range(end, start + budget // 2, -1):
+                    strength = self._break_strength(text, spans, i)
+                    if strength > best_strength:
+                        best, best_strength = i, strength
+                        if strength == HEADING_BREAK:
+                            break
+                end = best
+            chunks.append(header + text[spans[start][0]:spans[end - 1][1]].strip())
+            if end == len(spans):
+                break
+            # Step back by the overlap and start the next chunk at the best break in it
+            # (earliest among equals, to keep as much overlap as possible)
+            overlap_start = max(end - self.overlap_tokens, start + 1)
+            best, best_strength = overlap_start, 0
+            for i in range(overlap_start, end):
+                strength = self._break_strength(text, spans, i)
+                if strength > best_strength:
+                    best, best_strength = i, strength
+            start = best
+            if best_strength == 0:
+                # No break at all: at least don't open on a subword or punctuation token
+                while start < end and text[spans[start - 1][1]:spans[start][0]] == "":
+                    start += 1
+        return chunks
+
+    def split_markdown(self, content: str) -> List[Tuple[str, str]]:
+        """
+        (title, body) per ## section, body without its heading line; text before the first ##
+        is ('introduction', body) with any # document title dropped
+        """
+        sections = []
+        parts = re.split(r"(?m)^## ", content)
+        intro = parts[0]
+        if intro.startswith("# "):
+            intro = intro.split("\n", 1)[1] if "\n" in intro else ""
+        if intro.strip():
+            sections.append(("introduction", intro.strip()))
+        for part in parts[1:]:
+            if part.strip():
+                title, _, body = part.partition("\n")
+                sections.append((title.strip(), body.strip()))
+        return sections
+
+    def chunk_markdown(self, file_name: str, content: str,
+                       doc_type: str = "knowledge_base") -> List[Tuple[str, Dict[str, Any], str]]:
+        """
+        (document, metadata, id) per chunk of a markdown file
+        IDs are "<file>_<section-slug>" for a section's first chunk and "<file>_<section-slug>_<n>" after it,
+        so inserting a section does not change the IDs of the others
+        """
+        documents = []
+        seen: Dict[str, int] = {}
+        for title, body in self.split_markdown(content):
+            slug = "intro" if title == "introduction" else section_slug(title)
+            seen[slug] = seen.get(slug, 0) + 1
+            if seen[slug] > 1:
+                slug = f"{slug}-{seen[slug]}"
+            chunks = self.split(body, None if title == "introduction" else f"## {title}")
+            for index, chunk in enumerate(chunks):
+                metadata = {
+                    'source': file_name,
+                    'type': doc_type,
+                    'section': title,
+                    'chunk': index,
+                    'chunks': len(chunks),
+                    'tokens': self.counter.count(chunk)
+                }
+                documents.append((chunk, metadata, f"{file_name}_{slug}" + (f"_{index}" if index else "")))
+        return documents
@@ -5,23 +5,26 @@ Processes queries with student-specific context and ChromaDB retrieval
 from typing import Dict, List, Any, Optional, Tuple
 from groq import Groq
 import chromadb
-from sentence_transformers import SentenceTransformer
 import logging
 import os
 import re
 from datetime import datetime
 
+from embedder_groq import Embedder, create_embedder
+
 logger = logging.getLogger(__name__)
 
 
 class ContextHandler:
     """Handle context-aware query processing with Groq AI"""
     
-    def __init__(self, groq_api_key: str, groq_model: str, chroma_client: chromadb.ClientAPI):
+    def __init__(self, groq_api_key: str, groq_model: str, chroma_client: chromadb.ClientAPI,
+                 embedding_model: Optional[Embedder] = None):
         self.groq_client = Groq(api_key=groq_api_key or 'your_groq_api_key_here')
         self.groq_model = groq_model
         self.chroma_client = chroma_client
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Queries must be embedded by the same backend (EMBEDDING_BACKEND) as the indexed documents
+        self.embedding_model = embedding_model or create_embedder()
         self.last_fallback_used = None  # Track which fallback was used
         
         # Load collections
@@ -140,7 +143,7 @@ class ContextHandler:
         
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
+            query_embedding = self.embedding_model.encode([query], normalize=True)[0].tolist()
             
             # Search in portal info collection
             if self.portal_collection:
@@ -5,12 +5,13 @@ Updates only changed data instead of full resync
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import chromadb
-from sentence_transformers import SentenceTransformer
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime, timedelta
 import json
 
+from embedder_groq import Embedder, create_embedder
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,11 +21,13 @@ class IncrementalSync:
     def __init__(
         self,
         db_config: Dict[str, str],
-        chroma_client: chromadb.ClientAPI
+        chroma_client: chromadb.ClientAPI,
+        embedding_model: Optional[Embedder] = None
     ):
         self.db_config = db_config
         self.chroma_client = chroma_client
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # EMBEDDING_BACKEND selects PyTorch or the quantized ONNX model
+        self.embedding_model = embedding_model or create_embedder()
         self.sync_state_file = 'sync_state.json'
         self.sync_state = self._load_sync_state()
     
@@ -130,7 +133,7 @@ class IncrementalSync:
                     """.strip()
                     
                     # Create embedding
-                    embedding = self.embedding_model.encode(doc_text).tolist()
+                    embedding = self.embedding_model.encode([doc_text], normalize=True)[0].tolist()
                     
                     # Check if exists
                     is_new = assessment_id not in self.sync_state.get('synced_assessment_ids', [])
@@ -264,7 +267,7 @@ class IncrementalSync:
                     """.strip()
                     
                     # Create embedding
-                    embedding = self.embedding_model.encode(doc_text).tolist()
+                    embedding = self.embedding_model.encode([doc_text], normalize=True)[0].tolist()
                     
                     # Check if new
                     is_new = question_id not in self.sync_state.get('synced_question_ids', [])
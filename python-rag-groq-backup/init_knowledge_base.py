@@ -6,8 +6,8 @@ import os
 import sys
 from dotenv import load_dotenv
 import chromadb
-from sentence_transformers import SentenceTransformer
 import logging
+from embedder_groq import create_embedder
 from knowledge_sync_groq import KnowledgeSync
 
 # Load environment variables
@@ -183,7 +183,7 @@ def initialize_portal_info(chroma_client, embedding_model):
         
         # Add documents to collection
         for doc in documents:
-            embedding = embedding_model.encode(doc["text"]).tolist()
+            embedding = embedding_model.encode([doc["text"]], normalize=True)[0].tolist()
             collection.add(
                 embeddings=[embedding],
                 documents=[doc["text"]],
@@ -212,8 +212,8 @@ def main():
     
     # Initialize embedding model
     logger.info("Loading embedding model...")
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.info("Embedding model loaded")
+    embedding_model = create_embedder()
+    logger.info(f"Embedding model loaded: {embedding_model.name}")
     
     # Initialize portal information
     if initialize_portal_info(chroma_client, embedding_model):
@@ -231,7 +231,8 @@ def main():
             db_name=os.getenv('DB_NAME', 'postgres'),
             db_user=os.getenv('DB_USER', 'postgres'),
             db_password=os.getenv('DB_PASSWORD'),
-            chroma_client=chroma_client
+            chroma_client=chroma_client,
+            embedding_model=embedding_model
         )
         
         # Perform full sync
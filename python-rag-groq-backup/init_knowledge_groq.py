@@ -3,11 +3,11 @@ Initialize Knowledge Base for Groq AI RAG System
 Creates ChromaDB collections and loads static portal information
 """
 import chromadb
-from sentence_transformers import SentenceTransformer
 from groq import Groq
 import os
 from dotenv import load_dotenv
 import logging
+from embedder_groq import create_embedder
 from knowledge_sync_groq import KnowledgeSync
 
 # Setup logging
@@ -289,14 +289,14 @@ def load_static_knowledge(client: chromadb.ClientAPI):
     """Load static portal knowledge into ChromaDB"""
     try:
         logger.info("Loading static knowledge...")
-        embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        embedding_model = create_embedder()
         
         collection = client.get_collection('portal_info')
         static_docs = get_static_knowledge()
         
         for doc in static_docs:
             # Create embedding
-            embedding = embedding_model.encode(doc['text']).tolist()
+            embedding = embedding_model.encode([doc['text']], normalize=True)[0].tolist()
             
             # Add to collection
             collection.add(
@@ -5,12 +5,13 @@ Dynamically syncs data from Supabase PostgreSQL to ChromaDB
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import chromadb
-from sentence_transformers import SentenceTransformer
 from typing import Dict, List, Any, Optional
 import logging
 import os
 from datetime import datetime
 
+from embedder_groq import Embedder, create_embedder
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +25,8 @@ class KnowledgeSync:
         db_name: str,
         db_user: str,
         db_password: str,
-        chroma_client: chromadb.ClientAPI
+        chroma_client: chromadb.ClientAPI,
+        embedding_model: Optional[Embedder] = None
     ):
         self.db_config = {
             'host': db_host,
@@ -34,7 +36,8 @@ class KnowledgeSync:
             'password': db_password
         }
         self.chroma_client = chroma_client
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # EMBEDDING_BACKEND selects PyTorch or the quantized ONNX model
+        self.embedding_model = embedding_model or create_embedder()
         self.last_sync = {}
     
     def connect_db(self):
@@ -142,7 +145,7 @@ class KnowledgeSync:
                     """.strip()
                     
                     # Create embedding
-                    embedding = self.embedding_model.encode(doc_text).tolist()
+                    embedding = self.embedding_model.encode([doc_text], normalize=True)[0].tolist()
                     
                     # Add to collection
                     collection.add(
@@ -235,7 +238,7 @@ class KnowledgeSync:
                     """.strip()
                     
                     # Create embedding
-                    embedding = self.embedding_model.encode(doc_text).tolist()
+                    embedding = self.embedding_model.encode([doc_text], normalize=True)[0].tolist()
                     
                     # Add to collection
                     collection.add(
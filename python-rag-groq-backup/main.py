@@ -17,6 +17,7 @@ from datetime import datetime
 from context_handler_groq import ContextHandler
 from response_formatter_groq import ResponseFormatter
 from knowledge_sync_groq import KnowledgeSync
+from embedder_groq import create_embedder
 
 # Load environment variables
 load_dotenv()
@@ -59,10 +60,14 @@ logger.info(f"ChromaDB initialized at {chromadb_path}")
 
 # Initialize services
 try:
+    # One embedding model (EMBEDDING_BACKEND) for queries and synced documents
+    embedding_model = create_embedder()
+    
     context_handler = ContextHandler(
         groq_api_key=os.getenv('GROQ_API_KEY', 'your_groq_api_key_here'),
         groq_model=os.getenv('GROQ_MODEL', 'llama-3.3-70b-versatile'),
-        chroma_client=chroma_client
+        chroma_client=chroma_client,
+        embedding_model=embedding_model
     )
     response_formatter = ResponseFormatter()
     
@@ -72,7 +77,8 @@ try:
         db_name=os.getenv('DB_NAME'),
         db_user=os.getenv('DB_USER'),
         db_password=os.getenv('DB_PASSWORD'),
-        chroma_client=chroma_client
+        chroma_client=chroma_client,
+        embedding_model=embedding_model
     )
     
     logger.info("All services initialized successfully")
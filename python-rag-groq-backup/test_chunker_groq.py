@@ -0,0 +1,46 @@
+"""
+Test script for the Groq knowledge base chunker
+Builds Chunker with its default token counter, as add_comprehensive_knowledge.py does at import
+"""
+import os
+import tempfile
+
+import tokenizer_groq
+from chunker_groq import Chunker
+
+SAMPLE_MARKDOWN = """# Placement Preparation
+
+## Aptitude Tips
+Practice quantitative aptitude daily. Time yourself on every section.
+Review the questions you got wrong and note the shortcut you missed.
+
+## Interview Tips
+Research the company before the interview. Prepare two questions for the panel.
+Explain your projects clearly: the problem, your role and the result.
+""" * 4
+
+
+def test_default_counter_chunks_markdown_file():
+    tokenizer_groq.get_token_counter.cache_clear()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "placement.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SAMPLE_MARKDOWN)
+        with open(path, encoding="utf-8") as f:
+            title, _, body = f.read().strip().partition("\n")
+
+    chunker = Chunker(max_tokens=60, overlap_tokens=10)
+    assert chunker.counter is tokenizer_groq.get_token_counter()
+    chunks = chunker.split(body, title)
+    assert len(chunks) > 1
+    assert all(chunk.startswith("# Placement Preparation\n") for chunk in chunks)
+    assert all(chunker.counter.count(chunk) <= 60 for chunk in chunks)
+    assert "Prepare two questions for the panel." in "".join(chunks)
+    print(f"✓ PASS | Default token counter ({chunker.counter.name}) chunked the file into {len(chunks)} chunks")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("GROQ CHUNKER - TEST SUITE")
+    print("=" * 60)
+    test_default_counter_chunks_markdown_file()
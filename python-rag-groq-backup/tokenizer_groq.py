@@ -0,0 +1,92 @@
+"""
+Local Token Counting for the Groq RAG System
+Uses the embedding model's own tokenizer (tokenizer.json from python-rag/export_onnx_embedder.py) when it
+is on disk, otherwise a regex approximation; never needs network access or an LLM call
+"""
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Span = Tuple[int, int]  # character offsets [start, end) of one token
+
+
+class TokenCounter(ABC):
+    """
+    Splits text into token spans (character offsets), so callers can count tokens
+    and cut text at token boundaries without re-tokenizing
+    """
+    name = "base"
+
+    @abstractmethod
+    def spans(self, text: str) -> List[Span]:
+        """Character offsets of each token in text"""
+
+    def count(self, text: str) -> int:
+        return len(self.spans(text)) if text else 0
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text with at most max_tokens tokens"""
+        spans = self.spans(text)
+        if len(spans) <= max_tokens:
+            return text
+        return text[:spans[max_tokens - 1][1]] if max_tokens > 0 else ""
+
+
+class RegexTokenCounter(TokenCounter):
+    """
+    Approximation of a subword tokenizer: words of up to 8 characters, runs of up to 3 digits
+    and single punctuation marks each count as one token (within ~10% of WordPiece/BPE on English prose)
+    """
+    name = "regex"
+    pattern = re.compile(r"[^\W\d_]{1,8}|\d{1,3}|[^\w\s]|_")
+
+    def spans(self, text: str) -> List[Span]:
+        return [match.span() for match in self.pattern.finditer(text)]
+
+
+class HFTokenCounter(TokenCounter):
+    """
+    Hugging Face `tokenizers` tokenizer loaded from a tokenizer.json file
+    (special tokens and truncation are disabled so counts are exact for any length)
+    """
+
+    def __init__(self, path: str):
+        from tokenizers import Tokenizer
+        self.tokenizer = Tokenizer.from_file(path)
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
+        self.name = f"tokenizers:{os.path.basename(os.path.dirname(os.path.abspath(path)))}"
+
+    def spans(self, text: str) -> List[Span]:
+        return [span for span in self.tokenizer.encode(text, add_special_tokens=False).offsets if span[1] > span[0]]
+
+
+def load_token_counter(path: Optional[str] = None) -> TokenCounter:
+    """
+    TOKENIZER_PATH, else tokenizer.json next to the ONNX embedder (EMBEDDING_ONNX_PATH),
+    else the regex approximation
+    """
+    if path is None:
+        from embedder_groq import DEFAULT_ONNX_PATH
+        path = os.getenv('TOKENIZER_PATH') or os.path.join(
+            os.getenv('EMBEDDING_ONNX_PATH', DEFAULT_ONNX_PATH), "tokenizer.json")
+    if os.path.exists(path):
+        try:
+            counter = HFTokenCounter(path)
+            logger.info(f"Counting tokens with {path}")
+            return counter
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer {path}: {e}")
+    logger.info("Counting tokens with the regex approximation (no tokenizer.json found)")
+    return RegexTokenCounter()
+
+
+@lru_cache(maxsize=1)
+def get_token_counter() -> TokenCounter:
+    """Process-wide token counter (loaded once)"""
+    return load_token_counter()
@@ -0,0 +1,106 @@
+"""
+Background Loader for slow-to-initialize services
+Builds an object (e.g. the vector store and its embedding model) on a daemon thread so the
+service can bind its port immediately and serve the paths that do not need it meanwhile
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+IDLE = "idle"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class BackgroundLoader:
+    """
+    Runs factory() once in the background
+    - state: idle -> warming -> ready | failed
+    - on_ready callbacks receive the built object (called on the loader thread); state turns
+      ready only once they have all run, so ready means the object is attached everywhere
+    - A failed load is logged and leaves value as None; callers keep their degraded path
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = "service"):
+        self.factory = factory
+        self.name = name
+        self.state = IDLE
+        self.value: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._callbacks: List[Callable[[Any], None]] = []
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def on_ready(self, callback: Callable[[Any], None]):
+        """
+        Register a callback for the loaded object (runs immediately if already loaded)
+        """
+        with self._lock:
+            if self.state != READY:
+                self._callbacks.append(callback)
+                return
+        callback(self.value)
+
+    def start(self):
+        """
+        Start loading on a daemon thread (no-op if already started)
+        """
+        with self._lock:
+            if self.state != IDLE:
+                return
+            self.state = WARMING
+        threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True).start()
+        logger.info(f"Loading {self.name} in the background")
+
+    def _load(self):
+        started = time.monotonic()
+        try:
+            value = self.factory()
+        except Exception as e:
+            self.load_seconds = time.monotonic() - started
+            self.error = str(e)
+            self.state = FAILED
+            logger.warning(f"{self.name} failed to load after {self.load_seconds:.1f}s: {e}")
+            self._done.set()
+            return
+
+        self.load_seconds = time.monotonic() - started
+        with self._lock:
+            self.value = value
+        while True:
+            # Callbacks registered while earlier ones run still queue up (state is not READY yet)
+            with self._lock:
+                callbacks, self._callbacks = self._callbacks, []
+                if not callbacks:
+                    self.state = READY
+                    break
+            for callback in callbacks:
+                try:
+                    callback(value)
+                except Exception as e:
+                    logger.error(f"{self.name} ready callback failed: {e}")
+        logger.info(f"{self.name} ready in {self.load_seconds:.1f}s")
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until loading finished (ready or failed); True if it finished in time
+        """
+        return self._done.wait(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {"state": self.state}
+        if self.load_seconds is not None:
+            status["load_seconds"] = round(self.load_seconds, 2)
+        if self.error:
+            status["error"] = self.error
+        return status
@@ -0,0 +1,140 @@
+"""
+Batching Embedder for query encodes
+Runs the embedding model on a dedicated worker thread and groups concurrent
+single-query encodes into one model call, so /chat never encodes on the event loop
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchingEmbedder:
+    """
+    Micro-batching front end for an encode function
+    - submit() returns a concurrent.futures.Future; encode_async() awaits it without blocking the loop
+    - The worker waits at most max_wait_ms after the first queued text for more texts, then encodes
+      up to max_batch_size texts in one call (identical texts in a batch are encoded once)
+    - An encode error fails every future in that batch
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Sequence[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, name: str = "embedder"):
+        """
+        Args:
+            encode_batch: Encodes a list of texts, returning one vector per text in order
+            max_batch_size: Largest number of texts passed to encode_batch at once
+            max_wait_ms: How long the first text of a batch may wait for others to join
+        """
+        self.encode_batch = encode_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+
+        # Metrics
+        self.batches = 0
+        self.encoded = 0
+        self.largest_batch = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for encoding
+        """
+        if self._closed:
+            raise RuntimeError("BatchingEmbedder is closed")
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str, timeout: Optional[float] = None):
+        """
+        Encode one text, blocking the calling thread until its batch is done
+        """
+        return self.submit(text).result(timeout)
+
+    async def encode_async(self, text: str):
+        """
+        Encode one text without blocking the event loop
+        """
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self) -> Tuple[List[Tuple[str, Future]], bool]:
+        """Block for the first item, then gather more until the batch is full or max_wait has passed"""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            # Futures cancelled by their callers (e.g. a disconnected request) are skipped
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.encode_batch(texts)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Batch encode of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            by_text = dict(zip(texts, vectors))
+            for text, future in batch:
+                future.set_result(by_text[text])
+            with self._stats_lock:
+                self.batches += 1
+                self.encoded += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+    def close(self, timeout: float = 5.0):
+        """
+        Finish queued encodes and stop the worker thread
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "encoded": self.encoded,
+                "average_batch_size": self.encoded / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "queued": self._queue.qsize(),
+                "errors": self.errors,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000
+            }
@@ -0,0 +1,85 @@
+"""
+Benchmark Query Classification Throughput
+Compares the compiled keyword automaton (query_classifier) against the original if-chain
+_classify_query (kept below verbatim as the baseline) on the recorded golden queries,
+checks both agree on every query and reports queries/second
+
+Usage:
+    python benchmark_classifier.py
+    python benchmark_classifier.py --queries classify_query_golden.jsonl --rounds 20
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from query_classifier import DEFAULT_CLASSIFIER
+
+
+def legacy_classify(query: str) -> str:
+    """ContextHandler._classify_query as it was before the compiled rules"""
+    query_lower = query.lower().strip()
+    off_topic_keywords = {
+        'entertainment': ['game', 'gaming', 'video game', 'pubg', 'fortnite', 'minecraft', 'valorant', 'cod', 'gta', 'fifa', 'movie', 'film', 'netflix', 'series', 'tv show', 'youtube', 'tiktok', 'instagram', 'facebook', 'social media', 'twitter', 'music', 'song', 'spotify'],
+        'personal': ['love', 'girlfriend', 'boyfriend', 'dating', 'relationship', 'crush', 'romance', 'marriage', 'wedding'],
+        'sports': ['cricket', 'football', 'soccer', 'basketball', 'ipl', 'world cup', 'match', 'player', 'team sport'],
+        'random': ['weather', 'food', 'recipe', 'cooking', 'travel', 'vacation', 'holiday', 'party', 'shopping', 'fashion', 'celebrity', 'gossip']
+    }
+    for category, keywords in off_topic_keywords.items():
+        if any(keyword in query_lower for keyword in keywords):
+            if not any(career_term in query_lower for career_term in ["placement", "career", "job", "interview", "skill", "learning", "study"]):
+                return "off_topic"
+    greeting_keywords = ["hi", "hello", "hey", "good morning", "good afternoon", "good evening", "greetings", "yo", "sup", "hola"]
+    if any(greeting == query_lower or query_lower.startswith(greeting + " ") or query_lower.startswith(greeting + "!") for greeting in greeting_keywords):
+        if not any(keyword in query_lower for keyword in ["assessment", "test", "exam", "result", "score", "available", "show", "what", "when", "where", "how"]):
+            return "greeting"
+    if any(keyword in query_lower for keyword in ["assessment", "test", "exam", "quiz", "available", "pending", "take test", "start test"]):
+        return "assessments"
+    if any(keyword in query_lower for keyword in ["result", "score", "grade", "performance", "pass", "fail", "mark", "marks", "percentage"]):
+        return "results"
+    if any(keyword in query_lower for keyword in ["how to", "how do", "how can", "guide", "tutorial", "instructions", "steps to"]):
+        return "help"
+    if any(keyword in query_lower for keyword in ["change my name", "update my name", "rename me", "my name is", "call me", "change name to", "update name to"]):
+        return "name_change"
+    if any(keyword in query_lower for keyword in ["profile", "account", "password", "email", "settings", "update profile"]):
+        return "profile"
+    if any(keyword in query_lower for keyword in ["what is", "what are", "when is", "when are", "where is", "where are", "who is", "why is", "explain"]):
+        return "general"
+    if any(keyword in query_lower for keyword in ["thank", "thanks", "appreciate", "helpful", "good", "great", "awesome"]):
+        return "acknowledgment"
+    return "general"
+
+
+def throughput(classify: Callable[[str], str], queries: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            classify(query)
+    return rounds * len(queries) / (time.perf_counter() - start)
+
+
+def main(args):
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [json.loads(line)['query'] for line in f if line.strip()]
+
+    disagreements = [query for query in queries if legacy_classify(query) != DEFAULT_CLASSIFIER.classify(query)]
+    print("=" * 70)
+    print(f"{len(queries)} queries x {args.rounds} rounds, "
+          f"{len(DEFAULT_CLASSIFIER.automaton.keywords)} compiled keywords, {len(disagreements)} disagreements")
+    print("=" * 70)
+    legacy = throughput(legacy_classify, queries, args.rounds)
+    compiled = throughput(DEFAULT_CLASSIFIER.classify, queries, args.rounds)
+    matches = throughput(DEFAULT_CLASSIFIER.matches, queries, args.rounds)
+    print(f"{'if-chain':<22} {legacy:>12,.0f} queries/s")
+    print(f"{'automaton classify':<22} {compiled:>12,.0f} queries/s  ({compiled / legacy:.1f}x)")
+    print(f"{'automaton matches':<22} {matches:>12,.0f} queries/s  (all categories)")
+    print("=" * 70)
+    for query in disagreements[:10]:
+        print(f"DISAGREE {query!r}: {legacy_classify(query)} vs {DEFAULT_CLASSIFIER.classify(query)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare query classification throughput")
+    parser.add_argument("--queries", default="classify_query_golden.jsonl", help="JSONL of {\"query\", ...}")
+    parser.add_argument("--rounds", type=int, default=10, help="Passes over the query set")
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+"""
+Benchmark for the Batching Embedder
+Compares query encodes/second on CPU for one-at-a-time encodes in a thread pool
+(previous /chat behaviour) against the micro-batching BatchingEmbedder at several concurrency levels
+
+Usage:
+    python benchmark_embedder.py
+    python benchmark_embedder.py --requests 512 --concurrency 1 8 32 128 --batch-size 64 --wait-ms 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List
+
+from batching_embedder import BatchingEmbedder
+from embedder import create_embedder
+
+QUERIES = [
+    "what assessments are available",
+    "how do I start a test",
+    "what is the placement process",
+    "how to prepare for aptitude rounds",
+    "explain logical reasoning questions",
+    "what is the time limit for the verbal test",
+    "how are assessments scored",
+    "can I retake an assessment",
+]
+
+
+async def run_load(encode: Callable[[str], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Issue `requests` encodes with at most `concurrency` in flight"""
+    latencies: List[float] = []
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            query = f"{QUERIES[next_index % len(QUERIES)]} #{next_index}"
+            next_index += 1
+            started = time.perf_counter()
+            await encode(query)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "encodes_per_s": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def print_result(label: str, result: Dict[str, Any], extra: str = ""):
+    print(f"{label:<24} {result['encodes_per_s']:>9.1f} enc/s | p50 {result['p50_ms']:>7.1f}ms | "
+          f"p95 {result['p95_ms']:>7.1f}ms {extra}")
+
+
+async def main(args):
+    model = create_embedder(args.backend)
+    model.encode(QUERIES)  # warm up
+
+    print("=" * 88)
+    print(f"{model.name} on CPU, {args.requests} encodes per run, "
+          f"batch size {args.batch_size}, max wait {args.wait_ms}ms")
+    print("=" * 88)
+    loop = asyncio.get_event_loop()
+
+    for concurrency in args.concurrency:
+        print(f"concurrency {concurrency}:")
+
+        # BEFORE: each request encodes its own query in an executor thread
+        pool = ThreadPoolExecutor(max_workers=concurrency)
+
+        async def single(query):
+            await loop.run_in_executor(pool, lambda: model.encode([query]))
+
+        before = await run_load(single, args.requests, concurrency)
+        pool.shutdown()
+        print_result("  one-at-a-time", before)
+
+        # AFTER: concurrent encodes are micro-batched on one worker thread
+        embedder = BatchingEmbedder(
+            lambda texts: model.encode(texts, batch_size=len(texts)),
+            max_batch_size=args.batch_size, max_wait_ms=args.wait_ms
+        )
+        after = await run_load(embedder.encode_async, args.requests, concurrency)
+        stats = embedder.get_stats()
+        embedder.close()
+        print_result("  batching embedder", after,
+                     f"| avg batch {stats['average_batch_size']:.1f} | "
+                     f"{after['encodes_per_s'] / before['encodes_per_s']:.1f}x")
+
+    print("=" * 88)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched vs one-at-a-time query embedding on CPU")
+    parser.add_argument("--backend", default=None, help="EMBEDDING_BACKEND override (default: same as VectorStore)")
+    parser.add_argument("--requests", type=int, default=512, help="Encodes per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64, 128],
+                        help="Concurrent in-flight encodes")
+    parser.add_argument("--batch-size", type=int, default=32, help="BatchingEmbedder max batch size")
+    parser.add_argument("--wait-ms", type=float, default=5.0, help="BatchingEmbedder max wait in ms")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+"""
+Benchmark the Embedding Backends
+Loads each backend in a fresh subprocess and reports load time, resident memory,
+single-query latency and batch throughput on CPU (PyTorch vs ONNX fp32 vs ONNX int8)
+
+Usage:
+    python benchmark_embedding_backends.py
+    python benchmark_embedding_backends.py --backends sentence-transformers onnx --queries 500 --threads 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+QUERIES = [
+    "what assessments are available",
+    "how do I start a test",
+    "what is the placement process",
+    "how to prepare for aptitude rounds",
+    "explain logical reasoning questions",
+    "what is the time limit for the verbal test",
+    "how are assessments scored",
+    "can I retake an assessment",
+]
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process (Linux), falling back to peak RSS"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(backend: str, queries: int, batch_size: int) -> dict:
+    """Runs inside the subprocess for one backend"""
+    started = time.perf_counter()
+    from embedder import create_embedder
+    embedder = create_embedder(backend)
+    embedder.encode(QUERIES)  # warm up
+    load_s = time.perf_counter() - started
+
+    latencies = []
+    for i in range(queries):
+        query = f"{QUERIES[i % len(QUERIES)]} #{i}"
+        t0 = time.perf_counter()
+        embedder.encode([query])
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+
+    batch = [f"{QUERIES[i % len(QUERIES)]} #{i}" for i in range(queries)]
+    t0 = time.perf_counter()
+    embedder.encode(batch, batch_size=batch_size)
+    batch_s = time.perf_counter() - t0
+
+    return {
+        "backend": backend,
+        "model": embedder.name,
+        "load_s": load_s,
+        "rss_mb": rss_mb(),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "batch_per_s": queries / batch_s,
+    }
+
+
+def run_isolated(backend: str, args) -> dict:
+    env = dict(os.environ)
+    if args.threads:
+        env["EMBEDDING_THREADS"] = str(args.threads)
+        env["OMP_NUM_THREADS"] = str(args.threads)
+    output = subprocess.run(
+        [sys.executable, __file__, "--worker", backend, "--queries", str(args.queries),
+         "--batch-size", str(args.batch_size)],
+        capture_output=True, text=True, env=env
+    )
+    if output.returncode != 0:
+        return {"backend": backend, "error": output.stderr.strip().splitlines()[-1:]}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    print("=" * 96)
+    print(f"{args.queries} single-query encodes + one batch of {args.queries} (batch size {args.batch_size}), "
+          f"threads {args.threads or 'default'}")
+    print("=" * 96)
+    print(f"{'backend':<22} | {'load':>6} | {'RSS':>8} | {'p50':>7} | {'p95':>7} | {'batch':>10} | model")
+    print("-" * 96)
+    for backend in args.backends:
+        result = run_isolated(backend, args)
+        if "error" in result:
+            print(f"{backend:<22} | failed: {' '.join(result['error'])}")
+            continue
+        print(f"{backend:<22} | {result['load_s']:>5.1f}s | {result['rss_mb']:>6.0f}MB | "
+              f"{result['p50_ms']:>5.1f}ms | {result['p95_ms']:>5.1f}ms | {result['batch_per_s']:>6.0f} q/s | "
+              f"{result['model']}")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare embedding backends: load time, memory, latency")
+    parser.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx-fp32", "onnx"],
+                        help="EMBEDDING_BACKEND values to compare")
+    parser.add_argument("--queries", type=int, default=300, help="Encodes per measurement")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for the throughput run")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads per backend (0 = runtime default)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.queries, args.batch_size)))
+    else:
+        main(args)
@@ -0,0 +1,308 @@
+"""
+Benchmark IntelligentCutoff Scoring Throughput
+Routes the recorded golden queries (off-topic check, then unclear check on its score) with the
+compiled scorer for new queries, for repeated ones (recent-score cache) and through the batch API,
+against the list-scanning scorer (kept below verbatim as the baseline), and checks both agree on
+every query. --baseline loads another copy of intelligent_cutoff.py to compare against instead
+
+Usage:
+    python benchmark_intelligent_cutoff.py --rounds 10
+    git show <commit>:python-rag/intelligent_cutoff.py > /tmp/intelligent_cutoff_old.py
+    python benchmark_intelligent_cutoff.py --baseline /tmp/intelligent_cutoff_old.py
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import time
+from typing import List, Tuple
+
+from intelligent_cutoff import IntelligentCutoff
+
+logger = logging.getLogger(__name__)
+
+
+class ListScanningCutoff:
+    """
+    IntelligentCutoff scoring as it was before the keyword lists were compiled: each list is
+    scanned with `in` per query (same keyword lists as IntelligentCutoff)
+    """
+
+    def __init__(self):
+        current = IntelligentCutoff(cache_size=0)
+        self.high_relevance = current.high_relevance
+        self.medium_relevance = current.medium_relevance
+        self.low_relevance = current.low_relevance
+        self.off_topic_keywords = current.off_topic_keywords
+        self.career_terms = current.career_terms
+
+    def calculate_relevance_score(self, query: str) -> int:
+        """
+        Calculate relevance score (0-100) based on placement/study-related keywords
+        Higher score = more relevant to placement preparation
+        Uses intelligent pattern detection instead of extensive word lists
+        """
+        query_lower = query.lower().strip()
+        
+        # HANDLE EMPTY OR WHITESPACE-ONLY QUERIES
+        if not query_lower or len(query_lower) == 0:
+            logger.warning("Empty query detected")
+            return 0  # Empty queries get 0 score
+        
+        # Check if query is just spaces, special chars, or gibberish
+        if all(c in ' \t\n\r.,!?;:()[]{}@#$%^&*+=~`|\\/<>' for c in query_lower):
+            logger.warning("Query contains only special characters")
+            return 0
+        
+        # Check if query has meaningful alphabetic content
+        alpha_chars = sum(1 for c in query_lower if c.isalpha())
+        if len(query_lower) > 3 and alpha_chars < len(query_lower) * 0.3:
+            logger.warning("Query has too few alphabetic characters")
+            return 0
+        
+        score = 50  # Start with neutral score
+        
+        # Count keyword matches
+        high_matches = sum(1 for keyword in self.high_relevance if keyword in query_lower)
+        medium_matches = sum(1 for keyword in self.medium_relevance if keyword in query_lower)
+        low_matches = sum(1 for keyword in self.low_relevance if keyword in query_lower)
+        
+        # Calculate score
+        score += (high_matches * 30)
+        score += (medium_matches * 15)
+        score -= (low_matches * 20)
+        
+        # Question marks indicate inquiry (slight boost)
+        if '?' in query:
+            score += 5
+        
+        # SMART PATTERN DETECTION (without extensive word lists)
+        words = query_lower.split()
+        word_count = len(words)
+        
+        # Detect meaningless patterns
+        if word_count > 0:
+            # Check for repetitive patterns (aaa, xxx, 111)
+            for word in words:
+                if len(word) > 2 and len(set(word)) == 1:  # All same character
+                    score -= 30
+                    logger.info("Repetitive character pattern detected")
+                    break
+            
+            # Check if most words are very short (likely gibberish)
+            short_words = sum(1 for word in words if len(word) <= 2)
+            if word_count >= 3 and short_words >= word_count * 0.7:
+                score -= 25
+                logger.info("Too many short words detected")
+            
+            # Check for random consonant clusters (no vowels)
+            vowels = set('aeiou')
+            no_vowel_words = sum(1 for word in words if len(word) > 3 and not any(c in vowels for c in word))
+            if no_vowel_words > word_count * 0.5:
+                score -= 30
+                logger.info("Too many words without vowels")
+        
+        # ENHANCED: Single word/character detection
+        if word_count == 1:
+            single_word = words[0]
+            # Check if it's a single character or very short meaningless word
+            if len(single_word) <= 2 and single_word not in ['hi', 'ok', 'no']:
+                score -= 30
+            # Check if it's just a number or special character
+            if single_word.isdigit() or not single_word.isalnum():
+                score -= 40
+        
+        # Very short queries (< 3 words) might be greetings or casual
+        if word_count < 3 and high_matches == 0:
+            score -= 20  # Increased penalty
+        
+        # Long queries with no relevant keywords are likely off-topic
+        if word_count > 5 and high_matches == 0 and medium_matches == 0:
+            score -= 25  # Increased penalty
+        
+        # INTELLIGENT CONTEXT DETECTION
+        # Check if query lacks any meaningful context about placement/study
+        has_question_words = any(word in query_lower for word in ['what', 'how', 'when', 'where', 'why', 'which', 'can', 'should', 'could'])
+        has_action_words = any(word in query_lower for word in ['show', 'tell', 'explain', 'help', 'need', 'want', 'give', 'find'])
+        
+        # If no question words, no action words, and no high relevance keywords
+        if not has_question_words and not has_action_words and high_matches == 0:
+            score -= 20
+            logger.info("Query lacks meaningful context")
+        
+        # Detect vague or dismissive phrases
+        dismissive_patterns = ['whatever', 'nevermind', 'forget it', 'leave it', 'who cares', 'doesnt matter']
+        if any(pattern in query_lower for pattern in dismissive_patterns):
+            score -= 40
+            logger.info("Dismissive phrase detected")
+        
+        # If query is mostly slang/casual words, reduce score significantly
+        slang_count = sum(1 for word in words if word in [
+            'bloody', 'sweet', 'cool', 'awesome', 'nice', 'wow', 'damn',
+            'hell', 'shit', 'crap', 'stupid', 'dumb', 'lol', 'lmao', 'omg',
+            'wtf', 'bruh', 'bro', 'dude', 'mate', 'yolo', 'swag', 'lit',
+            'sick', 'fire', 'dope', 'rad', 'wicked', 'epic', 'savage'
+        ])
+        
+        if word_count > 0 and (slang_count / word_count) > 0.4:  # More than 40% slang
+            score -= 30
+        
+        # ENHANCED: Detect queries with excessive punctuation or emojis
+        special_char_count = sum(1 for c in query if c in '!?.,;:()[]{}@#$%^&*+=~`|\\/<>')
+        if len(query) > 0 and (special_char_count / len(query)) > 0.3:
+            score -= 25  # Too many special characters
+        
+        # Cap score between 0 and 100
+        score = max(0, min(100, score))
+        
+        logger.info(f"Relevance score: {score}% (H:{high_matches}, M:{medium_matches}, L:{low_matches}, Words:{word_count})")
+        return score
+    
+    def is_off_topic(self, query: str, relevance_threshold: int = 30) -> Tuple[bool, str, int]:
+        """
+        Determine if a query is off-topic based on intelligent relevance scoring
+        Returns: (is_off_topic, category, relevance_score)
+        """
+        query_lower = query.lower().strip()
+        
+        # HANDLE EMPTY QUERIES IMMEDIATELY
+        if not query_lower or len(query_lower) == 0:
+            logger.warning("Empty query - marking as off-topic")
+            return True, "empty_query", 0
+        
+        # Calculate relevance score using intelligent pattern detection
+        relevance_score = self.calculate_relevance_score(query)
+        
+        # INTELLIGENT CUTOFF: Low relevance score (increased threshold to 30)
+        if relevance_score < relevance_threshold:
+            logger.warning(f"LOW RELEVANCE ({relevance_score}%) - Triggering intelligent cutoff")
+            
+            # Categorize the type of irrelevance
+            words = query_lower.split()
+            word_count = len(words)
+            
+            if word_count == 0:
+                return True, "empty_query", relevance_score
+            elif word_count == 1 and len(words[0]) <= 3:
+                return True, "too_short", relevance_score
+            elif all(not c.isalnum() for c in query_lower.replace(' ', '')):
+                return True, "special_chars_only", relevance_score
+            elif any(word in query_lower for word in ['whatever', 'nevermind', 'forget']):
+                return True, "dismissive", relevance_score
+            else:
+                return True, "irrelevant", relevance_score
+        
+        # Quick check for obvious off-topic keywords (minimal list)
+        if relevance_score < 50:  # Only check if score is borderline
+            for category, keywords in self.off_topic_keywords.items():
+                if any(keyword in query_lower for keyword in keywords):
+                    # Double-check: avoid false positives with career terms
+                    if not any(career_term in query_lower for career_term in self.career_terms):
+                        logger.info(f"Off-topic keyword detected: {category}")
+                        return True, category, relevance_score
+        
+        return False, "relevant", relevance_score
+    
+    def is_unclear_query(self, query: str, relevance_score: int) -> bool:
+        """
+        Determine if query is unclear/ambiguous (needs AI clarification)
+        Returns: True if query is unclear and should be clarified before redirecting
+        """
+        query_lower = query.lower().strip()
+        
+        # Unclear if:
+        # 1. Relevance score is borderline (30-45%)
+        # 2. Very short and vague
+        # 3. No clear keywords matched
+        
+        word_count = len(query.split())
+        
+        # Borderline relevance (might be unclear intent)
+        if 30 <= relevance_score <= 45:
+            return True
+        
+        # Very short and vague queries
+        if word_count <= 2 and relevance_score < 60:
+            return True
+        
+        # Check for vague/unclear phrases
+        unclear_phrases = [
+            'what about', 'tell me about', 'i want to know', 'can you',
+            'something', 'anything', 'stuff', 'things', 'random',
+            'just curious', 'wondering', 'thinking about'
+        ]
+        
+        if any(phrase in query_lower for phrase in unclear_phrases):
+            # Only unclear if not clearly relevant
+            if relevance_score < 60:
+                return True
+        
+        return False
+
+
+
+def load_cutoff_class(path: str):
+    spec = importlib.util.spec_from_file_location("intelligent_cutoff_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.IntelligentCutoff
+
+
+def evaluate(cutoff, query: str):
+    """Routing decision as ContextHandler makes it: off-topic check, then unclear check on its score"""
+    off_topic = cutoff.is_off_topic(query)
+    return off_topic, cutoff.is_unclear_query(query, off_topic[2])
+
+
+def throughput(cutoff, queries: List[str], rounds: int, repeated: bool = False) -> float:
+    """repeated=False clears the recent-score cache every round so each query is scored as new"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if not repeated and hasattr(cutoff, "clear"):
+            cutoff.clear()
+        for query in queries:
+            evaluate(cutoff, query)
+    return rounds * len(queries) / (time.perf_counter() - start)
+
+
+def batch_throughput(cutoff, queries: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        cutoff.clear()
+        for query, off_topic in zip(queries, cutoff.is_off_topic_batch(queries)):
+            cutoff.is_unclear_query(query, off_topic[2])
+    return rounds * len(queries) / (time.perf_counter() - start)
+
+
+def main(args):
+    logging.disable(logging.WARNING)  # per-query score logging would dominate the timings
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [json.loads(line)['query'] for line in f if line.strip()]
+
+    print("=" * 70)
+    print(f"{len(queries)} queries x {args.rounds} rounds, "
+          f"{len(IntelligentCutoff().automaton.keywords)} compiled keywords")
+    print("=" * 70)
+    baseline_cutoff = load_cutoff_class(args.baseline)() if args.baseline else ListScanningCutoff()
+    current = IntelligentCutoff()
+    disagreements = sum(1 for query in queries if evaluate(baseline_cutoff, query) != evaluate(current, query))
+    baseline = throughput(baseline_cutoff, queries, args.rounds)
+    print(f"{'baseline':<24} {baseline:>12,.0f} queries/s  ({disagreements} disagreements)")
+
+    results = [
+        ("compiled (new queries)", throughput(IntelligentCutoff(), queries, args.rounds)),
+        ("compiled (repeated)", throughput(IntelligentCutoff(cache_size=len(queries)), queries, args.rounds,
+                                           repeated=True)),
+        ("is_off_topic_batch", batch_throughput(IntelligentCutoff(), queries, args.rounds)),
+    ]
+    for label, rate in results:
+        print(f"{label:<24} {rate:>12,.0f} queries/s  ({rate / baseline:.1f}x)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure IntelligentCutoff scoring throughput")
+    parser.add_argument("--queries", default="intelligent_cutoff_golden.jsonl", help="JSONL of {\"query\", ...}")
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the query set")
+    parser.add_argument("--baseline", help="Path to an intelligent_cutoff.py to compare against (default: ListScanningCutoff)")
+    main(parser.parse_args())
@@ -0,0 +1,121 @@
+"""
+Benchmark Prompt Sizes With and Without the Prompt Token Budget
+Replays recorded conversations (each student message is sent with everything before it as history)
+through ContextHandler._build_enhanced_prompt and reports prompt tokens per component before/after.
+Retrieved documents are the top knowledge_base sections by word overlap (no vector store needed)
+
+Usage:
+    python benchmark_prompt_budget.py
+    python benchmark_prompt_budget.py --conversations my_chats.jsonl --assessments 40 --max-tokens 2500
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+from typing import Any, Dict, List
+
+from chunker import Chunker
+from context_handler import ContextHandler
+from prompt_budget import PromptBudget
+from tokenizer import get_token_counter
+
+WORD = re.compile(r"[a-z]{3,}")
+
+
+def load_conversations(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_sections(kb_dir: str) -> List[str]:
+    """knowledge_base sections as whole documents (what retrieval returned before chunking)"""
+    sections = []
+    for path in sorted(glob.glob(os.path.join(kb_dir, "*.md"))):
+        with open(path, encoding="utf-8") as f:
+            for title, body in Chunker(max_tokens=10 ** 6, overlap_tokens=0).split_markdown(f.read()):
+                sections.append(body if title == "introduction" else f"## {title}\n{body}")
+    return sections
+
+
+def retrieve(query: str, sections: List[str], n_results: int = 3) -> List[str]:
+    words = set(WORD.findall(query.lower()))
+    ranked = sorted(sections, key=lambda section: -len(words & set(WORD.findall(section.lower()))))
+    return ranked[:n_results]
+
+
+def student_context(assessments: int) -> Dict[str, Any]:
+    return {
+        'student_info': {'id': 1, 'name': 'Benchmark Student', 'email': 'student@example.com'},
+        'available_assessments': [{'title': f'Practice Test {i}', 'category': 'Aptitude', 'total_time': 30}
+                                  for i in range(1, assessments + 1)],
+        'completed_assessments': [{'title': 'Diagnostic Test'}],
+        'performance_summary': {'total_completed': 1, 'average_percentage': 64, 'highest_score': 64,
+                                'passed_count': 1, 'failed_count': 0},
+    }
+
+
+def measure(messages: List[Dict[str, str]], counter) -> Dict[str, int]:
+    """Tokens per component of a built prompt (system includes the knowledge section)"""
+    tokens = [counter.count(message['content']) + 4 for message in messages]
+    return {'system': tokens[0], 'history': sum(tokens[1:-1]), 'user': tokens[-1], 'total': sum(tokens)}
+
+
+def replay(handler: ContextHandler, conversations, sections, context, counter) -> List[Dict[str, int]]:
+    results = []
+    for conversation in conversations:
+        messages = conversation['messages']
+        for index, message in enumerate(messages):
+            if message['role'] != 'user':
+                continue
+            query = message['content']
+            prompt = handler._build_enhanced_prompt(query, context, handler._classify_query(query), None, None,
+                                                    retrieve(query, sections), messages[:index])
+            results.append(measure(prompt, counter))
+    return results
+
+
+def summarize(label: str, results: List[Dict[str, int]]):
+    totals = sorted(result['total'] for result in results)
+    print(f"{label:<16} | system+kb {statistics.mean(r['system'] for r in results):>7.0f} | "
+          f"history {statistics.mean(r['history'] for r in results):>6.0f} | "
+          f"user {statistics.mean(r['user'] for r in results):>5.0f} | "
+          f"total mean {statistics.mean(totals):>6.0f} p95 {totals[int(len(totals) * 0.95) - 1]:>6} max {totals[-1]:>6}")
+    return statistics.mean(totals)
+
+
+def main(args):
+    counter = get_token_counter()
+    conversations = load_conversations(args.conversations)
+    sections = load_sections(args.kb_dir)
+    context = student_context(args.assessments)
+    turns = sum(1 for c in conversations for m in c['messages'] if m['role'] == 'user')
+
+    print("=" * 100)
+    print(f"{len(conversations)} conversations, {turns} student turns, {len(sections)} knowledge sections, "
+          f"{args.assessments} available assessments, token counter: {counter.name}")
+    print("=" * 100)
+    before = summarize("no budget", replay(ContextHandler(openrouter_client=None), conversations, sections,
+                                           context, counter))
+    budget = PromptBudget(max_prompt_tokens=args.max_tokens, knowledge_tokens=args.knowledge_tokens,
+                          history_tokens=args.history_tokens, counter=counter)
+    after = summarize("prompt budget", replay(ContextHandler(openrouter_client=None, prompt_budget=budget),
+                                              conversations, sections, context, counter))
+    print("=" * 100)
+    stats = budget.get_stats()
+    print(f"mean prompt tokens {before:.0f} -> {after:.0f} ({(1 - after / before) * 100:.0f}% fewer); "
+          f"{stats['history_messages_dropped']} history messages and {stats['documents_dropped']} documents "
+          f"dropped, {stats['over_budget']} prompts over {args.max_tokens}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prompt sizes with and without the prompt token budget")
+    parser.add_argument("--conversations", default="prompt_budget_conversations.jsonl",
+                        help="JSONL of {\"id\", \"messages\": [{\"role\", \"content\"}, ...]}")
+    parser.add_argument("--kb-dir", default="knowledge_base", help="Markdown knowledge base to retrieve from")
+    parser.add_argument("--assessments", type=int, default=25, help="Available assessments in the student context")
+    parser.add_argument("--max-tokens", type=int, default=2500, help="PROMPT_MAX_TOKENS")
+    parser.add_argument("--knowledge-tokens", type=int, default=360, help="PROMPT_KNOWLEDGE_TOKENS")
+    parser.add_argument("--history-tokens", type=int, default=400, help="PROMPT_HISTORY_TOKENS")
+    main(parser.parse_args())
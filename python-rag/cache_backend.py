@@ -0,0 +1,259 @@
+"""
+Storage Backends for the Response Cache
+In-process LRU storage (default) or a Redis-protocol server shared by every uvicorn worker
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+SHARED_KEY_PREFIX = "shared:"
+STUDENT_KEY_PREFIX = "student:"
+
+# Rough per-entry bookkeeping overhead (key string, tuples, OrderedDict links)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def estimate_size(response: Dict[str, Any]) -> int:
+    """
+    Approximate memory footprint of a cached response dict in bytes
+    The JSON-encoded length tracks the size of the strings that dominate responses
+    """
+    try:
+        return sys.getsizeof(json.dumps(response, default=str)) + ENTRY_OVERHEAD_BYTES
+    except (TypeError, ValueError):
+        return sys.getsizeof(str(response)) + ENTRY_OVERHEAD_BYTES
+
+
+class CacheBackend(ABC):
+    """
+    Key/value storage used by ResponseCache
+    Keys start with SHARED_KEY_PREFIX or STUDENT_KEY_PREFIX; values are JSON-serializable response dicts
+    """
+    name = "base"
+    # Whether calls wait on the network (async callers then run them in a worker thread)
+    blocking = False
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Live values for keys (None for missing/expired), in one round trip"""
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> bool:
+        """Store a value that expires after ttl_seconds; False if it was not stored"""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with prefix"""
+
+    def clear(self) -> int:
+        return self.delete_prefix("")
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries (backends with native expiry have nothing to do)"""
+        return 0
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend name plus whatever size/health counters the backend keeps"""
+
+    def close(self):
+        pass
+
+
+class InMemoryBackend(CacheBackend):
+    """
+    Per-process LRU storage bounded by entry count and an approximate byte budget
+    """
+    name = "memory"
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 50 * 1024 * 1024):
+        # key -> (value, expires_at, size), kept in LRU order (most recent last)
+        self.entries = OrderedDict()
+        # key -> expires_at, kept in insertion order; with one TTL this is also expiry order
+        self._expiry = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.shared_entries = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str):
+        """Remove an entry and its accounting (caller holds the lock)"""
+        _, _, size = self.entries.pop(key)
+        self._expiry.pop(key, None)
+        self.bytes -= size
+        self.shared_entries -= key.startswith(SHARED_KEY_PREFIX)
+
+    def _lookup(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Return a live entry's value, dropping it if expired (caller holds the lock)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if now < expires_at:
+            self.entries.move_to_end(key)
+            return value
+        self._remove(key)
+        self.expirations += 1
+        return None
+
+    def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            return [self._lookup(key, now) for key in keys]
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> bool:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Response too large to cache ({size} bytes)")
+            return False
+
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            expires_at = time.time() + ttl_seconds
+            self.entries[key] = (value, expires_at, size)
+            self._expiry[key] = expires_at
+            self.bytes += size
+            self.shared_entries += key.startswith(SHARED_KEY_PREFIX)
+
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+        return True
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self.entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def cleanup_expired(self) -> int:
+        """Walk entries in insertion order and stop at the first live one"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry:
+                key, expires_at = next(iter(self._expiry.items()))
+                if expires_at > now:
+                    break
+                self._remove(key)
+                removed += 1
+            self.expirations += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': self.name,
+                'size': len(self.entries),
+                'shared_entries': self.shared_entries,
+                'student_entries': len(self.entries) - self.shared_entries,
+                'max_entries': self.max_entries,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class RedisBackend(CacheBackend):
+    """
+    Storage on a Redis-protocol server, shared by every worker and container
+    - Responses are stored as JSON with a server-side TTL (no sweeping needed)
+    - Multi-key reads are pipelined GETs: one round trip, and valid on Redis Cluster
+      where a plain MGET across hash slots is rejected
+    - Size limits and eviction are left to the server (maxmemory / allkeys-lru)
+    - Server errors are logged and treated as misses so an outage only costs cache hits
+    - Calls block on the socket (up to socket_timeout), so async callers go through the
+      ResponseCache *_async methods, which run them in a worker thread
+    - Stats are local counters only; entry counts would need a keyspace SCAN per call
+    """
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client, prefix: str = "rag:response:"):
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "rag:response:", socket_timeout: float = 0.5) -> "RedisBackend":
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+        return cls(client, prefix=prefix)
+
+    def _failed(self, action: str, error: Exception):
+        self.errors += 1
+        logger.warning(f"Redis cache {action} failed: {error}")
+
+    @staticmethod
+    def _decode(raw) -> Optional[Dict[str, Any]]:
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(self.prefix + key)
+            return [self._decode(raw) for raw in pipe.execute()]
+        except Exception as e:
+            self._failed("read", e)
+            return [None] * len(keys)
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> bool:
+        try:
+            payload = json.dumps(value, default=str)
+            self.client.set(self.prefix + key, payload, px=max(int(ttl_seconds * 1000), 1))
+            return True
+        except Exception as e:
+            self._failed("write", e)
+            return False
+
+    def _scan(self, prefix: str) -> Iterable:
+        return self.client.scan_iter(match=self.prefix + prefix + "*", count=500)
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        try:
+            batch = []
+            for key in self._scan(prefix):
+                batch.append(key)
+                if len(batch) >= 500:
+                    removed += self.client.delete(*batch)
+                    batch = []
+            if batch:
+                removed += self.client.delete(*batch)
+        except Exception as e:
+            self._failed("delete", e)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'prefix': self.prefix, 'errors': self.errors}
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.debug(f"Redis cache close failed: {e}")
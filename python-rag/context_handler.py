@@ -3,15 +3,51 @@ Context Handler for OpenRouter RAG
 Processes student queries with context and generates appropriate prompts
 """
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+import asyncio
+from typing import Dict, Any, List, Tuple, Optional, AsyncIterator
 import re
 
+from intelligent_cutoff import IntelligentCutoff
+from query_classifier import DEFAULT_CLASSIFIER
+from stage_timings import StageTimings
+from templated_responder import TEMPLATED_MODEL, TemplatedResponder, available_assessments_message
+
 logger = logging.getLogger(__name__)
 
+# Query types worth racing the fallback model for (cheap greetings/thanks never hedge)
+DEFAULT_HEDGE_QUERY_TYPES = ("general", "help", "results", "profile")
+# Keyword query types the topic pre-filter may overrule (the catch-all buckets junk lands in;
+# "help" questions are real platform questions and always reach the LLM by default)
+DEFAULT_TOPIC_FILTER_QUERY_TYPES = ("general", "off_topic")
+# model_used of answers built from templates by the topic pre-filter
+TOPIC_FILTER_MODEL = "topic_filter"
+
+
+def empty_student_context() -> Dict[str, Any]:
+    """Context used when the database fetch fails or times out"""
+    return {
+        'available_assessments': [],
+        'completed_assessments': [],
+        'performance_summary': {}
+    }
+
+
 class ContextHandler:
-    def __init__(self, openrouter_client, vector_store=None):
+    def __init__(self, openrouter_client, vector_store=None, async_openrouter_client=None,
+                 hedge_query_types=DEFAULT_HEDGE_QUERY_TYPES, prompt_budget=None,
+                 query_classifier=None, topic_filter=None,
+                 topic_filter_query_types=DEFAULT_TOPIC_FILTER_QUERY_TYPES, templated_responder=None):
         self.openrouter_client = openrouter_client
         self.vector_store = vector_store  # Add vector store for RAG
+        self.async_openrouter_client = async_openrouter_client  # Non-blocking client for the /chat path
+        self.hedge_query_types = set(hedge_query_types or [])
+        self.prompt_budget = prompt_budget  # PromptBudget; None keeps the unbounded legacy prompt
+        self.query_classifier = query_classifier or DEFAULT_CLASSIFIER  # Compiled keyword rules
+        self.topic_filter = topic_filter  # TopicClassifier; needs the vector store's query embeddings
+        self.topic_filter_query_types = set(topic_filter_query_types or [])
+        self.intelligent_cutoff = IntelligentCutoff()  # Redirect/clarification templates
+        # Deterministic query types answered from the student context (no retrieval, no LLM)
+        self.templated_responder = templated_responder if templated_responder is not None else TemplatedResponder()
     
     def process_query(self, student_id: int, query: str, student_context: Dict[str, Any], 
                      student_email: Optional[str] = None, student_name: Optional[str] = None,
@@ -25,16 +61,22 @@ class ContextHandler:
             query_type = self._classify_query(query)
             logger.info(f"Query classified as: {query_type}")
             
+            # 1a. Deterministic query types come straight from the student context
+            templated = self.templated_responder.respond(query_type, query, student_context, student_name)
+            if templated is not None:
+                return templated[0], templated[1], query_type, TEMPLATED_MODEL
+            
+            # 1b. Answer confidently off-topic/unclear queries from templates (no LLM call)
+            query_embedding = None
+            if self._use_topic_filter(query_type):
+                query_embedding = self._embed_query(query)
+                shortcut = self._topic_shortcut(query, self._topic_decision(query_type, query_embedding),
+                                                student_context)
+                if shortcut is not None:
+                    return shortcut
+            
             # 2. Search vector database for relevant knowledge (RAG component)
-            retrieved_docs = []
-            if self.vector_store:
-                try:
-                    search_results = self.vector_store.search(query, n_results=3)
-                    retrieved_docs = search_results['documents'][0] if search_results['documents'] else []
-                    if retrieved_docs:
-                        logger.info(f"Retrieved {len(retrieved_docs)} relevant documents from knowledge base")
-                except Exception as e:
-                    logger.warning(f"Vector search failed: {e}")
+            retrieved_docs = self._retrieve_documents(query, query_embedding)
             
             # 3. Build enhanced prompt with retrieved knowledge + conversation history
             prompt_messages = self._build_enhanced_prompt(
@@ -47,82 +89,269 @@ class ContextHandler:
             response = self.openrouter_client.call_with_fallback(prompt_messages)
             
             # 5. Extract message and data
-            message = response["choices"][0]["message"]["content"] if response.get("choices") else "No response generated"
-            data = response.get("data", {})
-            model_used = response.get("model_used", "unknown")
+            return self._extract_response(response, query_type, student_context)
             
-            # CRITICAL: Post-process ONLY for assessment queries to prevent hallucination
-            if query_type == "assessments":
-                logger.info(f"POST-PROCESSING [assessments]: Removing hallucinated data. Original: {len(message)} chars")
-                message = self._remove_hallucinated_assessments(message, student_context)
-                logger.info(f"POST-PROCESSING [assessments]: Clean message: {len(message)} chars")
-            else:
-                logger.info(f"QUERY TYPE [{query_type}]: No post-processing needed. Message: {len(message)} chars")
+        except Exception as e:
+            logger.error(f"Error processing query: {e}")
+            raise
+    
+    async def process_query_async(self, student_id: int, query: str, student_context: Dict[str, Any], 
+                                  student_email: Optional[str] = None, student_name: Optional[str] = None,
+                                  conversation_history: List[Dict] = None,
+                                  query_embedding: List[float] = None, prefetched: Optional[Tuple] = None,
+                                  timings: Optional[StageTimings] = None) -> Tuple[str, Dict[str, Any], str, str]:
+        """
+        Async variant of process_query used by the /chat endpoint
+        The OpenRouter round trip is awaited on the pooled async client, the query is embedded on
+        the batching embedder and the blocking vector search runs in the default executor,
+        so the event loop stays free
+        query_embedding: embedding already computed for the cache lookup, reused for vector search
+        prefetched: prefetch_async() result, already run concurrently with the student context fetch
+        timings: receives the llm stage duration
+        Returns: (message, data, query_type, model_used)
+        """
+        if self.async_openrouter_client is None:
+            # No async client configured - keep the loop free by running the sync path in a thread
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                None,
+                lambda: self.process_query(student_id, query, student_context,
+                                           student_email, student_name, conversation_history)
+            )
+        
+        try:
+            # 1. Classify query type
+            query_type = self._classify_query(query)
+            logger.info(f"Query classified as: {query_type}")
+            
+            # 1a. Deterministic query types come straight from the student context
+            templated = self.templated_responder.respond(query_type, query, student_context, student_name)
+            if templated is not None:
+                return templated[0], templated[1], query_type, TEMPLATED_MODEL
+            
+            # 1b/2. Topic pre-filter decision and vector search for relevant knowledge (RAG component)
+            if prefetched is None:
+                prefetched = await self.prefetch_async(query, query_type, query_embedding)
+            _, topic_decision, retrieved_docs = prefetched
             
-            return message, data, query_type, model_used
+            # Answer confidently off-topic/unclear queries from templates (no LLM call)
+            shortcut = self._topic_shortcut(query, topic_decision, student_context)
+            if shortcut is not None:
+                return shortcut
+            
+            # 3. Build enhanced prompt with retrieved knowledge + conversation history
+            prompt_messages = self._build_enhanced_prompt(
+                query, student_context, query_type, 
+                student_name, student_email,
+                retrieved_docs, conversation_history or []
+            )
+            
+            # 4. Call OpenRouter API with fallback (non-blocking, hedged for selected query types)
+            with (timings or StageTimings()).measure("llm"):
+                response = await self.async_openrouter_client.call_with_fallback(
+                    prompt_messages, strategy=self._fallback_strategy(query_type)
+                )
+            
+            # 5. Extract message and data
+            return self._extract_response(response, query_type, student_context)
             
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             raise
     
-    def _classify_query(self, query: str) -> str:
+    async def stream_query_async(self, student_id: int, query: str, student_context: Dict[str, Any],
+                                 student_email: Optional[str] = None, student_name: Optional[str] = None,
+                                 conversation_history: List[Dict] = None,
+                                 query_embedding: List[float] = None, prefetched: Optional[Tuple] = None,
+                                 timings: Optional[StageTimings] = None) -> AsyncIterator[Dict[str, Any]]:
         """
-        Classify the type of query based on keywords
+        Streaming variant of process_query_async used by the /chat/stream endpoint
+        Yields {"type": "token", "content": ...} events as OpenRouter produces them, then a single
+        {"type": "done", "message", "data", "query_type", "model_used"} event
         """
-        query_lower = query.lower().strip()
-        
-        # OFF-TOPIC / IRRELEVANT queries (check FIRST to redirect students)
-        off_topic_keywords = {
-            'entertainment': ['game', 'gaming', 'video game', 'pubg', 'fortnite', 'minecraft', 'valorant', 'cod', 'gta', 'fifa', 'movie', 'film', 'netflix', 'series', 'tv show', 'youtube', 'tiktok', 'instagram', 'facebook', 'social media', 'twitter', 'music', 'song', 'spotify'],
-            'personal': ['love', 'girlfriend', 'boyfriend', 'dating', 'relationship', 'crush', 'romance', 'marriage', 'wedding'],
-            'sports': ['cricket', 'football', 'soccer', 'basketball', 'ipl', 'world cup', 'match', 'player', 'team sport'],
-            'random': ['weather', 'food', 'recipe', 'cooking', 'travel', 'vacation', 'holiday', 'party', 'shopping', 'fashion', 'celebrity', 'gossip']
+        # 1. Classify query type
+        query_type = self._classify_query(query)
+        logger.info(f"Query classified as: {query_type} (streaming)")
+        
+        # 1a. Deterministic query types come straight from the student context; assessment answers
+        # are always rebuilt from the database context (streamed tokens can't be post-processed)
+        templated = self.templated_responder.respond(query_type, query, student_context, student_name)
+        if templated is None and query_type == "assessments":
+            templated = (self._remove_hallucinated_assessments("", student_context), {})
+        if templated is not None:
+            message, data = templated
+            yield {"type": "token", "content": message}
+            yield {"type": "done", "message": message, "data": data, "query_type": query_type, "model_used": TEMPLATED_MODEL}
+            return
+        
+        # 1b/2. Topic pre-filter decision and vector search for relevant knowledge (RAG component)
+        if prefetched is None:
+            prefetched = await self.prefetch_async(query, query_type, query_embedding)
+        _, topic_decision, retrieved_docs = prefetched
+        
+        # Answer confidently off-topic/unclear queries from templates (no LLM call)
+        shortcut = self._topic_shortcut(query, topic_decision, student_context)
+        if shortcut is not None:
+            message, data, query_type, model_used = shortcut
+            yield {"type": "token", "content": message}
+            yield {"type": "done", "message": message, "data": data, "query_type": query_type, "model_used": model_used}
+            return
+        
+        # 3. Build enhanced prompt with retrieved knowledge + conversation history
+        prompt_messages = self._build_enhanced_prompt(
+            query, student_context, query_type,
+            student_name, student_email,
+            retrieved_docs, conversation_history or []
+        )
+        
+        # 4. Stream tokens from OpenRouter as they arrive
+        parts = []
+        model_used = "unknown"
+        with (timings or StageTimings()).measure("llm"):
+            async for model, delta in self.async_openrouter_client.stream_with_fallback(prompt_messages):
+                model_used = model
+                parts.append(delta)
+                yield {"type": "token", "content": delta}
+        
+        message = "".join(parts) or "No response generated"
+        logger.info(f"QUERY TYPE [{query_type}]: Streamed {len(parts)} chunks, {len(message)} chars")
+        yield {"type": "done", "message": message, "data": {}, "query_type": query_type, "model_used": model_used}
+    
+    def _fallback_strategy(self, query_type: str) -> str:
+        """
+        Pick the call_with_fallback strategy for a query type
+        Greetings and acknowledgments are never hedged
+        """
+        if query_type in ("greeting", "acknowledgment"):
+            return "sequential"
+        return "hedged" if query_type in self.hedge_query_types else "sequential"
+    
+    def _use_topic_filter(self, query_type: str) -> bool:
+        return (self.topic_filter is not None and self.topic_filter.ready and self.vector_store is not None
+                and query_type in self.topic_filter_query_types)
+    
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        try:
+            return self.vector_store.embed_query(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed: {e}")
+            return None
+    
+    async def _embed_query_async(self, query: str) -> Optional[List[float]]:
+        """
+        Embedding for the topic pre-filter, reused for vector search (None if encoding fails)
+        """
+        try:
+            return await self.vector_store.embed_query_async(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed: {e}")
+            return None
+    
+    def _topic_decision(self, query_type: str, query_embedding: Optional[List[float]]) -> Optional[Tuple[str, str, float]]:
+        """
+        TopicClassifier.decide() for query types the pre-filter may overrule (None otherwise)
+        """
+        if query_embedding is None or not self._use_topic_filter(query_type):
+            return None
+        return self.topic_filter.decide(query_embedding)
+    
+    def _topic_shortcut(self, query: str, decision: Optional[Tuple[str, str, float]],
+                        student_context: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any], str, str]]:
+        """
+        Redirect/clarification template for a query the topic pre-filter is confident about
+        Returns: (message, data, query_type, model_used), or None to answer with the LLM as usual
+        """
+        if decision is None:
+            return None
+        
+        kind, label, similarity = decision
+        logger.info(f"TOPIC FILTER: {kind} ({label}, similarity {similarity:.2f}) - skipping the LLM")
+        data = {
+            'similarity': round(similarity, 3),
+            'suggestions': self.intelligent_cutoff.get_study_suggestions(student_context),
+            'original_query': query
         }
+        if kind == "unclear":
+            message = self.intelligent_cutoff.generate_clarification_message(query, student_context)
+            return message, {'unclear_query': True, **data}, "unclear_redirect", TOPIC_FILTER_MODEL
+        message = self.intelligent_cutoff.generate_redirect_message(query, label, student_context)
+        return message, {'off_topic': True, 'category': label, **data}, "off_topic", TOPIC_FILTER_MODEL
+    
+    def _retrieve_documents(self, query: str, query_embedding: List[float] = None) -> List[str]:
+        """
+        Search vector database for relevant knowledge (RAG component)
+        """
+        retrieved_docs = []
+        if self.vector_store:
+            try:
+                search_results = self.vector_store.search(query, n_results=3, query_embedding=query_embedding)
+                retrieved_docs = search_results['documents'][0] if search_results['documents'] else []
+                if retrieved_docs:
+                    logger.info(f"Retrieved {len(retrieved_docs)} relevant documents from knowledge base")
+            except Exception as e:
+                logger.warning(f"Vector search failed: {e}")
+        return retrieved_docs
+    
+    async def prefetch_async(self, query: str, query_type: str, query_embedding: List[float] = None,
+                             timings: Optional[StageTimings] = None) -> Optional[Tuple]:
+        """
+        Retrieval stage of the async paths; needs no student context, so /chat runs it concurrently
+        with the database fetch: the query is encoded on the vector store's batching embedder, the
+        topic pre-filter decides on that embedding and, unless it short-circuits, the blocking
+        collection search runs in the default executor
+        Returns: (query_embedding, topic_decision, retrieved_docs), or None for templated query types
+        """
+        if self.templated_responder.handles(query_type, query):
+            return None
+        if self.vector_store is None:
+            return query_embedding, None, []
+        timings = timings or StageTimings()
+        if query_embedding is None:
+            with timings.measure("embed"):
+                query_embedding = await self._embed_query_async(query)
+            if query_embedding is None:
+                return None, None, []
+        
+        topic_decision = self._topic_decision(query_type, query_embedding)
+        if topic_decision is not None:
+            return query_embedding, topic_decision, []
+        with timings.measure("search"):
+            loop = asyncio.get_event_loop()
+            retrieved_docs = await loop.run_in_executor(None, self._retrieve_documents, query, query_embedding)
+        return query_embedding, None, retrieved_docs
+    
+    def _extract_response(self, response: Dict[str, Any], query_type: str,
+                          student_context: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str, str]:
+        """
+        Extract message and data from an OpenRouter response
+        Returns: (message, data, query_type, model_used)
+        """
+        message = response["choices"][0]["message"]["content"] if response.get("choices") else "No response generated"
+        data = response.get("data", {})
+        model_used = response.get("model_used", "unknown")
         
-        for category, keywords in off_topic_keywords.items():
-            if any(keyword in query_lower for keyword in keywords):
-                # Avoid false positives with placement/career terms
-                if not any(career_term in query_lower for career_term in ["placement", "career", "job", "interview", "skill", "learning", "study"]):
-                    return "off_topic"
-        
-        # Greeting queries (should be checked SECOND)
-        greeting_keywords = ["hi", "hello", "hey", "good morning", "good afternoon", "good evening", "greetings", "yo", "sup", "hola"]
-        # Check if it's JUST a greeting (short message, no other keywords)
-        if any(greeting == query_lower or query_lower.startswith(greeting + " ") or query_lower.startswith(greeting + "!") for greeting in greeting_keywords):
-            # Only classify as greeting if it doesn't contain data request keywords
-            if not any(keyword in query_lower for keyword in ["assessment", "test", "exam", "result", "score", "available", "show", "what", "when", "where", "how"]):
-                return "greeting"
-        
-        # Assessment-related queries (must be before "what" check)
-        if any(keyword in query_lower for keyword in ["assessment", "test", "exam", "quiz", "available", "pending", "take test", "start test"]):
-            return "assessments"
-        
-        # Results-related queries
-        if any(keyword in query_lower for keyword in ["result", "score", "grade", "performance", "pass", "fail", "mark", "marks", "percentage"]):
-            return "results"
-        
-        # Help/How-to queries  
-        if any(keyword in query_lower for keyword in ["how to", "how do", "how can", "guide", "tutorial", "instructions", "steps to"]):
-            return "help"
-        
-        # Name change requests (check before general profile)
-        if any(keyword in query_lower for keyword in ["change my name", "update my name", "rename me", "my name is", "call me", "change name to", "update name to"]):
-            return "name_change"
-        
-        # Profile/Account queries
-        if any(keyword in query_lower for keyword in ["profile", "account", "password", "email", "settings", "update profile"]):
-            return "profile"
-        
-        # General information queries (what/when/where/who/why)
-        if any(keyword in query_lower for keyword in ["what is", "what are", "when is", "when are", "where is", "where are", "who is", "why is", "explain"]):
-            return "general"
-        
-        # Thank you / feedback
-        if any(keyword in query_lower for keyword in ["thank", "thanks", "appreciate", "helpful", "good", "great", "awesome"]):
-            return "acknowledgment"
-        
-        # Default to general for anything else
-        return "general"
+        # CRITICAL: Post-process ONLY for assessment queries to prevent hallucination
+        if query_type == "assessments":
+            logger.info(f"POST-PROCESSING [assessments]: Removing hallucinated data. Original: {len(message)} chars")
+            message = self._remove_hallucinated_assessments(message, student_context)
+            logger.info(f"POST-PROCESSING [assessments]: Clean message: {len(message)} chars")
+        else:
+            logger.info(f"QUERY TYPE [{query_type}]: No post-processing needed. Message: {len(message)} chars")
+        
+        return message, data, query_type, model_used
+    
+    def classify_query(self, query: str) -> str:
+        """
+        Classify a query up front (used by main for cache lookups before the context is loaded)
+        """
+        return self._classify_query(query)
+    
+    def _classify_query(self, query: str) -> str:
+        """
+        Classify the type of query based on keywords
+        Rules and their priority live in query_classifier.CLASSIFICATION_RULES (compiled once)
+        """
+        return self.query_classifier.classify(query)
     
     def _build_prompt(self, query: str, context: Dict[str, Any], query_type: str, 
                      student_name: Optional[str] = None, student_email: Optional[str] = None) -> List[Dict[str, str]]:
@@ -146,43 +375,59 @@ class ContextHandler:
                                retrieved_docs: List[str], conversation_history: List[Dict]) -> List[Dict[str, str]]:
         """
         Build enhanced prompt with RAG-retrieved knowledge and conversation history
+        With a prompt budget, history and documents are trimmed to fit and the token breakdown is logged
         """
         # Build base system prompt
         system_prompt = self._build_system_prompt(context, student_name, student_email)
         
+        # Build user prompt
+        user_prompt = self._build_user_prompt(query, context, query_type)
+        
+        # Ensure history is properly formatted
+        valid_history = [msg for msg in (conversation_history or [])
+                         if isinstance(msg, dict) and 'role' in msg and 'content' in msg]
+        
+        if self.prompt_budget is not None:
+            retrieved_docs, history, breakdown = self.prompt_budget.allocate(
+                system_prompt, user_prompt, retrieved_docs or [], valid_history,
+                format_knowledge=self._format_knowledge_section
+            )
+            logger.info(f"Prompt tokens [{query_type}]: system={breakdown['system']} knowledge={breakdown['knowledge']} "
+                        f"history={breakdown['history']} user={breakdown['user']} total={breakdown['total']} "
+                        f"(dropped {breakdown['documents_dropped']} docs, {breakdown['history_dropped']} history messages)")
+        else:
+            # Truncate very long documents, keep the last 5 conversation turns (10 messages max)
+            retrieved_docs = [doc[:500] for doc in retrieved_docs or []]
+            history = valid_history[-10:]
+        
         # Add retrieved knowledge to system prompt (RAG component)
         if retrieved_docs:
-            knowledge_section = "\n\n" + "="*60 + "\n"
-            knowledge_section += "RELEVANT KNOWLEDGE BASE (Use this to answer questions):\n"
-            knowledge_section += "="*60 + "\n"
-            for idx, doc in enumerate(retrieved_docs, 1):
-                # Truncate very long documents
-                doc_preview = doc[:500] if len(doc) > 500 else doc
-                knowledge_section += f"\n[Document {idx}]:\n{doc_preview}\n"
-            knowledge_section += "="*60 + "\n"
-            system_prompt += knowledge_section
+            system_prompt += self._format_knowledge_section(retrieved_docs)
             logger.info(f"Added {len(retrieved_docs)} knowledge documents to prompt")
         
-        # Build user prompt
-        user_prompt = self._build_user_prompt(query, context, query_type)
-        
         # Construct messages with conversation history
         messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add last 5 conversation turns (10 messages max) for context
-        if conversation_history:
-            # Ensure history is properly formatted
-            valid_history = [msg for msg in conversation_history 
-                           if isinstance(msg, dict) and 'role' in msg and 'content' in msg]
-            if valid_history:
-                messages.extend(valid_history[-10:])
-                logger.info(f"Added {len(valid_history[-10:])} conversation history messages")
+        if history:
+            messages.extend(history)
+            logger.info(f"Added {len(history)} conversation history messages")
         
         # Add current query
         messages.append({"role": "user", "content": user_prompt})
         
         return messages
     
+    def _format_knowledge_section(self, retrieved_docs: List[str]) -> str:
+        """
+        Knowledge base section appended to the system prompt
+        """
+        knowledge_section = "\n\n" + "="*60 + "\n"
+        knowledge_section += "RELEVANT KNOWLEDGE BASE (Use this to answer questions):\n"
+        knowledge_section += "="*60 + "\n"
+        for idx, doc in enumerate(retrieved_docs, 1):
+            knowledge_section += f"\n[Document {idx}]:\n{doc}\n"
+        knowledge_section += "="*60 + "\n"
+        return knowledge_section
+    
     def _build_system_prompt(self, context: Dict[str, Any], student_name: Optional[str] = None, student_email: Optional[str] = None) -> str:
         """
         Build system prompt with student information and portal context
@@ -381,9 +626,13 @@ Focus: Answer the question using available context.
         
         # Available assessments (only show what student hasn't taken)
         if 'available_assessments' in context and context['available_assessments']:
+            assessments = context['available_assessments']
+            limit = self.prompt_budget.max_assessments if self.prompt_budget is not None else len(assessments)
             formatted_context.append("\nAvailable Assessments (Not Yet Taken):")
-            for i, assessment in enumerate(context['available_assessments'], 1):
+            for i, assessment in enumerate(assessments[:limit], 1):
                 formatted_context.append(f"  {i}. {assessment.get('title', 'N/A')} ({assessment.get('category', 'General')}) - {assessment.get('total_time', 30)} minutes")
+            if len(assessments) > limit:
+                formatted_context.append(f"  ... and {len(assessments) - limit} more (total: {len(assessments)} available)")
         elif 'available_assessments' in context:
             formatted_context.append("\nAvailable Assessments: None available (all completed or none active)")
         
@@ -432,23 +681,10 @@ Focus: Answer the question using available context.
         
         # If we have assessments, build a clean response
         if available_assessments:
-            clean_message = f"You have {len(available_assessments)} assessment"
-            clean_message += "s" if len(available_assessments) > 1 else ""
-            clean_message += " available:\n\n"
-            
-            for assessment in available_assessments:
-                name = assessment.get('title', 'Unknown')
-                category = assessment.get('category', 'General')
-                duration = assessment.get('total_time', 30)
-                clean_message += f"📝 **{name}** ({category})\n"
-                clean_message += f"   • Duration: {duration} minutes\n\n"
-            
-            clean_message += "Ready to start? Click 'View Assessments' to begin!"
             logger.info(f"ANTI-HALLUCINATION: Built clean response with {len(available_assessments)} real assessments")
-            return clean_message
         else:
             logger.info("ANTI-HALLUCINATION: No assessments available, returning empty message")
-            return "You have no assessments available at the moment. All assessments have been completed or none are currently active."
+        return available_assessments_message(context)
     
     def _extract_new_name(self, query: str) -> Optional[str]:
         """
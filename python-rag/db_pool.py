@@ -0,0 +1,328 @@
+"""
+PostgreSQL Connection Pool
+Shared, bounded psycopg2 connection pool for KnowledgeSync, IncrementalSync and the health check
+Avoids a fresh TLS handshake to Supabase on every /chat request
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Optional, Callable
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be acquired within the acquisition timeout"""
+
+
+class PostgresPool:
+    """
+    Bounded, thread-safe psycopg2 connection pool
+    - At most max_size connections are open at once
+    - Connections older than max_lifetime seconds are closed and replaced
+    - Connections idle for longer than health_check_after seconds are checked with SELECT 1 before reuse
+    - Waiting longer than acquire_timeout seconds raises PoolTimeout
+    """
+
+    def __init__(self, db_host: str, db_port: str, db_name: str, db_user: str, db_password: str,
+                 min_size: int = 1, max_size: int = 10, max_lifetime: float = 1800.0,
+                 max_idle: float = 300.0, health_check_after: float = 30.0,
+                 acquire_timeout: float = 5.0, connect_timeout: int = 5,
+                 connect: Optional[Callable] = None):
+        self.connect_kwargs = {
+            "host": db_host,
+            "port": db_port,
+            "database": db_name,
+            "user": db_user,
+            "password": db_password,
+            "connect_timeout": connect_timeout
+        }
+        self.connect = connect or psycopg2.connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = deque()  # (conn, last_used)
+        self._created_at: Dict[int, float] = {}
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Metrics
+        self.acquisitions = 0
+        self.acquire_timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.health_check_failures = 0
+
+    def _connect(self):
+        """Open a new physical connection"""
+        conn = self.connect(**self.connect_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        self.connections_created += 1
+        logger.debug(f"Opened PostgreSQL connection ({self._size}/{self.max_size})")
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection and free its slot (caller holds the lock)"""
+        self._created_at.pop(id(conn), None)
+        self._sessions.pop(id(conn), None)
+        self._size -= 1
+        self.connections_closed += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._cond.notify()
+
+    def _expired(self, conn, now: float) -> bool:
+        return now - self._created_at.get(id(conn), now) >= self.max_lifetime
+
+    def _healthy(self, conn) -> bool:
+        """Cheap liveness probe for a connection that has been idle a while"""
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            self.health_check_failures += 1
+            logger.warning(f"Discarding unhealthy pooled connection: {e}")
+            return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Get a connection from the pool, opening a new one if below max_size
+        Raises PoolTimeout if none becomes available within the timeout
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            conn = None
+            needs_check = False
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+
+                now = time.monotonic()
+                while self._idle:
+                    candidate, last_used = self._idle.pop()  # LIFO keeps hot connections hot
+                    if candidate.closed or self._expired(candidate, now):
+                        self._discard(candidate)
+                        continue
+                    conn = candidate
+                    needs_check = now - last_used >= self.health_check_after
+                    break
+
+                if conn is None and self._size < self.max_size:
+                    # Reserve a slot, connect outside the lock
+                    self._size += 1
+                elif conn is None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.acquire_timeouts += 1
+                        raise PoolTimeout(f"Timed out after {timeout}s waiting for a PostgreSQL connection "
+                                          f"({self._size}/{self.max_size} in use)")
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif needs_check and not self._healthy(conn):
+                with self._cond:
+                    self._discard(conn)
+                continue
+
+            wait = time.monotonic() - start
+            with self._cond:
+                self.acquisitions += 1
+                self.total_wait_time += wait
+                self.max_wait_time = max(self.max_wait_time, wait)
+            return conn
+
+    def release(self, conn, discard: bool = False):
+        """
+        Return a connection to the pool
+        Any open transaction is rolled back; broken or expired connections are closed
+        """
+        with self._cond:
+            if id(conn) not in self._created_at:
+                return
+            if discard or self._closed or conn.closed or self._expired(conn, time.monotonic()):
+                self._discard(conn)
+                return
+
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except Exception:
+            with self._cond:
+                self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def session(self, conn) -> Dict[str, Any]:
+        """
+        Per-connection state that lives as long as the physical connection
+        (e.g. which prepared statements exist on it); cleared when the connection is closed
+        """
+        with self._cond:
+            return self._sessions.setdefault(id(conn), {})
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Context manager that acquires a connection and always returns it
+        Connections that raised a database error are discarded instead of reused
+        """
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def prune_idle(self):
+        """Close idle connections above min_size that have been idle longer than max_idle"""
+        with self._cond:
+            now = time.monotonic()
+            keep = deque()
+            while self._idle:
+                conn, last_used = self._idle.popleft()
+                if self._size > self.min_size and now - last_used >= self.max_idle:
+                    self._discard(conn)
+                else:
+                    keep.append((conn, last_used))
+            self._idle = keep
+
+    def check(self) -> bool:
+        """
+        Health check: acquire a connection and run SELECT 1
+        Also prunes connections that have sat idle beyond max_idle
+        """
+        self.prune_idle()
+        try:
+            with self.connection(timeout=min(self.acquire_timeout, 2.0)) as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            return True
+        except Exception as e:
+            logger.warning(f"Database health check failed: {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool size and acquisition metrics
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "acquisitions": self.acquisitions,
+                "acquire_timeouts": self.acquire_timeouts,
+                "avg_wait_ms": round(self.total_wait_time / self.acquisitions * 1000, 2) if self.acquisitions else 0.0,
+                "max_wait_ms": round(self.max_wait_time * 1000, 2),
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "health_check_failures": self.health_check_failures
+            }
+
+    def close(self):
+        """Close all idle connections and refuse new acquisitions"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._discard(conn)
+            self._cond.notify_all()
+        logger.info("PostgreSQL connection pool closed")
+
+
+class AsyncPostgresPool:
+    """
+    Asyncio front-end for PostgresPool
+    Acquisition waits and queries run in the default executor so the event loop is never blocked
+    A cancelled caller (e.g. a disconnected client) never leaks a connection or returns one to the
+    pool while a worker thread is still using it
+    """
+
+    def __init__(self, pool: PostgresPool):
+        self.pool = pool
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None):
+        """
+        Async context manager yielding a pooled psycopg2 connection
+        The connection goes back to the pool when the block exits, so blocking work on it should
+        finish inside the block; prefer run(), which keeps the query and release in one thread
+        """
+        loop = asyncio.get_event_loop()
+        acquiring = loop.run_in_executor(None, self.pool.acquire, timeout)
+        try:
+            conn = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker thread may still get a connection after we stop waiting; give it back then
+            acquiring.add_done_callback(self._release_abandoned)
+            raise
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            # Submitted before any await, so the release happens even if this task is cancelled
+            await asyncio.shield(loop.run_in_executor(None, self.pool.release, conn, broken))
+
+    def _release_abandoned(self, acquiring: "asyncio.Future"):
+        if not acquiring.cancelled() and acquiring.exception() is None:
+            asyncio.get_event_loop().run_in_executor(None, self.pool.release, acquiring.result())
+
+    def _run_sync(self, fn: Callable, args: tuple, timeout: Optional[float]):
+        with self.pool.connection(timeout) as conn:
+            return fn(conn, *args)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        """
+        Run fn(conn, *args) on a pooled connection in the default executor
+        Acquire, query and release happen in one executor call, so cancelling the caller only
+        stops the wait: the worker finishes and returns its connection itself
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._run_sync, fn, args, timeout)
+
+    async def check(self) -> bool:
+        """Async health check"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.pool.check)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.pool.get_stats()
@@ -0,0 +1,130 @@
+"""
+Text Embedders for the RAG System
+Common interface over the PyTorch SentenceTransformer model and an ONNX Runtime
+(int8-quantized) export of the same model for small CPU-only instances
+"""
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_ONNX_PATH = "./models/all-MiniLM-L6-v2-onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+FULL_MODEL_FILE = "model.onnx"
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Average token embeddings over real (non-padding) tokens, as SentenceTransformer's pooling layer does
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+class Embedder(ABC):
+    """
+    Encodes texts into one float32 vector per text
+    """
+    name = "base"
+    dimension = 0
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str], normalize: bool = True, batch_size: int = 32) -> np.ndarray:
+        """Return an (len(texts), dimension) float32 array; normalize=True L2-normalizes each row"""
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """
+    PyTorch SentenceTransformer model (the original embedding path)
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+        logger.info(f"Loading sentence transformer model {model_name}...")
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str], normalize: bool = True, batch_size: int = 32) -> np.ndarray:
+        vectors = self.model.encode(list(texts), normalize_embeddings=normalize, batch_size=batch_size)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OnnxEmbedder(Embedder):
+    """
+    ONNX Runtime export of the same transformer (see export_onnx_embedder.py)
+    - Loads without PyTorch, so the process stays far smaller on CPU-only hosts
+    - Uses the int8 dynamically quantized weights when present
+    - Tokenization, mean pooling and normalization match SentenceTransformer's pipeline
+    """
+
+    def __init__(self, model_dir: str = DEFAULT_ONNX_PATH, quantized: bool = True, max_length: int = 256,
+                 threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else FULL_MODEL_FILE)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"{model_file} not found; run export_onnx_embedder.py first")
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+        self.name = f"{os.path.basename(os.path.normpath(model_dir))} (onnx{', int8' if quantized else ''})"
+        logger.info(f"Loaded ONNX embedding model {model_file}")
+
+    def encode(self, texts: Sequence[str], normalize: bool = True, batch_size: int = 32) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        batches: List[np.ndarray] = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": attention_mask,
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            token_embeddings = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+            batches.append(mean_pool(token_embeddings, attention_mask))
+
+        vectors = np.vstack(batches).astype(np.float32)
+        return l2_normalize(vectors) if normalize else vectors
+
+
+def create_embedder(backend: Optional[str] = None, model_name: Optional[str] = None,
+                    onnx_path: Optional[str] = None) -> Embedder:
+    """
+    Build the configured embedder
+    EMBEDDING_BACKEND: sentence-transformers (default), onnx (int8-quantized) or onnx-fp32
+    """
+    backend = (backend or os.getenv('EMBEDDING_BACKEND', 'sentence-transformers')).lower()
+    if backend in ("onnx", "onnx-int8", "onnx-fp32"):
+        return OnnxEmbedder(
+            onnx_path or os.getenv('EMBEDDING_ONNX_PATH', DEFAULT_ONNX_PATH),
+            quantized=backend != "onnx-fp32",
+            threads=int(os.getenv('EMBEDDING_THREADS', 0)) or None
+        )
+    if backend in ("sentence-transformers", "torch"):
+        return SentenceTransformerEmbedder(model_name or os.getenv('EMBEDDING_MODEL', DEFAULT_MODEL))
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'")
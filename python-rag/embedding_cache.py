@@ -0,0 +1,92 @@
+"""
+Query Embedding Cache
+LRU of normalized query text -> float32 embedding, so repeated questions
+("what assessments are available") are not re-encoded on every request
+"""
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a query: lowercased with whitespace collapsed
+    all-MiniLM-L6-v2 uses an uncased tokenizer, so this does not change the embedding
+    """
+    return WHITESPACE.sub(" ", query.strip().lower())
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU bounded by entry count and by the bytes of the stored vectors
+    Vectors are kept as read-only float32 arrays (1.5 KB each for 384 dimensions)
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, embedding) -> np.ndarray:
+        """
+        Store an embedding and return the compact array that was cached
+        """
+        vector = np.array(embedding, dtype=np.float32).reshape(-1)
+        vector.setflags(write=False)
+        if vector.nbytes > self.max_bytes:
+            return vector
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self._entries[key] = vector
+            self.bytes += vector.nbytes
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) * 100 if total else 0.0,
+                "evictions": self.evictions
+            }
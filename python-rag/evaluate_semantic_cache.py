@@ -0,0 +1,108 @@
+"""
+Offline Evaluation for the Semantic Response Cache
+Replays a labelled query log through SemanticCache and reports hit rate and precision
+per similarity threshold. Each log line is {"query": ..., "intent": ...}; a hit is correct
+when the cached query has the same intent (i.e. its answer would have been right)
+
+Usage:
+    python evaluate_semantic_cache.py
+    python evaluate_semantic_cache.py --log my_queries.jsonl --thresholds 0.85 0.9 0.95 --show-hits
+"""
+import argparse
+import json
+from typing import Any, Dict, List
+
+from context_handler import ContextHandler
+from embedder import create_embedder
+from response_cache import ResponseCache
+from semantic_cache import SemanticCache
+
+
+def load_log(path: str) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def embed_all(queries: List[str], backend: str = None):
+    """Embed every query once with the same embedder VectorStore uses"""
+    return create_embedder(backend).encode(queries, batch_size=64)
+
+
+def replay(log: List[Dict[str, str]], embeddings, threshold: float, show_hits: bool = False) -> Dict[str, Any]:
+    """
+    Replay the log in order: look each cacheable query up, cache it on a miss
+    Exact repeats are served by the exact-match keyspace and reported separately
+    """
+    classifier = ContextHandler(openrouter_client=None)
+    response_cache = ResponseCache()
+    cache = SemanticCache(dimension=embeddings.shape[1], threshold=threshold, ttl_seconds=10 ** 9,
+                          max_entries=max(len(log), 1))
+    exact = {}
+    seen_intents = set()
+
+    stats = {"queries": len(log), "cacheable": 0, "exact_hits": 0, "semantic_hits": 0,
+             "correct_hits": 0, "answerable": 0}
+    for entry, embedding in zip(log, embeddings):
+        query, intent = entry["query"], entry["intent"]
+        query_type = classifier.classify_query(query)
+        if not (response_cache.should_cache(query, query_type) and response_cache.is_shared(query_type)):
+            continue
+        stats["cacheable"] += 1
+
+        normalized = query.lower().strip()
+        if normalized in exact:
+            stats["exact_hits"] += 1
+            continue
+
+        # A paraphrase could have been answered from cache only if its intent was seen before
+        stats["answerable"] += intent in seen_intents
+        match = cache.lookup(query, embedding, query_type)
+        if match is not None:
+            cached_intent, similarity, cached_query = match[0]["intent"], match[1], match[2]
+            stats["semantic_hits"] += 1
+            stats["correct_hits"] += cached_intent == intent
+            if show_hits:
+                mark = "ok " if cached_intent == intent else "BAD"
+                print(f"  [{mark}] {similarity:.3f}  '{query}' ~ '{cached_query}'")
+            continue
+
+        cache.add(query, embedding, query_type, {"intent": intent})
+        exact[normalized] = intent
+        seen_intents.add(intent)
+
+    lookups = stats["cacheable"] - stats["exact_hits"]
+    stats["semantic_hit_rate"] = stats["semantic_hits"] / lookups if lookups else 0.0
+    stats["precision"] = stats["correct_hits"] / stats["semantic_hits"] if stats["semantic_hits"] else 1.0
+    stats["recall"] = stats["correct_hits"] / stats["answerable"] if stats["answerable"] else 0.0
+    stats["guard_rejections"] = cache.guard_rejections
+    return stats
+
+
+def main(args):
+    log = load_log(args.log)
+    print(f"Embedding {len(log)} queries...")
+    embeddings = embed_all([entry["query"] for entry in log], args.backend)
+
+    print("=" * 88)
+    print(f"{'threshold':>9} | {'cacheable':>9} | {'exact':>5} | {'semantic':>8} | "
+          f"{'hit rate':>8} | {'precision':>9} | {'recall':>6} | {'guarded':>7}")
+    print("=" * 88)
+    for threshold in args.thresholds:
+        if args.show_hits:
+            print(f"threshold {threshold}:")
+        stats = replay(log, embeddings, threshold, args.show_hits)
+        print(f"{threshold:>9.2f} | {stats['cacheable']:>9} | {stats['exact_hits']:>5} | {stats['semantic_hits']:>8} | "
+              f"{stats['semantic_hit_rate']:>7.1%} | {stats['precision']:>8.1%} | {stats['recall']:>5.1%} | "
+              f"{stats['guard_rejections']:>7}")
+    print("=" * 88)
+    print("hit rate: semantic hits / non-exact cacheable lookups; precision: hits with the right intent;")
+    print("recall: right hits / lookups whose intent had already been answered")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the semantic response cache on a replayed query log")
+    parser.add_argument("--log", default="semantic_cache_eval_queries.jsonl", help="JSONL query log with query and intent")
+    parser.add_argument("--backend", default=None, help="EMBEDDING_BACKEND override (default: same as VectorStore)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.85, 0.9, 0.93, 0.95])
+    parser.add_argument("--show-hits", action="store_true", help="Print every semantic hit")
+    main(parser.parse_args())
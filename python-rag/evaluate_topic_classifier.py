@@ -0,0 +1,128 @@
+"""
+Offline Evaluation for the Embedding Topic Pre-filter
+Trains TopicClassifier on the labelled training file, replays a held-out labelled set through the
+same path /chat uses (keyword query type first, then the pre-filter for TOPIC_FILTER_QUERY_TYPES)
+and reports precision/recall of the off-topic and unclear short-circuits, on-topic queries wrongly
+redirected and the fraction of LLM calls avoided per threshold, next to the keyword IntelligentCutoff
+
+Usage:
+    python evaluate_topic_classifier.py
+    python evaluate_topic_classifier.py --backend onnx --similarities 0.4 0.5 0.6 --margins 0 0.05 0.1 --show-errors
+"""
+import argparse
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from context_handler import ContextHandler, DEFAULT_TOPIC_FILTER_QUERY_TYPES
+from embedder import create_embedder
+from embedding_cache import normalize_query
+from intelligent_cutoff import IntelligentCutoff
+from topic_classifier import OFF_TOPIC_LABELS, UNCLEAR_LABEL, TopicClassifier, load_labelled_queries
+
+
+def truth(label: str) -> Optional[str]:
+    """Short-circuit the query should get: "off_topic", "unclear" or None (on-topic)"""
+    if label in OFF_TOPIC_LABELS:
+        return "off_topic"
+    return "unclear" if label == UNCLEAR_LABEL else None
+
+
+def score(expected: List[Optional[str]], predicted: List[Optional[str]]) -> Dict[str, Any]:
+    result = {}
+    for kind in ("off_topic", "unclear"):
+        true_positive = sum(1 for e, p in zip(expected, predicted) if e == kind and p == kind)
+        predicted_count = sum(1 for p in predicted if p == kind)
+        actual_count = sum(1 for e in expected if e == kind)
+        result[kind] = (true_positive / predicted_count if predicted_count else 0.0,
+                        true_positive / actual_count if actual_count else 0.0)
+    result["wrongly_redirected"] = sum(1 for e, p in zip(expected, predicted) if e is None and p is not None)
+    result["avoided"] = sum(1 for p in predicted if p is not None) / len(predicted)
+    return result
+
+
+def keyword_baseline(queries: List[str]) -> List[Optional[str]]:
+    """What the keyword IntelligentCutoff would short-circuit"""
+    cutoff = IntelligentCutoff()
+    predicted = []
+    for query in queries:
+        is_off_topic, category, relevance = cutoff.is_off_topic(query)
+        if cutoff.is_unclear_query(query, relevance):
+            predicted.append("unclear")
+        else:
+            predicted.append("off_topic" if is_off_topic else None)
+    return predicted
+
+
+def prefilter(classifier: TopicClassifier, queries: List[str], embeddings,
+              query_types: List[str]) -> Tuple[List[Optional[str]], float]:
+    """Pre-filter decisions for the eligible keyword query types, and mean decide() microseconds"""
+    predicted = []
+    elapsed = 0.0
+    for query, embedding, query_type in zip(queries, embeddings, query_types):
+        if query_type not in DEFAULT_TOPIC_FILTER_QUERY_TYPES:
+            predicted.append(None)
+            continue
+        start = time.perf_counter()
+        decision = classifier.decide(embedding)
+        elapsed += time.perf_counter() - start
+        predicted.append(decision[0] if decision else None)
+    return predicted, elapsed / max(len(queries), 1) * 1e6
+
+
+def report(label: str, result: Dict[str, Any], extra: str = ""):
+    off_precision, off_recall = result["off_topic"]
+    unclear_precision, unclear_recall = result["unclear"]
+    print(f"{label:<22} | off-topic P {off_precision:5.0%} R {off_recall:5.0%} | "
+          f"unclear P {unclear_precision:5.0%} R {unclear_recall:5.0%} | "
+          f"on-topic redirected {result['wrongly_redirected']:>3} | LLM calls avoided {result['avoided']:5.0%}{extra}")
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    train = load_labelled_queries(args.train)
+    evaluation = load_labelled_queries(args.eval)
+    embedder = create_embedder(args.backend)
+    train_embeddings = embedder.encode([normalize_query(row['query']) for row in train], batch_size=64)
+    queries = [row['query'] for row in evaluation]
+    eval_embeddings = embedder.encode([normalize_query(query) for query in queries], batch_size=64)
+    expected = [truth(row['label']) for row in evaluation]
+    classifier_rules = ContextHandler(openrouter_client=None)
+    query_types = [classifier_rules.classify_query(query) for query in queries]
+
+    print("=" * 130)
+    print(f"{len(train)} training / {len(evaluation)} evaluation queries "
+          f"({sum(e is not None for e in expected)} off-topic or unclear), embedder {type(embedder).__name__}")
+    print("=" * 130)
+    report("keyword cutoff", score(expected, keyword_baseline(queries)))
+    best = None
+    for similarity in args.similarities:
+        for margin in args.margins:
+            classifier = TopicClassifier(min_similarity=similarity, min_margin=margin)
+            classifier.fit(train_embeddings, [row['label'] for row in train])
+            predicted, decide_us = prefilter(classifier, queries, eval_embeddings, query_types)
+            result = score(expected, predicted)
+            report(f"sim>={similarity:.2f} margin>={margin:.2f}", result, f" | {decide_us:5.1f} us/query")
+            if result["wrongly_redirected"] == 0 and (best is None or result["avoided"] > best[0]):
+                best = (result["avoided"], similarity, margin, predicted)
+    print("=" * 130)
+    if best is None:
+        print("Every setting redirected an on-topic query; raise the similarity or margin")
+        return
+    print(f"Best setting without wrongly redirected on-topic queries: TOPIC_FILTER_MIN_SIMILARITY={best[1]} "
+          f"TOPIC_FILTER_MIN_MARGIN={best[2]} ({best[0]:.0%} of LLM calls avoided)")
+    if args.show_errors:
+        for row, e, p in zip(evaluation, expected, best[3]):
+            if e != p:
+                print(f"  {row['label']:<14} -> {p or 'llm':<10} {row['query']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the embedding topic pre-filter")
+    parser.add_argument("--train", default="topic_training_queries.jsonl", help="JSONL of {\"query\", \"label\"}")
+    parser.add_argument("--eval", default="topic_eval_queries.jsonl", help="Held-out JSONL of {\"query\", \"label\"}")
+    parser.add_argument("--backend", default=None, help="EMBEDDING_BACKEND (sentence-transformers, onnx, onnx-fp32)")
+    parser.add_argument("--similarities", type=float, nargs="+", default=[0.3, 0.4, 0.5, 0.6])
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.0, 0.05, 0.1])
+    parser.add_argument("--show-errors", action="store_true", help="List misrouted queries for the best setting")
+    main(parser.parse_args())
@@ -0,0 +1,53 @@
+"""
+Export the Embedding Model to ONNX
+Writes model.onnx, an int8 dynamically quantized model_quantized.onnx and tokenizer.json
+for EMBEDDING_BACKEND=onnx. Run once on a machine with PyTorch; the service then only
+needs onnxruntime and tokenizers
+
+Usage:
+    python export_onnx_embedder.py
+    python export_onnx_embedder.py --model sentence-transformers/all-MiniLM-L6-v2 --output ./models/all-MiniLM-L6-v2-onnx
+"""
+import argparse
+import os
+
+from embedder import DEFAULT_ONNX_PATH, FULL_MODEL_FILE, QUANTIZED_MODEL_FILE
+
+
+def export(model_name: str, output_dir: str, opset: int = 14):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output_dir)  # includes tokenizer.json (fast tokenizer)
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    inputs = (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"])
+    full_path = os.path.join(output_dir, FULL_MODEL_FILE)
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model, inputs, full_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "token_type_ids": dynamic,
+                          "last_hidden_state": dynamic},
+            opset_version=opset
+        )
+    print(f"Exported {full_path} ({os.path.getsize(full_path) / 1e6:.1f} MB)")
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(full_path, quantized_path, weight_type=QuantType.QInt8)
+    print(f"Quantized {quantized_path} ({os.path.getsize(quantized_path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the sentence embedding model to (quantized) ONNX")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="Hugging Face model id")
+    parser.add_argument("--output", default=DEFAULT_ONNX_PATH, help="Output directory (EMBEDDING_ONNX_PATH)")
+    parser.add_argument("--opset", type=int, default=14, help="ONNX opset version")
+    args = parser.parse_args()
+    export(args.model, args.output, args.opset)
@@ -5,21 +5,25 @@ Handles incremental updates to the knowledge base when admin adds/modifies data
 import logging
 from datetime import datetime
 import psycopg2
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from db_pool import PostgresPool
 
 logger = logging.getLogger(__name__)
 
 class IncrementalSync:
-    def __init__(self, db_host: str, db_port: str, db_name: str, db_user: str, db_password: str):
+    def __init__(self, db_host: str, db_port: str, db_name: str, db_user: str, db_password: str,
+                 pool: Optional[PostgresPool] = None):
         self.db_host = db_host
         self.db_port = db_port
         self.db_name = db_name
         self.db_user = db_user
         self.db_password = db_password
+        # Shared connection pool (created privately when not provided)
+        self.pool = pool or PostgresPool(db_host, db_port, db_name, db_user, db_password)
         self.last_sync_timestamp = None
     
     def get_postgres_connection(self):
-        """Create and return a PostgreSQL connection"""
+        """Create and return a dedicated (unpooled) PostgreSQL connection"""
         try:
             conn = psycopg2.connect(
                 host=self.db_host,
@@ -49,33 +53,31 @@ class IncrementalSync:
         }
         
         try:
-            conn = self.get_postgres_connection()
-            cursor = conn.cursor()
-            
-            # Get last sync timestamp
-            last_sync = self.last_sync_timestamp or datetime.min
-            
-            # Sync new assessments
-            new_assessments = self._sync_new_assessments(cursor, last_sync)
-            stats["new_assessments"] = len(new_assessments)
-            
-            # Sync updated assessments
-            updated_assessments = self._sync_updated_assessments(cursor, last_sync)
-            stats["updated_assessments"] = len(updated_assessments)
-            
-            # Sync new questions
-            new_questions = self._sync_new_questions(cursor, last_sync)
-            stats["new_questions"] = len(new_questions)
-            
-            # Sync updated questions
-            updated_questions = self._sync_updated_questions(cursor, last_sync)
-            stats["updated_questions"] = len(updated_questions)
-            
-            # Sync new categories
-            new_categories = self._sync_new_categories(cursor, last_sync)
-            stats["new_categories"] = len(new_categories)
-            
-            conn.close()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get last sync timestamp
+                last_sync = self.last_sync_timestamp or datetime.min
+                
+                # Sync new assessments
+                new_assessments = self._sync_new_assessments(cursor, last_sync)
+                stats["new_assessments"] = len(new_assessments)
+                
+                # Sync updated assessments
+                updated_assessments = self._sync_updated_assessments(cursor, last_sync)
+                stats["updated_assessments"] = len(updated_assessments)
+                
+                # Sync new questions
+                new_questions = self._sync_new_questions(cursor, last_sync)
+                stats["new_questions"] = len(new_questions)
+                
+                # Sync updated questions
+                updated_questions = self._sync_updated_questions(cursor, last_sync)
+                stats["updated_questions"] = len(updated_questions)
+                
+                # Sync new categories
+                new_categories = self._sync_new_categories(cursor, last_sync)
+                stats["new_categories"] = len(new_categories)
             
             self.last_sync_timestamp = datetime.utcnow()
             stats["end_time"] = self.last_sync_timestamp.isoformat() + "Z"
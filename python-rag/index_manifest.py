@@ -0,0 +1,94 @@
+"""
+Vector Index Manifest
+Records which embedding model built the on-disk Chroma index and a content hash per document,
+so a restart can reuse the index and re-indexing only embeds documents that changed
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def document_hash(document: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """SHA-256 of a document's text and metadata"""
+    payload = json.dumps({"text": document, "metadata": metadata or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IndexManifest:
+    """
+    JSON manifest stored next to the persistent index
+    {"version", "embedding_model", "dimension", "collection", "documents": {id: hash}}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.embedding_model: Optional[str] = None
+        self.dimension: Optional[int] = None
+        self.collection: Optional[str] = None
+        self.documents: Dict[str, str] = {}
+        self.loaded = False
+
+    def load(self) -> bool:
+        """
+        Read the manifest from disk; False if it is missing or unreadable
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index manifest {self.path}: {e}")
+            return False
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning(f"Ignoring index manifest with version {data.get('version')}")
+            return False
+        self.embedding_model = data.get("embedding_model")
+        self.dimension = data.get("dimension")
+        self.collection = data.get("collection")
+        self.documents = dict(data.get("documents", {}))
+        self.loaded = True
+        return True
+
+    def save(self):
+        """
+        Write the manifest atomically (a crash never leaves a half-written file)
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "embedding_model": self.embedding_model,
+                "dimension": self.dimension,
+                "collection": self.collection,
+                "documents": self.documents
+            }, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def matches(self, embedding_model: str, dimension: int, collection: str) -> bool:
+        """Whether vectors in the index were produced by this model for this collection"""
+        return (self.embedding_model, self.dimension, self.collection) == (embedding_model, dimension, collection)
+
+    def reset(self, embedding_model: str, dimension: int, collection: str):
+        self.embedding_model = embedding_model
+        self.dimension = dimension
+        self.collection = collection
+        self.documents = {}
+
+    def changed(self, ids: List[str], hashes: List[str]) -> List[int]:
+        """Positions of documents that are new or whose content hash differs"""
+        return [i for i, (doc_id, digest) in enumerate(zip(ids, hashes)) if self.documents.get(doc_id) != digest]
+
+    def record(self, ids: Iterable[str], hashes: Iterable[str]):
+        self.documents.update(zip(ids, hashes))
+
+    def forget(self, ids: Iterable[str]):
+        for doc_id in ids:
+            self.documents.pop(doc_id, None)
@@ -1,12 +1,27 @@
 """
 Initialize Vector Database with Knowledge Base Documents
 Loads markdown files from knowledge_base/ directory and populates ChromaDB
+Sections are split into token-bounded chunks and re-running only embeds chunks that changed; --watch keeps reindexing edits until interrupted
+
+Usage:
+    python init_vector_db.py
+    python init_vector_db.py --watch --interval 2 --batch-size 64
+
+A running service does not see index writes from another process: set KB_WATCH=True in the
+service instead of running --watch next to it
 """
 from vector_store import VectorStore
+from embedder import create_embedder
+from chunker import Chunker
+from knowledge_indexer import KnowledgeBaseIndexer, KnowledgeBaseWatcher
+from dotenv import load_dotenv
+import argparse
 import os
-import glob
 import logging
 
+# EMBEDDING_BACKEND must match the service so documents and queries share one embedding space
+load_dotenv()
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -14,100 +29,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_knowledge_base():
+def load_knowledge_base(kb_dir: str = "knowledge_base", batch_size: int = 64) -> KnowledgeBaseIndexer:
     """
     Load all markdown files from knowledge_base/ directory and add to vector store
+    Returns the indexer so --watch can keep it running
     """
     try:
         logger.info("=" * 60)
         logger.info("Initializing Vector Database")
         logger.info("=" * 60)
         
-        # Initialize vector store
-        vector_store = VectorStore()
+        # Initialize vector store with the configured embedding backend
+        vector_store = VectorStore(persist_directory=os.getenv('CHROMADB_PATH', './chroma_db'), embedder=create_embedder())
         
         # Get current stats
         stats = vector_store.get_stats()
         logger.info(f"Current collection size: {stats.get('total_documents', 0)} documents")
         
-        # Load markdown files from knowledge_base/
-        kb_path = "knowledge_base/*.md"
-        files = glob.glob(kb_path)
-        
-        if not files:
-            logger.warning(f"No markdown files found in knowledge_base/")
+        # Index knowledge_base/*.md incrementally: only new/edited chunks are embedded,
+        # chunks removed from the files are deleted from the index
+        indexer = KnowledgeBaseIndexer(vector_store, kb_dir=kb_dir, batch_size=batch_size, chunker=Chunker(
+            max_tokens=int(os.getenv('CHUNK_MAX_TOKENS', 200)),
+            overlap_tokens=int(os.getenv('CHUNK_OVERLAP_TOKENS', 30))
+        ))
+        result = indexer.sync()
+        if not result['files']:
             logger.warning("Please create .md files in the knowledge_base/ directory")
-            return
-        
-        logger.info(f"Found {len(files)} markdown files to process")
-        
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, file_path in enumerate(files):
-            logger.info(f"Processing {os.path.basename(file_path)}...")
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Split into sections by ## headers (H2 level)
-                sections = content.split('\n## ')
-                
-                # First section might contain the main title (# header)
-                if sections[0].startswith('# '):
-                    # Remove the main title and add rest as introduction
-                    intro_parts = sections[0].split('\n', 1)
-                    if len(intro_parts) > 1 and intro_parts[1].strip():
-                        documents.append(intro_parts[1].strip())
-                        metadatas.append({
-                            'source': os.path.basename(file_path),
-                            'type': 'knowledge_base',
-                            'section': 'introduction'
-                        })
-                        ids.append(f"{os.path.basename(file_path)}_intro")
-                    sections = sections[1:]  # Remove first section
-                elif sections[0].strip():
-                    # No title, treat as full section
-                    documents.append(sections[0].strip())
-                    metadatas.append({
-                        'source': os.path.basename(file_path),
-                        'type': 'knowledge_base',
-                        'section': 'introduction'
-                    })
-                    ids.append(f"{os.path.basename(file_path)}_intro")
-                    sections = sections[1:]
-                
-                # Process remaining sections
-                for section_idx, section in enumerate(sections):
-                    section_text = section.strip()
-                    if section_text:
-                        # Add back the ## prefix for proper header
-                        section_text = "## " + section_text
-                        
-                        # Extract section title (first line)
-                        section_lines = section_text.split('\n', 1)
-                        section_title = section_lines[0].replace('## ', '').strip()
-                        
-                        documents.append(section_text)
-                        metadatas.append({
-                            'source': os.path.basename(file_path),
-                            'type': 'knowledge_base',
-                            'section': section_title
-                        })
-                        ids.append(f"{os.path.basename(file_path)}_{idx}_{section_idx}")
-                        
-                        logger.debug(f"  - Section: {section_title} ({len(section_text)} chars)")
-        
-        if not documents:
-            logger.warning("No documents extracted from files")
-            return
-        
-        logger.info(f"\nExtracted {len(documents)} sections from all files")
-        logger.info("Adding documents to vector database...")
-        
-        # Add documents to vector store
-        vector_store.add_documents(documents, metadatas, ids)
+            return indexer
+        logger.info(f"Indexed {result['chunks']} chunks from {result['files']} files: "
+                    f"{result['embedded']} embedded, {result['unchanged']} unchanged, {result['deleted']} deleted")
         
         # Get final stats
         final_stats = vector_store.get_stats()
@@ -138,11 +88,32 @@ def load_knowledge_base():
                     logger.info(f"  Result {i+1}: {preview}")
         
         logger.info("\n✓ Initialization complete! Vector database is ready.")
+        return indexer
         
     except Exception as e:
         logger.error(f"Failed to initialize vector database: {e}")
         raise
 
 if __name__ == "__main__":
-    load_knowledge_base()
+    parser = argparse.ArgumentParser(description="Index knowledge_base/*.md into the vector database")
+    parser.add_argument("--kb-dir", default=os.getenv('KB_PATH', 'knowledge_base'), help="Markdown directory")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv('INDEX_BATCH_SIZE', 64)),
+                        help="Chunks encoded per batch")
+    parser.add_argument("--watch", action="store_true", help="Keep reindexing edited files until interrupted")
+    parser.add_argument("--interval", type=float, default=float(os.getenv('KB_WATCH_INTERVAL', 2)),
+                        help="Seconds between checks in --watch mode")
+    args = parser.parse_args()
+    
+    indexer = load_knowledge_base(args.kb_dir, args.batch_size)
+    if args.watch:
+        watcher = KnowledgeBaseWatcher(indexer, interval_seconds=args.interval)
+        watcher.prime()  # just indexed: the first poll only syncs files edited since
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+        finally:
+            indexer.vector_store.close()
+    else:
+        indexer.vector_store.close()
 
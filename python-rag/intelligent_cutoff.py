@@ -4,17 +4,29 @@ Detects irrelevant queries and redirects students to focus on placement preparat
 """
 import logging
 import re
-from typing import Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from keyword_automaton import KeywordAutomaton
 
 logger = logging.getLogger(__name__)
 
+SPECIAL_CHARS = '!?.,;:()[]{}@#$%^&*+=~`|\\/<>'
+# str.translate tables that delete special characters (and whitespace) to count them in C
+DELETE_SPECIAL = str.maketrans('', '', SPECIAL_CHARS)
+DELETE_SPECIAL_AND_SPACE = str.maketrans('', '', ' \t\n\r' + SPECIAL_CHARS)
+VOWELS = set('aeiou')
+
 
 class IntelligentCutoff:
     """
     Intelligent cutoff system that calculates relevance scores and detects off-topic queries
+    All keyword lists are compiled into one KeywordAutomaton, so a query is scanned once for
+    every list; scores of the last cache_size distinct queries are kept
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096):
         # HIGH RELEVANCE keywords (+30 points each)
         self.high_relevance = [
             'assessment', 'test', 'exam', 'quiz', 'result', 'score', 'grade',
@@ -58,6 +70,72 @@ class IntelligentCutoff:
             'placement', 'career', 'job', 'interview', 'skill', 'learning',
             'study', 'prepare', 'practice', 'training', 'professional', 'work'
         ]
+        
+        # Context signals (substring matches, like the lists above)
+        self.question_words = ['what', 'how', 'when', 'where', 'why', 'which', 'can', 'should', 'could']
+        self.action_words = ['show', 'tell', 'explain', 'help', 'need', 'want', 'give', 'find']
+        self.dismissive_patterns = ['whatever', 'nevermind', 'forget it', 'leave it', 'who cares', 'doesnt matter']
+        self.giving_up_words = ['whatever', 'nevermind', 'forget']
+        self.unclear_phrases = [
+            'what about', 'tell me about', 'i want to know', 'can you',
+            'something', 'anything', 'stuff', 'things', 'random',
+            'just curious', 'wondering', 'thinking about'
+        ]
+        
+        # Slang compared against whole words
+        self.slang_words = frozenset([
+            'bloody', 'sweet', 'cool', 'awesome', 'nice', 'wow', 'damn',
+            'hell', 'shit', 'crap', 'stupid', 'dumb', 'lol', 'lmao', 'omg',
+            'wtf', 'bruh', 'bro', 'dude', 'mate', 'yolo', 'swag', 'lit',
+            'sick', 'fire', 'dope', 'rad', 'wicked', 'epic', 'savage'
+        ])
+        
+        self._compile()
+        
+        # Recent query -> (relevance score, keyword mask)
+        self.cache_size = cache_size
+        self._scores: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def _compile(self):
+        """Build the automaton over every keyword list and one bit mask per list"""
+        lists = [self.high_relevance, self.medium_relevance, self.low_relevance, self.career_terms,
+                 self.question_words, self.action_words, self.dismissive_patterns, self.giving_up_words,
+                 self.unclear_phrases, *self.off_topic_keywords.values()]
+        self.automaton = KeywordAutomaton(keyword for keywords in lists for keyword in keywords)
+        mask = self.automaton.mask
+        self._high_mask = mask(self.high_relevance)
+        self._medium_mask = mask(self.medium_relevance)
+        self._low_mask = mask(self.low_relevance)
+        self._career_mask = mask(self.career_terms)
+        self._question_mask = mask(self.question_words)
+        self._action_mask = mask(self.action_words)
+        self._dismissive_mask = mask(self.dismissive_patterns)
+        self._giving_up_mask = mask(self.giving_up_words)
+        self._unclear_mask = mask(self.unclear_phrases)
+        self._off_topic_masks = [(category, mask(keywords)) for category, keywords in self.off_topic_keywords.items()]
+    
+    def _analyze(self, query: str) -> Tuple[int, int]:
+        """(relevance score, mask of keywords in the lowercased query), cached per query"""
+        with self._lock:
+            cached = self._scores.get(query)
+            if cached is not None:
+                self._scores.move_to_end(query)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+        
+        query_lower = query.lower().strip()
+        found = self.automaton.scan(query_lower)
+        result = (self._score(query, query_lower, found), found)
+        
+        with self._lock:
+            self._scores[query] = result
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+        return result
     
     def calculate_relevance_score(self, query: str) -> int:
         """
@@ -65,30 +143,37 @@ class IntelligentCutoff:
         Higher score = more relevant to placement preparation
         Uses intelligent pattern detection instead of extensive word lists
         """
-        query_lower = query.lower().strip()
-        
+        return self._analyze(query)[0]
+    
+    def calculate_relevance_scores(self, queries: Iterable[str]) -> List[int]:
+        """Relevance scores for many queries at once (each distinct query is scored once)"""
+        scores: Dict[str, int] = {}
+        return [scores[query] if query in scores else scores.setdefault(query, self._analyze(query)[0])
+                for query in queries]
+    
+    def _score(self, query: str, query_lower: str, found: int) -> int:
         # HANDLE EMPTY OR WHITESPACE-ONLY QUERIES
         if not query_lower or len(query_lower) == 0:
             logger.warning("Empty query detected")
             return 0  # Empty queries get 0 score
         
         # Check if query is just spaces, special chars, or gibberish
-        if all(c in ' \t\n\r.,!?;:()[]{}@#$%^&*+=~`|\\/<>' for c in query_lower):
+        if not query_lower.translate(DELETE_SPECIAL_AND_SPACE):
             logger.warning("Query contains only special characters")
             return 0
         
         # Check if query has meaningful alphabetic content
-        alpha_chars = sum(1 for c in query_lower if c.isalpha())
+        alpha_chars = sum(map(str.isalpha, query_lower))
         if len(query_lower) > 3 and alpha_chars < len(query_lower) * 0.3:
             logger.warning("Query has too few alphabetic characters")
             return 0
         
         score = 50  # Start with neutral score
         
-        # Count keyword matches
-        high_matches = sum(1 for keyword in self.high_relevance if keyword in query_lower)
-        medium_matches = sum(1 for keyword in self.medium_relevance if keyword in query_lower)
-        low_matches = sum(1 for keyword in self.low_relevance if keyword in query_lower)
+        # Count keyword matches (one bit per distinct keyword found)
+        high_matches = (found & self._high_mask).bit_count()
+        medium_matches = (found & self._medium_mask).bit_count()
+        low_matches = (found & self._low_mask).bit_count()
         
         # Calculate score
         score += (high_matches * 30)
@@ -119,8 +204,7 @@ class IntelligentCutoff:
                 logger.info("Too many short words detected")
             
             # Check for random consonant clusters (no vowels)
-            vowels = set('aeiou')
-            no_vowel_words = sum(1 for word in words if len(word) > 3 and not any(c in vowels for c in word))
+            no_vowel_words = sum(1 for word in words if len(word) > 3 and VOWELS.isdisjoint(word))
             if no_vowel_words > word_count * 0.5:
                 score -= 30
                 logger.info("Too many words without vowels")
@@ -144,34 +228,24 @@ class IntelligentCutoff:
             score -= 25  # Increased penalty
         
         # INTELLIGENT CONTEXT DETECTION
-        # Check if query lacks any meaningful context about placement/study
-        has_question_words = any(word in query_lower for word in ['what', 'how', 'when', 'where', 'why', 'which', 'can', 'should', 'could'])
-        has_action_words = any(word in query_lower for word in ['show', 'tell', 'explain', 'help', 'need', 'want', 'give', 'find'])
-        
         # If no question words, no action words, and no high relevance keywords
-        if not has_question_words and not has_action_words and high_matches == 0:
+        if not found & (self._question_mask | self._action_mask) and high_matches == 0:
             score -= 20
             logger.info("Query lacks meaningful context")
         
         # Detect vague or dismissive phrases
-        dismissive_patterns = ['whatever', 'nevermind', 'forget it', 'leave it', 'who cares', 'doesnt matter']
-        if any(pattern in query_lower for pattern in dismissive_patterns):
+        if found & self._dismissive_mask:
             score -= 40
             logger.info("Dismissive phrase detected")
         
         # If query is mostly slang/casual words, reduce score significantly
-        slang_count = sum(1 for word in words if word in [
-            'bloody', 'sweet', 'cool', 'awesome', 'nice', 'wow', 'damn',
-            'hell', 'shit', 'crap', 'stupid', 'dumb', 'lol', 'lmao', 'omg',
-            'wtf', 'bruh', 'bro', 'dude', 'mate', 'yolo', 'swag', 'lit',
-            'sick', 'fire', 'dope', 'rad', 'wicked', 'epic', 'savage'
-        ])
+        slang_count = sum(1 for word in words if word in self.slang_words)
         
         if word_count > 0 and (slang_count / word_count) > 0.4:  # More than 40% slang
             score -= 30
         
         # ENHANCED: Detect queries with excessive punctuation or emojis
-        special_char_count = sum(1 for c in query if c in '!?.,;:()[]{}@#$%^&*+=~`|\\/<>')
+        special_char_count = len(query) - len(query.translate(DELETE_SPECIAL))
         if len(query) > 0 and (special_char_count / len(query)) > 0.3:
             score -= 25  # Too many special characters
         
@@ -194,7 +268,7 @@ class IntelligentCutoff:
             return True, "empty_query", 0
         
         # Calculate relevance score using intelligent pattern detection
-        relevance_score = self.calculate_relevance_score(query)
+        relevance_score, found = self._analyze(query)
         
         # INTELLIGENT CUTOFF: Low relevance score (increased threshold to 30)
         if relevance_score < relevance_threshold:
@@ -210,29 +284,33 @@ class IntelligentCutoff:
                 return True, "too_short", relevance_score
             elif all(not c.isalnum() for c in query_lower.replace(' ', '')):
                 return True, "special_chars_only", relevance_score
-            elif any(word in query_lower for word in ['whatever', 'nevermind', 'forget']):
+            elif found & self._giving_up_mask:
                 return True, "dismissive", relevance_score
             else:
                 return True, "irrelevant", relevance_score
         
         # Quick check for obvious off-topic keywords (minimal list)
         if relevance_score < 50:  # Only check if score is borderline
-            for category, keywords in self.off_topic_keywords.items():
-                if any(keyword in query_lower for keyword in keywords):
-                    # Double-check: avoid false positives with career terms
-                    if not any(career_term in query_lower for career_term in self.career_terms):
-                        logger.info(f"Off-topic keyword detected: {category}")
-                        return True, category, relevance_score
+            for category, mask in self._off_topic_masks:
+                # Double-check: avoid false positives with career terms
+                if found & mask and not found & self._career_mask:
+                    logger.info(f"Off-topic keyword detected: {category}")
+                    return True, category, relevance_score
         
         return False, "relevant", relevance_score
     
+    def is_off_topic_batch(self, queries: Iterable[str], relevance_threshold: int = 30) -> List[Tuple[bool, str, int]]:
+        """is_off_topic for many queries at once (each distinct query is scored once)"""
+        results: Dict[str, Tuple[bool, str, int]] = {}
+        return [results[query] if query in results
+                else results.setdefault(query, self.is_off_topic(query, relevance_threshold))
+                for query in queries]
+    
     def is_unclear_query(self, query: str, relevance_score: int) -> bool:
         """
         Determine if query is unclear/ambiguous (needs AI clarification)
         Returns: True if query is unclear and should be clarified before redirecting
         """
-        query_lower = query.lower().strip()
-        
         # Unclear if:
         # 1. Relevance score is borderline (30-45%)
         # 2. Very short and vague
@@ -249,19 +327,29 @@ class IntelligentCutoff:
             return True
         
         # Check for vague/unclear phrases
-        unclear_phrases = [
-            'what about', 'tell me about', 'i want to know', 'can you',
-            'something', 'anything', 'stuff', 'things', 'random',
-            'just curious', 'wondering', 'thinking about'
-        ]
-        
-        if any(phrase in query_lower for phrase in unclear_phrases):
+        if self._analyze(query)[1] & self._unclear_mask:
             # Only unclear if not clearly relevant
             if relevance_score < 60:
                 return True
         
         return False
     
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                'keywords': len(self.automaton.keywords),
+                'cache_size': len(self._scores),
+                'max_cache_size': self.cache_size,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'hit_rate': (self.cache_hits / total) * 100 if total else 0.0
+            }
+    
     def generate_clarification_message(self, query: str, student_context: dict) -> str:
         """
         Generate a clarification message for unclear queries
@@ -0,0 +1,76 @@
+"""
+Keyword Automaton (Aho–Corasick)
+Finds every keyword occurring anywhere in a text in one pass over its characters,
+replacing repeated `any(keyword in text for keyword in ...)` scans over many keyword lists
+"""
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick automaton compiled into a full transition table
+    - Keyword i is reported as bit i of the mask returned by scan() (substring semantics,
+      same as the `in` operator; overlapping and nested keywords are all found)
+    - scan() costs one dict lookup per character regardless of the number of keywords
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for keyword in keywords:
+            if keyword and keyword not in self._ids:
+                self._ids[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+        self._compile()
+
+    def _compile(self):
+        # Trie of all keywords; state 0 is the root
+        goto: List[Dict[str, int]] = [{}]
+        output: List[int] = [0]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    output.append(0)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            output[state] |= 1 << index
+
+        # Breadth-first: failure links, inherited outputs and the complete transition table
+        # (a missing transition follows the failure link, resolved once here instead of per scan)
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            transitions[state] = dict(transitions[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(char, 0)
+                transitions[state][char] = child
+                queue.append(child)
+        self._transitions = transitions
+        self._output = output
+
+    def mask(self, keywords: Iterable[str]) -> int:
+        """Bit mask of the given keywords (all must have been compiled in)"""
+        result = 0
+        for keyword in keywords:
+            result |= 1 << self._ids[keyword]
+        return result
+
+    def scan(self, text: str) -> int:
+        """Bit mask of every keyword occurring in text"""
+        transitions, output = self._transitions, self._output
+        state, found = 0, 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            found |= output[state]
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """Keywords occurring in text, in compile order"""
+        found = self.scan(text)
+        return [keyword for index, keyword in enumerate(self.keywords) if found >> index & 1]
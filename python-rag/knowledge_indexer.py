@@ -0,0 +1,172 @@
+"""
+Incremental Knowledge Base Indexer
+Splits knowledge_base/*.md into token-bounded chunks, upserts only new or edited chunks (content hashes
+in the index manifest), deletes chunks that disappeared, and can poll the directory to reindex edits live
+"""
+import glob
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from chunker import Chunker
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_BASE_TYPE = "knowledge_base"
+
+
+class KnowledgeBaseIndexer:
+    """
+    Keeps the vector store in step with the markdown files in kb_dir
+    - sync(): hash every chunk, embed + upsert the changed ones, delete the vanished ones
+    - snapshot(): (mtime, size) per file, cheap enough to poll every few seconds
+    """
+
+    def __init__(self, vector_store, kb_dir: str = "knowledge_base", batch_size: int = 64,
+                 chunker: Optional[Chunker] = None):
+        self.vector_store = vector_store
+        self.kb_dir = kb_dir
+        self.batch_size = batch_size
+        self.chunker = chunker or Chunker()
+        self._lock = threading.Lock()
+
+    def files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.kb_dir, "*.md")))
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # deleted between glob and stat
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def collect(self) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """Chunks of every markdown file as parallel documents/metadatas/ids lists"""
+        documents, metadatas, ids = [], [], []
+        for path in self.files():
+            with open(path, 'r', encoding='utf-8') as f:
+                chunks = self.chunker.chunk_markdown(os.path.basename(path), f.read(), KNOWLEDGE_BASE_TYPE)
+            logger.debug(f"{os.path.basename(path)}: {len(chunks)} chunks")
+            for document, metadata, doc_id in chunks:
+                documents.append(document)
+                metadatas.append(metadata)
+                ids.append(doc_id)
+        return documents, metadatas, ids
+
+    def sync(self) -> Dict[str, Any]:
+        """
+        Bring the index up to date with kb_dir
+        Returns {'files', 'chunks', 'embedded', 'unchanged', 'deleted', 'seconds'}
+        """
+        with self._lock:
+            started = time.monotonic()
+            files = self.files()
+            if not files:
+                # A missing/empty directory (e.g. wrong working directory) must not wipe the index
+                logger.warning(f"No markdown files found in {self.kb_dir}/; index left unchanged")
+                return {'files': 0, 'chunks': 0, 'embedded': 0, 'unchanged': 0, 'deleted': 0, 'seconds': 0.0}
+
+            documents, metadatas, ids = self.collect()
+            result = self.vector_store.add_documents(documents, metadatas, ids, batch_size=self.batch_size)
+
+            current = set(ids)
+            stale = [doc_id for doc_id in self.vector_store.document_ids(where={'type': KNOWLEDGE_BASE_TYPE})
+                     if doc_id not in current]
+            deleted = self.vector_store.delete_documents(stale)
+
+            stats = {
+                'files': len(files),
+                'chunks': len(ids),
+                'embedded': result['embedded'],
+                'unchanged': result['unchanged'],
+                'deleted': deleted,
+                'seconds': round(time.monotonic() - started, 3)
+            }
+            logger.info(f"Knowledge base indexed: {stats}")
+            return stats
+
+
+class KnowledgeBaseWatcher:
+    """
+    Polls kb_dir and runs indexer.sync() when a file is added, edited or removed
+    on_change(stats) is called (on the watcher thread) after a sync that changed the index
+    """
+
+    def __init__(self, indexer: KnowledgeBaseIndexer, interval_seconds: float = 2.0,
+                 on_change: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.indexer = indexer
+        self.interval_seconds = interval_seconds
+        self.on_change = on_change
+        self.syncs = 0
+        self.failures = 0
+        self.last_sync: Optional[Dict[str, Any]] = None
+        self._snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def prime(self):
+        """
+        Record the current files as already indexed without syncing
+        (after a caller has just run indexer.sync() itself)
+        """
+        self._snapshot = self.indexer.snapshot()
+
+    def check(self) -> Optional[Dict[str, Any]]:
+        """
+        Sync if the directory changed since the last check (always on the first check)
+        """
+        snapshot = self.indexer.snapshot()
+        if snapshot == self._snapshot:
+            return None
+        try:
+            stats = self.indexer.sync()
+        except Exception as e:
+            # Keep the old snapshot so the next poll retries
+            self.failures += 1
+            logger.error(f"Knowledge base reindex failed: {e}")
+            return None
+        self._snapshot = snapshot
+        self.syncs += 1
+        self.last_sync = stats
+        if self.on_change and (stats['embedded'] or stats['deleted']):
+            try:
+                self.on_change(stats)
+            except Exception as e:
+                logger.error(f"Knowledge base change callback failed: {e}")
+        return stats
+
+    def run(self):
+        """Poll until stop() (blocks; used by init_vector_db.py --watch)"""
+        logger.info(f"Watching {self.indexer.kb_dir}/*.md every {self.interval_seconds}s")
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval_seconds)
+
+    def start(self):
+        """Poll on a daemon thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="knowledge-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'kb_dir': self.indexer.kb_dir,
+            'interval_seconds': self.interval_seconds,
+            'files': len(self._snapshot or {}),
+            'syncs': self.syncs,
+            'failures': self.failures,
+            'last_sync': self.last_sync
+        }
@@ -4,23 +4,89 @@ Handles synchronization of data from Supabase PostgreSQL to the RAG system
 """
 import psycopg2
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import os
+from db_pool import PostgresPool, AsyncPostgresPool
 
 logger = logging.getLogger(__name__)
 
+STUDENT_CONTEXT_STATEMENT = "student_context_v1"
+
+# Student info, available assessments (active, in date window, not yet taken),
+# completed assessments and the performance summary in one round trip
+STUDENT_CONTEXT_SQL = """
+    WITH completed AS (
+        SELECT sa.assessment_id, sa.obtained_marks, sa.total_marks, sa.percentage,
+               sa.pass_status, sa.submit_time, a.name, a.category
+        FROM student_assessments sa
+        JOIN assessments a ON sa.assessment_id = a.id
+        WHERE sa.student_id = %(student_id)s AND sa.status = 'completed'
+    ),
+    available AS (
+        SELECT a.id, a.name, a.description, a.category, a.created_at,
+               COALESCE(NULLIF(a.total_time, 0), NULLIF(a.duration, 0), 30) AS total_time
+        FROM assessments a
+        WHERE a.is_active = true
+        AND a.deleted_at IS NULL
+        AND (a.start_date IS NULL OR a.start_date <= NOW())
+        AND (a.end_date IS NULL OR a.end_date >= NOW())
+        AND NOT EXISTS (
+            SELECT 1
+            FROM student_assessments sa
+            WHERE sa.student_id = %(student_id)s AND sa.assessment_id = a.id
+        )
+    )
+    SELECT
+        (SELECT json_build_object('id', u.id, 'name', u.name, 'email', u.email)
+         FROM users u WHERE u.id = %(student_id)s),
+        (SELECT COALESCE(json_agg(json_build_object(
+                    'id', id,
+                    'title', name,
+                    'description', description,
+                    'category', category,
+                    'total_time', total_time
+                ) ORDER BY created_at DESC), '[]'::json)
+         FROM available),
+        (SELECT COALESCE(json_agg(json_build_object(
+                    'assessment_id', assessment_id,
+                    'title', name,
+                    'category', category,
+                    'score', obtained_marks,
+                    'total', total_marks,
+                    'percentage', percentage,
+                    'status', pass_status,
+                    'completed_at', to_char(submit_time, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')
+                ) ORDER BY submit_time DESC), '[]'::json)
+         FROM completed),
+        (SELECT json_build_object(
+                    'total_completed', COUNT(*),
+                    'average_percentage', ROUND(AVG(percentage)::numeric, 1),
+                    'highest_score', MAX(percentage),
+                    'lowest_score', MIN(percentage),
+                    'passed_count', COUNT(*) FILTER (WHERE pass_status = 'pass'),
+                    'failed_count', COUNT(*) FILTER (WHERE pass_status = 'fail')
+                )
+         FROM completed)
+"""
+
 class KnowledgeSync:
-    def __init__(self, db_host: str, db_port: str, db_name: str, db_user: str, db_password: str):
+    def __init__(self, db_host: str, db_port: str, db_name: str, db_user: str, db_password: str,
+                 pool: Optional[PostgresPool] = None, use_prepared_statements: bool = False):
         self.db_host = db_host
         self.db_port = db_port
         self.db_name = db_name
         self.db_user = db_user
         self.db_password = db_password
+        # Shared connection pool (created privately when not provided)
+        self.pool = pool or PostgresPool(db_host, db_port, db_name, db_user, db_password)
+        self.async_pool = AsyncPostgresPool(self.pool)
+        # Server-side prepared statements (disable behind PgBouncer transaction pooling)
+        self.use_prepared_statements = use_prepared_statements
         self.last_sync = None
         
     def get_postgres_connection(self):
-        """Create and return a PostgreSQL connection"""
+        """Create and return a dedicated (unpooled) PostgreSQL connection"""
         try:
             conn = psycopg2.connect(
                 host=self.db_host,
@@ -47,22 +113,20 @@ class KnowledgeSync:
         }
         
         try:
-            conn = self.get_postgres_connection()
-            cursor = conn.cursor()
-            
-            # Sync assessments
-            assessments_count = self._sync_assessments(cursor)
-            stats["assessments_synced"] = assessments_count
-            
-            # Sync questions
-            questions_count = self._sync_questions(cursor)
-            stats["questions_synced"] = questions_count
-            
-            # Sync categories
-            categories_count = self._sync_categories(cursor)
-            stats["categories_synced"] = categories_count
-            
-            conn.close()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Sync assessments
+                assessments_count = self._sync_assessments(cursor)
+                stats["assessments_synced"] = assessments_count
+                
+                # Sync questions
+                questions_count = self._sync_questions(cursor)
+                stats["questions_synced"] = questions_count
+                
+                # Sync categories
+                categories_count = self._sync_categories(cursor)
+                stats["categories_synced"] = categories_count
             
             self.last_sync = datetime.utcnow()
             stats["end_time"] = self.last_sync.isoformat() + "Z"
@@ -141,99 +205,56 @@ class KnowledgeSync:
         Get comprehensive student context for RAG
         """
         try:
-            conn = self.get_postgres_connection()
-            cursor = conn.cursor()
-            
-            context = {}
-            
-            # Get student info
-            cursor.execute("""
-                SELECT id, name, email
-                FROM users 
-                WHERE id = %s
-            """, (student_id,))
-            
-            student_row = cursor.fetchone()
-            if student_row:
-                context['student_info'] = {
-                    'id': student_row[0],
-                    'name': student_row[1],
-                    'email': student_row[2]
-                }
-            
-            # Get available assessments (exclude already taken by this student and soft-deleted)
-            cursor.execute("""
-                SELECT a.id, a.name, a.description, a.category, a.total_time, a.duration
-                FROM assessments a
-                WHERE a.is_active = true
-                AND a.deleted_at IS NULL
-                AND (a.start_date IS NULL OR a.start_date <= NOW())
-                AND (a.end_date IS NULL OR a.end_date >= NOW())
-                AND a.id NOT IN (
-                    SELECT assessment_id 
-                    FROM student_assessments 
-                    WHERE student_id = %s
-                )
-                ORDER BY a.created_at DESC
-            """, (student_id,))
-            
-            assessment_rows = cursor.fetchall()
-            context['available_assessments'] = [
-                {
-                    'id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'category': row[3],
-                    'total_time': row[4] or row[5] or 30
-                }
-                for row in assessment_rows
-            ]
-            
-            # Get completed assessments
-            cursor.execute("""
-                SELECT sa.assessment_id, sa.obtained_marks, sa.total_marks, sa.percentage, 
-                       sa.pass_status, sa.submit_time, a.name, a.category
-                FROM student_assessments sa
-                JOIN assessments a ON sa.assessment_id = a.id
-                WHERE sa.student_id = %s AND sa.status = 'completed'
-                ORDER BY sa.submit_time DESC
-            """, (student_id,))
+            with self.pool.connection() as conn:
+                return self._query_student_context(conn, student_id)
             
-            completed_rows = cursor.fetchall()
-            context['completed_assessments'] = [
-                {
-                    'assessment_id': row[0],
-                    'title': row[6],
-                    'category': row[7],
-                    'score': row[1],
-                    'total': row[2],
-                    'percentage': row[3],
-                    'status': row[4],
-                    'completed_at': row[5].isoformat() + "Z" if row[5] else None
-                }
-                for row in completed_rows
-            ]
-            
-            # Get performance summary
-            if context['completed_assessments']:
-                percentages = [assess['percentage'] for assess in context['completed_assessments']]
-                context['performance_summary'] = {
-                    'total_completed': len(context['completed_assessments']),
-                    'average_percentage': round(sum(percentages) / len(percentages), 1),
-                    'highest_score': max(percentages),
-                    'lowest_score': min(percentages),
-                    'passed_count': len([assess for assess in context['completed_assessments'] if assess['status'] == 'pass']),
-                    'failed_count': len([assess for assess in context['completed_assessments'] if assess['status'] == 'fail'])
-                }
-            else:
-                context['performance_summary'] = {
-                    'total_completed': 0,
-                    'message': 'No assessments completed yet'
-                }
-            
-            conn.close()
-            return context
+        except Exception as e:
+            logger.error(f"Failed to get student context: {e}")
+            raise
+    
+    async def get_student_context_async(self, student_id: int) -> Dict[str, Any]:
+        """
+        Async variant of get_student_context for the /chat path
+        Pool acquisition and queries run in the executor so the event loop is not blocked
+        """
+        try:
+            return await self.async_pool.run(self._query_student_context, student_id)
             
         except Exception as e:
             logger.error(f"Failed to get student context: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def _query_student_context(self, conn, student_id: int) -> Dict[str, Any]:
+        """
+        Fetch the whole student context in a single round trip
+        Uses a per-connection prepared statement when prepared-statement mode is enabled
+        """
+        cursor = conn.cursor()
+        
+        if self.use_prepared_statements:
+            session = self.pool.session(conn)
+            if not session.get(STUDENT_CONTEXT_STATEMENT):
+                cursor.execute(f"PREPARE {STUDENT_CONTEXT_STATEMENT} (bigint) AS "
+                               + STUDENT_CONTEXT_SQL.replace("%(student_id)s", "$1"))
+                session[STUDENT_CONTEXT_STATEMENT] = True
+            cursor.execute(f"EXECUTE {STUDENT_CONTEXT_STATEMENT} (%s)", (student_id,))
+        else:
+            cursor.execute(STUDENT_CONTEXT_SQL, {"student_id": student_id})
+        
+        student_info, available, completed, summary = cursor.fetchone()
+        
+        context = {}
+        if student_info:
+            context['student_info'] = student_info
+        context['available_assessments'] = available
+        context['completed_assessments'] = completed
+        
+        if summary['total_completed']:
+            context['performance_summary'] = summary
+        else:
+            context['performance_summary'] = {
+                'total_completed': 0,
+                'message': 'No assessments completed yet'
+            }
+        
+        return context
\ No newline at end of file
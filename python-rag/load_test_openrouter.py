@@ -0,0 +1,146 @@
+"""
+Load Test for the OpenRouter Client (/chat path)
+Starts a local fake OpenRouter server and compares concurrent throughput of the
+blocking OpenRouterClient (old /chat behaviour) against the pooled AsyncOpenRouterClient
+
+Usage:
+    python load_test_openrouter.py --requests 200 --concurrency 100 --latency 0.5
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import uvicorn
+from fastapi import FastAPI
+
+from openrouter_client import OpenRouterClient, AsyncOpenRouterClient
+
+MESSAGES = [
+    {"role": "system", "content": "You are a placement training assistant."},
+    {"role": "user", "content": "How do I start an assessment?"}
+]
+
+
+def create_fake_openrouter(latency: float) -> FastAPI:
+    """
+    Fake OpenRouter chat completions endpoint that sleeps to simulate LLM latency
+    """
+    fake_app = FastAPI()
+
+    @fake_app.post("/api/v1/chat/completions")
+    async def completions(payload: Dict[str, Any]):
+        await asyncio.sleep(latency)
+        return {
+            "id": "fake-completion",
+            "model": payload.get("model"),
+            "choices": [{"message": {"role": "assistant", "content": "Go to Assessments and click Start."}}],
+            "usage": {"prompt_tokens": 20, "completion_tokens": 8, "total_tokens": 28}
+        }
+
+    return fake_app
+
+
+def start_fake_server(latency: float) -> str:
+    """
+    Run the fake server in a background thread and return its completions URL
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(create_fake_openrouter(latency), host="127.0.0.1", port=port,
+                            log_level="warning", limit_concurrency=10000, backlog=4096)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{port}/api/v1/chat/completions"
+
+
+async def run_load(call: Callable, total_requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Fire total_requests calls with at most `concurrency` in flight on one event loop
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total_requests,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": total_requests / elapsed if elapsed else 0.0,
+        "p50_s": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p95_s": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    }
+
+
+def print_result(label: str, result: Dict[str, Any]):
+    print(f"{label:<28} {result['throughput_rps']:>9.1f} req/s | "
+          f"p50 {result['p50_s']:.2f}s | p95 {result['p95_s']:.2f}s | "
+          f"elapsed {result['elapsed_s']:.1f}s | errors {result['errors']}")
+
+
+async def main(args):
+    api_url = start_fake_server(args.latency)
+    print("=" * 80)
+    print(f"Fake OpenRouter at {api_url} (latency {args.latency}s)")
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print("=" * 80)
+
+    # BEFORE: blocking client called straight from the async handler (old main.chat)
+    sync_client = OpenRouterClient("test-key", "primary/model", "fallback/model", api_url=api_url)
+
+    async def blocking_call():
+        sync_client.call_with_fallback(MESSAGES)
+
+    before = await run_load(blocking_call, args.requests, args.concurrency)
+    print_result("Before (blocking requests)", before)
+
+    # AFTER: pooled async client
+    async_client = AsyncOpenRouterClient(
+        "test-key", "primary/model", "fallback/model", api_url=api_url,
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency,
+        max_concurrency_per_host=args.concurrency, http2=False
+    )
+
+    async def async_call():
+        await async_client.call_with_fallback(MESSAGES)
+
+    after = await run_load(async_call, args.requests, args.concurrency)
+    print_result("After (async pooled)", after)
+    await async_client.aclose()
+
+    print("=" * 80)
+    if before["throughput_rps"]:
+        print(f"Speedup: {after['throughput_rps'] / before['throughput_rps']:.1f}x throughput")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the OpenRouter client against a fake server")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests per run")
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent in-flight requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated LLM latency in seconds")
+    asyncio.run(main(parser.parse_args()))
@@ -4,7 +4,7 @@ Production-ready RAG service with dynamic knowledge sync
 """
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import os
@@ -12,14 +12,27 @@ from dotenv import load_dotenv
 import logging
 from datetime import datetime
 import asyncio
+import json
 
 # Import custom modules (will be created)
-from openrouter_client import OpenRouterClient
-from context_handler import ContextHandler
+from openrouter_client import OpenRouterClient, AsyncOpenRouterClient
+from model_health import ModelLatencyTracker, CircuitBreakerRegistry
+from context_handler import ContextHandler, DEFAULT_HEDGE_QUERY_TYPES, DEFAULT_TOPIC_FILTER_QUERY_TYPES, TOPIC_FILTER_MODEL, empty_student_context
 from response_formatter import ResponseFormatter
 from knowledge_sync import KnowledgeSync
-from vector_store import VectorStore
-from response_cache import ResponseCache
+from db_pool import PostgresPool
+from background_loader import BackgroundLoader, IDLE, WARMING
+from knowledge_indexer import KnowledgeBaseIndexer, KnowledgeBaseWatcher
+from chunker import Chunker
+from response_cache import ResponseCache, SHARED_QUERY_TYPES, personal_terms
+from cache_backend import InMemoryBackend, RedisBackend
+from student_context_cache import StudentContextCache
+from semantic_cache import SemanticCache
+from single_flight import SingleFlight
+from prompt_budget import PromptBudget
+from topic_classifier import TopicClassifier
+from templated_responder import TemplatedResponder, DEFAULT_TEMPLATED_QUERY_TYPES, TEMPLATED_MODEL
+from stage_timings import StageTimings
 
 # Load environment variables
 load_dotenv()
@@ -35,6 +48,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Answers built from templates are free to rebuild and quote the asking student's own data, so they are never cached
+UNCACHED_MODELS = (TOPIC_FILTER_MODEL, TEMPLATED_MODEL)
+
+# Timeouts (seconds, 0 = none) of the concurrent pre-LLM stages; a late student context is replaced
+# by the empty context, late retrieval by no knowledge documents, and the request carries on
+CHAT_CONTEXT_TIMEOUT = float(os.getenv('CHAT_CONTEXT_TIMEOUT', 3))
+CHAT_RETRIEVAL_TIMEOUT = float(os.getenv('CHAT_RETRIEVAL_TIMEOUT', 2))
+
 # Initialize FastAPI
 app = FastAPI(
     title="College Placement Portal RAG Service",
@@ -64,31 +85,141 @@ try:
         api_url=os.getenv('OPENROUTER_API_URL')
     )
     
-    # Initialize vector store for RAG
-    try:
-        vector_store = VectorStore()
-        logger.info("Vector store initialized successfully")
-    except Exception as ve:
-        logger.warning(f"Vector store initialization failed: {ve}")
-        logger.warning("RAG will operate without vector search")
-        vector_store = None
+    # Pooled async client for the /chat path (keeps the event loop free during LLM calls)
+    async_openrouter_client = AsyncOpenRouterClient(
+        api_key=os.getenv('OPENROUTER_API_KEY'),
+        primary_model=os.getenv('OPENROUTER_PRIMARY_MODEL'),
+        fallback_model=os.getenv('OPENROUTER_FALLBACK_MODEL'),
+        api_url=os.getenv('OPENROUTER_API_URL'),
+        max_connections=int(os.getenv('OPENROUTER_MAX_CONNECTIONS', 100)),
+        max_keepalive_connections=int(os.getenv('OPENROUTER_MAX_KEEPALIVE', 20)),
+        max_concurrency_per_host=int(os.getenv('OPENROUTER_MAX_CONCURRENCY', 64)),
+        http2=os.getenv('OPENROUTER_HTTP2', 'True').lower() == 'true',
+        timeout=float(os.getenv('OPENROUTER_TIMEOUT', 30)),
+        latency_tracker=ModelLatencyTracker(
+            hedge_percentile=float(os.getenv('OPENROUTER_HEDGE_PERCENTILE', 0.95)),
+            default_hedge_delay=float(os.getenv('OPENROUTER_HEDGE_DELAY', 2.0)),
+            min_hedge_delay=float(os.getenv('OPENROUTER_HEDGE_MIN_DELAY', 0.5)),
+            max_hedge_delay=float(os.getenv('OPENROUTER_HEDGE_MAX_DELAY', 10.0))
+        ),
+        circuit_breakers=CircuitBreakerRegistry(
+            window_seconds=float(os.getenv('OPENROUTER_BREAKER_WINDOW', 60)),
+            min_requests=int(os.getenv('OPENROUTER_BREAKER_MIN_REQUESTS', 5)),
+            error_rate_threshold=float(os.getenv('OPENROUTER_BREAKER_ERROR_RATE', 0.5)),
+            slow_call_seconds=float(os.getenv('OPENROUTER_BREAKER_SLOW_CALL', 20)),
+            cooldown_seconds=float(os.getenv('OPENROUTER_BREAKER_COOLDOWN', 30)),
+            half_open_max_probes=int(os.getenv('OPENROUTER_BREAKER_HALF_OPEN_PROBES', 1))
+        )
+    )
+    
+    # Vector store for RAG (Chroma + embedding model) is loaded in the background after startup;
+    # until it is ready chat answers come from the cache or the LLM without retrieved documents
+    vector_store = None
+    knowledge_watcher = None  # Started with the vector store when KB_WATCH is on
+    
+    # Prompt token budget: trims history/documents so long conversations don't inflate every call
+    prompt_budget = None
+    if os.getenv('PROMPT_BUDGET_ENABLED', 'True').lower() == 'true':
+        prompt_budget = PromptBudget(
+            max_prompt_tokens=int(os.getenv('PROMPT_MAX_TOKENS', 2500)),
+            knowledge_tokens=int(os.getenv('PROMPT_KNOWLEDGE_TOKENS', 360)),
+            history_tokens=int(os.getenv('PROMPT_HISTORY_TOKENS', 400)),
+            max_doc_tokens=int(os.getenv('PROMPT_MAX_DOC_TOKENS', 150)),
+            max_message_tokens=int(os.getenv('PROMPT_MAX_MESSAGE_TOKENS', 150)),
+            max_assessments=int(os.getenv('PROMPT_MAX_ASSESSMENTS', 15))
+        )
+    
+    # Embedding topic pre-filter: confidently off-topic/unclear queries get a template instead of an
+    # LLM call (trained from TOPIC_FILTER_TRAINING_FILE once the embedding model is loaded)
+    # Opt-in: the default thresholds are untuned placeholders
+    topic_filter = None
+    if os.getenv('TOPIC_FILTER_ENABLED', 'False').lower() == 'true':
+        topic_filter = TopicClassifier(
+            min_similarity=float(os.getenv('TOPIC_FILTER_MIN_SIMILARITY', 0.5)),
+            min_margin=float(os.getenv('TOPIC_FILTER_MIN_MARGIN', 0.05))
+        )
+    
+    # Zero-LLM fast path: these query types are answered from the student context and static templates
+    templated_responder = TemplatedResponder(
+        enabled_types=[t.strip() for t in os.getenv('TEMPLATED_QUERY_TYPES', ','.join(DEFAULT_TEMPLATED_QUERY_TYPES)).split(',') if t.strip()],
+        small_talk_max_words=int(os.getenv('TEMPLATED_SMALL_TALK_MAX_WORDS', 4))
+    )
     
     context_handler = ContextHandler(
         openrouter_client=openrouter_client,
-        vector_store=vector_store  # Pass vector store for RAG
+        vector_store=None,  # Set once the background load finishes
+        async_openrouter_client=async_openrouter_client,
+        hedge_query_types=[t.strip() for t in os.getenv('OPENROUTER_HEDGE_QUERY_TYPES', ','.join(DEFAULT_HEDGE_QUERY_TYPES)).split(',') if t.strip()],
+        prompt_budget=prompt_budget,
+        topic_filter=topic_filter,
+        topic_filter_query_types=[t.strip() for t in os.getenv('TOPIC_FILTER_QUERY_TYPES', ','.join(DEFAULT_TOPIC_FILTER_QUERY_TYPES)).split(',') if t.strip()],
+        templated_responder=templated_responder
     )
     response_formatter = ResponseFormatter()
     
-    # Initialize response cache (5 minutes TTL)
-    response_cache = ResponseCache(ttl_seconds=300)
-    logger.info("Response cache initialized")
+    # Semantic cache: paraphrased FAQ queries reuse answers (created once the embedding model is loaded)
+    semantic_cache = None
+    
+    # Response cache storage: per-process LRU, or Redis so every worker/container shares hits and invalidation
+    cache_backend = InMemoryBackend(
+        max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 5000)),
+        max_bytes=int(os.getenv('CACHE_MAX_BYTES', 50 * 1024 * 1024))
+    )
+    if os.getenv('CACHE_BACKEND', 'memory').lower() == 'redis':
+        try:
+            cache_backend = RedisBackend.from_url(
+                os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+                prefix=os.getenv('CACHE_REDIS_PREFIX', 'rag:response:'),
+                socket_timeout=float(os.getenv('CACHE_REDIS_TIMEOUT', 0.5))
+            )
+            cache_backend.client.ping()
+        except RuntimeError as backend_err:
+            logger.warning(f"{backend_err}; falling back to the in-memory response cache")
+        except Exception as redis_err:
+            # Keep the Redis backend: failed calls are treated as misses until the server is reachable
+            logger.warning(f"Redis cache not reachable yet: {redis_err}")
+    
+    # Initialize response cache (TTL + LRU, swept in the background)
+    response_cache = ResponseCache(
+        ttl_seconds=int(os.getenv('CACHE_TTL', 300)),
+        shared_query_types=[t.strip() for t in os.getenv('CACHE_SHARED_QUERY_TYPES', ','.join(SHARED_QUERY_TYPES)).split(',') if t.strip()],
+        backend=cache_backend
+    )
+    logger.info(f"Response cache initialized ({cache_backend.name} backend)")
+    
+    # Per-student context cache (skips the database for consecutive messages)
+    student_context_cache = StudentContextCache(
+        ttl_seconds=float(os.getenv('STUDENT_CONTEXT_TTL', 60)),
+        max_entries=int(os.getenv('STUDENT_CONTEXT_MAX_ENTRIES', 2000))
+    )
+    
+    # Identical cacheable /chat queries in flight wait on one upstream call
+    chat_flights = SingleFlight()
+    coalesce_stats = {"served": 0, "recomputed": 0}
+    
+    # Shared PostgreSQL connection pool (avoids a new TLS handshake per request)
+    db_pool = PostgresPool(
+        db_host=os.getenv('SUPABASE_DB_HOST'),
+        db_port=os.getenv('SUPABASE_DB_PORT'),
+        db_name=os.getenv('SUPABASE_DB_NAME'),
+        db_user=os.getenv('SUPABASE_DB_USER'),
+        db_password=os.getenv('SUPABASE_DB_PASSWORD'),
+        min_size=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+        max_size=int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+        max_idle=float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+        health_check_after=float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', 30)),
+        acquire_timeout=float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', 5))
+    )
     
     knowledge_sync = KnowledgeSync(
         db_host=os.getenv('SUPABASE_DB_HOST'),
         db_port=os.getenv('SUPABASE_DB_PORT'),
         db_name=os.getenv('SUPABASE_DB_NAME'),
         db_user=os.getenv('SUPABASE_DB_USER'),
-        db_password=os.getenv('SUPABASE_DB_PASSWORD')
+        db_password=os.getenv('SUPABASE_DB_PASSWORD'),
+        pool=db_pool,
+        use_prepared_statements=os.getenv('DB_PREPARED_STATEMENTS', 'False').lower() == 'true'
     )
     
     logger.info("All services initialized successfully")
@@ -97,6 +228,72 @@ except Exception as e:
     raise
 
 
+def build_vector_store():
+    """Load Chroma and the embedding model (runs on the background loader thread)"""
+    from vector_store import VectorStore
+    return VectorStore(
+        persist_directory=os.getenv('CHROMADB_PATH', './chroma_db'),
+        persistent=os.getenv('CHROMADB_PERSISTENT', 'True').lower() == 'true',
+        embed_batch_size=int(os.getenv('EMBED_BATCH_SIZE', 32)),
+        embed_max_wait_ms=float(os.getenv('EMBED_MAX_WAIT_MS', 5)),
+        embed_cache_max_entries=int(os.getenv('EMBED_CACHE_MAX_ENTRIES', 10000)),
+        embed_cache_max_bytes=int(os.getenv('EMBED_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    )
+
+
+def on_knowledge_base_change(stats: Dict[str, Any]):
+    """Cached answers may quote the edited sections"""
+    removed = response_cache.invalidate()
+    logger.info(f"Knowledge base changed ({stats['embedded']} embedded, {stats['deleted']} deleted); "
+                f"{removed} cached responses removed")
+
+
+def attach_vector_store(store):
+    """Switch on RAG retrieval and the semantic cache once the vector store has loaded"""
+    global vector_store, semantic_cache, knowledge_watcher
+    # Opt-in: the default similarity threshold has not been evaluated on the production model
+    if os.getenv('SEMANTIC_CACHE_ENABLED', 'False').lower() == 'true':
+        # Paraphrased FAQ queries reuse answers (needs the vector store's embedding model)
+        semantic_cache = SemanticCache(
+            dimension=store.embedding_model.dimension,
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.9)),
+            ttl_seconds=int(os.getenv('CACHE_TTL', 300)),
+            max_entries=int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', 2000))
+        )
+        response_cache.semantic_cache = semantic_cache
+    if topic_filter is not None:
+        try:
+            topic_filter.fit_file(
+                os.getenv('TOPIC_FILTER_TRAINING_FILE', 'topic_training_queries.jsonl'),
+                lambda texts: store.embedding_model.encode(texts, normalize=True, batch_size=64)
+            )
+        except Exception as e:
+            logger.warning(f"Topic pre-filter not trained, every query goes to the LLM: {e}")
+    context_handler.vector_store = store
+    vector_store = store
+    logger.info("Vector store attached; RAG retrieval enabled")
+    if os.getenv('KB_WATCH', 'False').lower() == 'true':
+        # Index writes from another process are invisible to this one, so the service reindexes itself
+        knowledge_watcher = KnowledgeBaseWatcher(
+            KnowledgeBaseIndexer(
+                store,
+                kb_dir=os.getenv('KB_PATH', 'knowledge_base'),
+                batch_size=int(os.getenv('INDEX_BATCH_SIZE', 64)),
+                chunker=Chunker(
+                    max_tokens=int(os.getenv('CHUNK_MAX_TOKENS', 200)),
+                    overlap_tokens=int(os.getenv('CHUNK_OVERLAP_TOKENS', 30))
+                )
+            ),
+            interval_seconds=float(os.getenv('KB_WATCH_INTERVAL', 2)),
+            on_change=on_knowledge_base_change
+        )
+        knowledge_watcher.start()
+
+
+vector_store_loader = BackgroundLoader(build_vector_store, name="vector store")
+vector_store_loader.on_ready(attach_vector_store)
+
+
 # Pydantic Models
 class ChatRequest(BaseModel):
     student_id: int = Field(..., description="Student ID")
@@ -115,10 +312,12 @@ class ChatResponse(BaseModel):
     timestamp: str
     model_used: Optional[str] = None
     query_type: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None
 
 
 class SyncRequest(BaseModel):
     force: Optional[bool] = Field(False, description="Force full resync")
+    student_ids: Optional[List[int]] = Field(None, description="Only invalidate these students' cached context (e.g. after an assessment submission)")
 
 
 class SyncResponse(BaseModel):
@@ -128,6 +327,99 @@ class SyncResponse(BaseModel):
     timestamp: str
 
 
+async def load_student_context(student_id: int) -> Dict[str, Any]:
+    """
+    Get student-specific context from database, or an empty context if the database fails
+    """
+    try:
+        student_context = await student_context_cache.get_or_load(student_id, knowledge_sync.get_student_context_async)
+        logger.info(f"Retrieved context for student {student_id}")
+        return student_context
+    except Exception as db_error:
+        logger.warning(f"Database context retrieval failed: {db_error}")
+        # Continue with empty context if database fails
+        return empty_student_context()
+
+
+async def embed_query_for_cache(message: str, query_type: str) -> Optional[List[float]]:
+    """
+    Embed the query for the semantic cache lookup (shared query types only)
+    The same embedding is reused for vector search on a miss
+    """
+    if semantic_cache is None or not response_cache.is_shared(query_type):
+        return None
+    try:
+        return await vector_store.embed_query_async(message)
+    except Exception as e:
+        logger.warning(f"Query embedding failed, skipping semantic cache: {e}")
+        return None
+
+
+async def prefetch_chat_context(request: ChatRequest, query_type: str, query_embedding: Optional[List[float]],
+                                timings: StageTimings):
+    """
+    Pre-LLM fan-out: the student context (database) and retrieval (query embedding, topic
+    pre-filter, vector search) are independent, so they run concurrently, each with its own timeout
+    Returns: (student_context, prefetched) for ContextHandler.process_query_async/stream_query_async
+    """
+    with timings.measure("prefetch"):
+        return await asyncio.gather(
+            timings.run("context", load_student_context(request.student_id),
+                        CHAT_CONTEXT_TIMEOUT, empty_student_context()),
+            timings.run("retrieval", context_handler.prefetch_async(request.message, query_type, query_embedding, timings),
+                        CHAT_RETRIEVAL_TIMEOUT, (query_embedding, None, []))
+        )
+
+
+async def generate_chat_response(request: ChatRequest, query_type: str, query_embedding: Optional[List[float]] = None,
+                                 timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+    """
+    Answer a chat request upstream (student context + RAG + OpenRouter) and cache the result
+    The returned response carries the per-stage timings (not cached)
+    """
+    timings = timings or StageTimings()
+    
+    # Get student-specific context from database while the knowledge base is searched
+    student_context, prefetched = await prefetch_chat_context(request, query_type, query_embedding, timings)
+    
+    # Process query with context handler (includes OpenRouter + fallback + RAG)
+    message, data, query_type, model_used = await context_handler.process_query_async(
+        student_id=request.student_id,
+        query=request.message,
+        student_context=student_context,
+        student_email=request.student_email,
+        student_name=request.student_name,
+        conversation_history=request.conversation_history,  # Add conversation history for context
+        query_embedding=query_embedding,
+        prefetched=prefetched,
+        timings=timings
+    )
+    
+    # Format response with status indicators
+    response = response_formatter.format_response(
+        message=message,
+        data=data,
+        query_type=query_type,
+        student_id=request.student_id,
+        model_used=model_used
+    )
+    
+    # Cache response if appropriate (non-personalized queries)
+    if model_used not in UNCACHED_MODELS and response_cache.should_cache(request.message, query_type):
+        await response_cache.set_async(request.message, request.student_id, response, query_type,
+                                       student_name=request.student_name,
+                                       private_terms=personal_terms(student_context, request.student_email),
+                                       query_embedding=query_embedding)
+        logger.info(f"Response cached for future requests")
+    
+    return dict(response, timings=timings.as_dict())
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 # Endpoints
 @app.get("/")
 async def root():
@@ -146,20 +438,30 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     try:
-        # Check database connection
-        try:
-            conn = knowledge_sync.get_postgres_connection()
-            conn.close()
-            db_status = "connected"
-        except:
-            db_status = "disconnected"
+        # Check database connection (pooled SELECT 1, off the event loop)
+        db_ok = await knowledge_sync.async_pool.check()
+        db_status = "connected" if db_ok else "disconnected"
         
+        # "warming" (still HTTP 200) until the embedding model and vector store have loaded and been
+        # attached; "degraded" if that failed and chat answers go without retrieved documents
+        if vector_store_loader.state in (IDLE, WARMING):
+            status = "warming"
+        elif vector_store is None:
+            status = "degraded"
+        else:
+            status = "healthy"
         return {
-            "status": "healthy",
+            "status": status,
             "timestamp": datetime.utcnow().isoformat() + "Z",
+            "vector_store": vector_store_loader.get_status(),
             "database": db_status,
+            "database_pool": db_pool.get_stats(),
             "primary_model": os.getenv('OPENROUTER_PRIMARY_MODEL'),
-            "fallback_model": os.getenv('OPENROUTER_FALLBACK_MODEL')
+            "fallback_model": os.getenv('OPENROUTER_FALLBACK_MODEL'),
+            "models": {
+                model: {"state": health["state"], "health_score": health["health_score"]}
+                for model, health in async_openrouter_client.get_model_health().items()
+            }
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -180,57 +482,48 @@ async def chat(request: ChatRequest):
     Processes queries with RAG and OpenRouter AI with comprehensive fallback chain
     """
     logger.info(f"Chat request from student {request.student_id}: {request.message}")
+    timings = StageTimings()
     
     try:
-        # Check cache first (only for non-personalized queries)
-        if response_cache.should_cache(request.message):
-            cached = response_cache.get(request.message, request.student_id)
+        # Check cache first (only for non-personalized queries; FAQ types are shared across students)
+        with timings.measure("classify"):
+            cache_query_type = context_handler.classify_query(request.message)
+        query_embedding = None
+        if response_cache.should_cache(request.message, cache_query_type):
+            with timings.measure("cache"):
+                query_embedding = await embed_query_for_cache(request.message, cache_query_type)
+                cached = await response_cache.get_async(request.message, request.student_id, cache_query_type, request.student_name,
+                                                        query_embedding=query_embedding)
             if cached:
                 logger.info(f"Returning cached response for student {request.student_id}")
                 cached['from_cache'] = True
                 cached['timestamp'] = datetime.utcnow().isoformat() + "Z"
+                cached['timings'] = timings.as_dict()
                 return cached
-        
-        # Get student-specific context from database
-        try:
-            student_context = knowledge_sync.get_student_context(request.student_id)
-            logger.info(f"Retrieved context for student {request.student_id}")
-        except Exception as db_error:
-            logger.warning(f"Database context retrieval failed: {db_error}")
-            # Continue with empty context if database fails
-            student_context = {
-                'available_assessments': [],
-                'completed_assessments': [],
-                'performance_summary': {}
-            }
-        
-        # Process query with context handler (includes OpenRouter + fallback + RAG)
-        message, data, query_type, model_used = context_handler.process_query(
-            student_id=request.student_id,
-            query=request.message,
-            student_context=student_context,
-            student_email=request.student_email,
-            student_name=request.student_name,
-            conversation_history=request.conversation_history  # Add conversation history for context
-        )
-        
-        # Format response with status indicators
-        response = response_formatter.format_response(
-            message=message,
-            data=data,
-            query_type=query_type,
-            student_id=request.student_id,
-            model_used=model_used
-        )
-        
-        # Cache response if appropriate (non-personalized queries)
-        if response_cache.should_cache(request.message, query_type):
-            response_cache.set(request.message, request.student_id, response)
-            logger.info(f"Response cached for future requests")
+            
+            # Identical cacheable queries already in flight share one upstream call
+            flight_key = response_cache.flight_key(request.message, request.student_id, cache_query_type)
+            response, coalesced = await chat_flights.do(
+                flight_key, lambda: generate_chat_response(request, cache_query_type, query_embedding, timings)
+            )
+            if coalesced:
+                cached = await response_cache.get_async(request.message, request.student_id, cache_query_type, request.student_name)
+                if cached:
+                    coalesce_stats["served"] += 1
+                    logger.info(f"Returning coalesced response for student {request.student_id}")
+                    cached['from_cache'] = True
+                    cached['timestamp'] = datetime.utcnow().isoformat() + "Z"
+                    cached['timings'] = timings.as_dict()
+                    return cached
+                # The leader's answer was specific to its student; answer this one separately
+                coalesce_stats["recomputed"] += 1
+                response = await generate_chat_response(request, cache_query_type, query_embedding, timings)
+        else:
+            response = await generate_chat_response(request, cache_query_type, query_embedding, timings)
         
         response['from_cache'] = False
         
-        logger.info(f"Response generated successfully for student {request.student_id} using model {model_used}")
+        logger.info(f"Response generated successfully for student {request.student_id} using model {response.get('model_used')}")
         return response
     
     except Exception as e:
@@ -248,10 +541,103 @@ async def chat(request: ChatRequest):
             follow_up_questions=[],
             timestamp=datetime.utcnow().isoformat() + "Z",
             model_used='error',
-            query_type='error'
+            query_type='error',
+            timings=timings.as_dict()
         )
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events)
+    Sends `token` events as OpenRouter produces them, then a `metadata` event carrying the
+    formatted response (actions, follow_up_questions, ...) and a final `done` event
+    """
+    logger.info(f"Streaming chat request from student {request.student_id}: {request.message}")
+    
+    async def event_stream():
+        timings = StageTimings()
+        try:
+            # Cached answers are sent as a single token
+            with timings.measure("classify"):
+                cache_query_type = context_handler.classify_query(request.message)
+            query_embedding = None
+            if response_cache.should_cache(request.message, cache_query_type):
+                with timings.measure("cache"):
+                    query_embedding = await embed_query_for_cache(request.message, cache_query_type)
+                    cached = await response_cache.get_async(request.message, request.student_id, cache_query_type, request.student_name,
+                                                            query_embedding=query_embedding)
+                if cached:
+                    logger.info(f"Streaming cached response for student {request.student_id}")
+                    cached = dict(cached, from_cache=True, timestamp=datetime.utcnow().isoformat() + "Z",
+                                  timings=timings.as_dict())
+                    yield sse_event("token", {"content": cached.get('message', '')})
+                    yield sse_event("metadata", cached)
+                    yield sse_event("done", {})
+                    return
+            
+            student_context, prefetched = await prefetch_chat_context(request, cache_query_type, query_embedding, timings)
+            
+            final = None
+            async for event in context_handler.stream_query_async(
+                student_id=request.student_id,
+                query=request.message,
+                student_context=student_context,
+                student_email=request.student_email,
+                student_name=request.student_name,
+                conversation_history=request.conversation_history,
+                query_embedding=query_embedding,
+                prefetched=prefetched,
+                timings=timings
+            ):
+                if event["type"] == "token":
+                    yield sse_event("token", {"content": event["content"]})
+                else:
+                    final = event
+            
+            response = response_formatter.format_response(
+                message=final["message"],
+                data=final["data"],
+                query_type=final["query_type"],
+                student_id=request.student_id,
+                model_used=final["model_used"]
+            )
+            
+            if final["model_used"] not in UNCACHED_MODELS and response_cache.should_cache(request.message, final["query_type"]):
+                await response_cache.set_async(request.message, request.student_id, response, final["query_type"],
+                                               student_name=request.student_name,
+                                               private_terms=personal_terms(student_context, request.student_email),
+                                               query_embedding=query_embedding)
+                logger.info(f"Response cached for future requests")
+            
+            response['from_cache'] = False
+            response['timings'] = timings.as_dict()
+            yield sse_event("metadata", response)
+            logger.info(f"Streamed response for student {request.student_id} using model {final['model_used']}")
+        
+        except Exception as e:
+            logger.error(f"Streaming chat error: {e}")
+            yield sse_event("error", {
+                "success": True,
+                "message": "I'm experiencing technical difficulties right now. Please try again in a moment or contact support if the issue persists.",
+                "data": {'service_status': 'error', 'error': str(e)},
+                "actions": [],
+                "follow_up_questions": [],
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "model_used": 'error',
+                "query_type": 'error',
+                "timings": timings.as_dict()
+            })
+        
+        yield sse_event("done", {})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/sync-knowledge", response_model=SyncResponse)
 async def sync_knowledge(
     request: SyncRequest = SyncRequest(),
@@ -260,9 +646,26 @@ async def sync_knowledge(
     """
     Trigger knowledge base sync from database
     Called by Laravel when admin updates assessments/questions
+    With student_ids, only those students' cached contexts and answers are invalidated
     """
+    if request.student_ids:
+        invalidated = sum(1 for student_id in request.student_ids if student_context_cache.invalidate(student_id))
+        responses_removed = sum([await response_cache.invalidate_async(student_id) for student_id in request.student_ids])
+        logger.info(f"Invalidated cached context for students {request.student_ids}")
+        return {
+            "success": True,
+            "message": "Student context invalidated",
+            "stats": {"students_invalidated": len(request.student_ids), "cached_contexts_removed": invalidated,
+                      "cached_responses_removed": responses_removed},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    
     logger.info(f"Knowledge sync requested (force={request.force})")
     
+    # Assessments changed for everyone: every cached student context and answer is stale
+    invalidated = student_context_cache.invalidate_all()
+    responses_removed = await response_cache.invalidate_async()
+    
     try:
         # Perform sync in background for non-blocking
         if request.force:
@@ -270,6 +673,8 @@ async def sync_knowledge(
         else:
             # Quick incremental sync
             stats = await asyncio.get_event_loop().run_in_executor(None, knowledge_sync.sync_all, False)
+        stats["cached_contexts_removed"] = invalidated
+        stats["cached_responses_removed"] = responses_removed
         
         return {
             "success": True,
@@ -289,15 +694,19 @@ async def sync_knowledge(
 
 
 @app.post("/init-student-context")
-async def init_student_context(student_id: int):
+async def init_student_context(student_id: int, refresh: bool = True):
     """
     Initialize or refresh student-specific context
-    Can be called when student logs in
+    Called when a student logs in (warms the context cache so the first chat message is fast)
+    and after an assessment submission (refresh drops the stale cached context first)
     """
-    logger.info(f"Initializing context for student {student_id}")
+    logger.info(f"Initializing context for student {student_id} (refresh={refresh})")
     
     try:
-        context = knowledge_sync.get_student_context(student_id)
+        if refresh:
+            context = await student_context_cache.refresh(student_id, knowledge_sync.get_student_context_async)
+        else:
+            context = await student_context_cache.get_or_load(student_id, knowledge_sync.get_student_context_async)
         
         return {
             "success": True,
@@ -315,13 +724,44 @@ async def init_student_context(student_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Get response cache, student context cache and query embedding cache statistics"""
+    return {
+        "response_cache": response_cache.get_stats(),
+        "student_context_cache": student_context_cache.get_stats(),
+        "query_embedding_cache": vector_store.query_embeddings.get_stats() if vector_store is not None else None,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Request coalescing and cache hit counters for this worker"""
+    cache_stats = response_cache.get_stats()
+    return {
+        "single_flight": dict(chat_flights.get_stats(),
+                              coalesced_served=coalesce_stats["served"],
+                              coalesced_recomputed=coalesce_stats["recomputed"]),
+        "response_cache": {key: cache_stats[key] for key in ("hits", "misses", "hit_rate", "shared_hits",
+                                                             "student_hits", "semantic_hits")},
+        "knowledge_index": knowledge_watcher.get_stats() if knowledge_watcher is not None else None,
+        "prompt_tokens": prompt_budget.get_stats() if prompt_budget is not None else None,
+        "topic_filter": topic_filter.get_stats() if topic_filter is not None else None,
+        "templated_responses": templated_responder.get_stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+
 @app.get("/models")
 async def get_models():
     """Get available models"""
     return {
         "primary_model": os.getenv('OPENROUTER_PRIMARY_MODEL'),
         "fallback_model": os.getenv('OPENROUTER_FALLBACK_MODEL'),
-        "api_url": os.getenv('OPENROUTER_API_URL')
+        "api_url": os.getenv('OPENROUTER_API_URL'),
+        "model_health": async_openrouter_client.get_model_health(),
+        "connection_pool": async_openrouter_client.get_pool_stats()
     }
 
 
@@ -335,12 +775,22 @@ async def startup_event():
     logger.info(f"Fallback Model: {os.getenv('OPENROUTER_FALLBACK_MODEL')}")
     logger.info(f"Database: {os.getenv('SUPABASE_DB_HOST')}")
     logger.info("=" * 60)
+    response_cache.start_sweeper(float(os.getenv('CACHE_SWEEP_INTERVAL', 60)))
+    vector_store_loader.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     logger.info("RAG Service shutting down...")
+    await response_cache.stop_sweeper()
+    if knowledge_watcher is not None:
+        knowledge_watcher.stop()
+    response_cache.backend.close()
+    if vector_store is not None:
+        vector_store.close()
+    await async_openrouter_client.aclose()
+    db_pool.close()
 
 
 # Error handlers
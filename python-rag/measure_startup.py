@@ -0,0 +1,86 @@
+"""
+Startup Time Measurement
+Starts the service with uvicorn and reports how long it takes to accept requests
+(first answer on /) and to finish warming (/health no longer reports "warming")
+
+Usage:
+    python measure_startup.py
+    python measure_startup.py --runs 3 --timeout 300
+"""
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(timeout: float) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {"accepting_s": None, "ready_s": None, "vector_store": None}
+    try:
+        with httpx.Client(timeout=2) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    result["error"] = f"service exited with code {process.returncode}"
+                    break
+                try:
+                    if result["accepting_s"] is None:
+                        client.get(f"{base_url}/")
+                        result["accepting_s"] = time.perf_counter() - started
+                    health = client.get(f"{base_url}/health").json()
+                    if health.get("status") != "warming":
+                        result["ready_s"] = time.perf_counter() - started
+                        result["vector_store"] = health.get("vector_store")
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.05)
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+
+def main(args):
+    print("=" * 72)
+    print(f"Measuring service startup ({args.runs} run(s), timeout {args.timeout}s)")
+    print("=" * 72)
+    accepting, ready = [], []
+    for run in range(1, args.runs + 1):
+        result = measure_once(args.timeout)
+        if result.get("error") or result["ready_s"] is None:
+            print(f"run {run}: failed ({result.get('error', 'timed out')})")
+            continue
+        accepting.append(result["accepting_s"])
+        ready.append(result["ready_s"])
+        print(f"run {run}: accepting requests after {result['accepting_s']:.2f}s, "
+              f"warm after {result['ready_s']:.2f}s (vector store: {result['vector_store']})")
+    if accepting:
+        print("=" * 72)
+        print(f"median: accepting {statistics.median(accepting):.2f}s, warm {statistics.median(ready):.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure time to accept requests and to finish warming")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for each start")
+    main(parser.parse_args())
@@ -0,0 +1,307 @@
+"""
+Model Health Tracking for OpenRouter Models
+Per-model latency histograms used to derive hedge delays for call_with_fallback,
+and per-model circuit breakers so unhealthy models are skipped immediately
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (last bucket catches everything slower)
+LATENCY_BUCKETS = [0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 12.0, 20.0, 30.0, 60.0]
+
+
+class LatencyHistogram:
+    """
+    Latency histogram for a single model
+    Keeps cumulative bucket counts for reporting and a rolling window of recent
+    samples so percentiles follow the model's current behaviour
+    """
+
+    def __init__(self, window_size: int = 200):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.recent = deque(maxlen=window_size)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Record a successful call latency"""
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.recent.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Percentile (0-1) over the rolling window, None if no samples yet
+        """
+        with self._lock:
+            if not self.recent:
+                return None
+            samples = sorted(self.recent)
+        index = min(len(samples) - 1, max(0, int(round(p * len(samples))) - 1))
+        return samples[index]
+
+    def sample_count(self) -> int:
+        """Number of samples in the rolling window"""
+        return len(self.recent)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get histogram statistics
+        """
+        buckets = {f"le_{bound}s": self.bucket_counts[i] for i, bound in enumerate(LATENCY_BUCKETS)}
+        buckets["gt_60.0s"] = self.bucket_counts[-1]
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "count": self.count,
+            "mean_s": round(self.total / self.count, 3) if self.count else None,
+            "p50_s": round(p50, 3) if p50 is not None else None,
+            "p95_s": round(p95, 3) if p95 is not None else None,
+            "buckets": buckets
+        }
+
+
+class ModelLatencyTracker:
+    """
+    Latency histograms keyed by model name
+    Derives the hedge delay (when to fire the fallback model) from the primary
+    model's recent latency percentile
+    """
+
+    def __init__(self, hedge_percentile: float = 0.95, default_hedge_delay: float = 2.0,
+                 min_hedge_delay: float = 0.5, max_hedge_delay: float = 10.0, min_samples: int = 20):
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.min_samples = min_samples
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def get(self, model: str) -> LatencyHistogram:
+        """Get (or create) the histogram for a model"""
+        if model not in self.histograms:
+            self.histograms[model] = LatencyHistogram()
+        return self.histograms[model]
+
+    def record(self, model: str, seconds: float):
+        """Record a successful call latency for a model"""
+        self.get(model).record(seconds)
+
+    def hedge_delay(self, model: str) -> float:
+        """
+        Seconds to wait on `model` before hedging with the fallback
+        Uses the configured percentile once enough samples exist, otherwise the default
+        """
+        histogram = self.get(model)
+        if histogram.sample_count() < self.min_samples:
+            return self.default_hedge_delay
+        delay = histogram.percentile(self.hedge_percentile)
+        return max(self.min_hedge_delay, min(self.max_hedge_delay, delay))
+
+    def get_stats(self, models: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get latency statistics and current hedge delay per model
+        """
+        stats = {}
+        for model in models or list(self.histograms.keys()):
+            model_stats = self.get(model).get_stats()
+            model_stats["hedge_delay_s"] = round(self.hedge_delay(model), 3)
+            stats[model] = model_stats
+        return stats
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single model
+    CLOSED: calls flow normally while outcomes are recorded in a rolling window
+    OPEN: calls are rejected immediately until the cool-down elapses
+    HALF_OPEN: a trickle of probe calls decides between CLOSED and OPEN
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, window_seconds: float = 60.0, min_requests: int = 5,
+                 error_rate_threshold: float = 0.5, slow_call_seconds: float = 20.0,
+                 slow_call_rate_threshold: float = 0.8, cooldown_seconds: float = 30.0,
+                 half_open_max_probes: int = 1, half_open_success_threshold: int = 2):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_max_probes = half_open_max_probes
+        self.half_open_success_threshold = half_open_success_threshold
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.outcomes = deque()  # (timestamp, success, latency)
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        """Drop outcomes that fell out of the rolling window"""
+        while self.outcomes and now - self.outcomes[0][0] > self.window_seconds:
+            self.outcomes.popleft()
+
+    def _refresh_state(self, now: float):
+        """Move OPEN to HALF_OPEN once the cool-down has elapsed"""
+        if self.state == self.OPEN and now - self.opened_at >= self.cooldown_seconds:
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+            self.probe_successes = 0
+            logger.info(f"Circuit for model {self.name} half-open, probing")
+
+    def _open(self, now: float, reason: str):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.times_opened += 1
+        logger.warning(f"Circuit for model {self.name} OPEN ({reason}), skipping for {self.cooldown_seconds}s")
+
+    def _rates(self):
+        """Error rate and slow-call rate over the rolling window"""
+        total = len(self.outcomes)
+        if total == 0:
+            return 0.0, 0.0
+        errors = sum(1 for _, success, _ in self.outcomes if not success)
+        slow = sum(1 for _, _, latency in self.outcomes if latency is not None and latency >= self.slow_call_seconds)
+        return errors / total, slow / total
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call to this model may proceed
+        In HALF_OPEN only half_open_max_probes concurrent probes are let through
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_state(now)
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and self.probes_in_flight < self.half_open_max_probes:
+                self.probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def is_available(self) -> bool:
+        """Whether the model is currently worth calling (without reserving a probe slot)"""
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            return self.state != self.OPEN
+
+    def record_success(self, latency: float):
+        """Record a successful call"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+                self.probe_successes += 1
+                if self.probe_successes >= self.half_open_success_threshold:
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                    logger.info(f"Circuit for model {self.name} CLOSED after successful probes")
+                return
+            self.outcomes.append((now, True, latency))
+            self._trim(now)
+            self._check_thresholds(now)
+
+    def record_failure(self, latency: Optional[float] = None):
+        """Record a failed call (error, rate limit or timeout)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+                self._open(now, "probe failed")
+                return
+            self.outcomes.append((now, False, latency))
+            self._trim(now)
+            self._check_thresholds(now)
+
+    def release_probe(self):
+        """Release a probe slot for a call that was cancelled before completing"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def _check_thresholds(self, now: float):
+        if self.state != self.CLOSED or len(self.outcomes) < self.min_requests:
+            return
+        error_rate, slow_rate = self._rates()
+        if error_rate >= self.error_rate_threshold:
+            self._open(now, f"error rate {error_rate:.0%}")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._open(now, f"slow call rate {slow_rate:.0%}")
+
+    def health_score(self) -> int:
+        """
+        Health score (0-100) for a model
+        0 while OPEN, capped at 50 while HALF_OPEN, otherwise penalised by error and slow-call rates
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_state(now)
+            self._trim(now)
+            if self.state == self.OPEN:
+                return 0
+            error_rate, slow_rate = self._rates()
+            score = int(round(100 - error_rate * 70 - slow_rate * 30))
+            if self.state == self.HALF_OPEN:
+                score = min(score, 50)
+            return max(0, min(100, score))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state and rolling window statistics
+        """
+        score = self.health_score()
+        with self._lock:
+            error_rate, slow_rate = self._rates()
+            stats = {
+                "state": self.state,
+                "health_score": score,
+                "window_requests": len(self.outcomes),
+                "error_rate": round(error_rate, 3),
+                "slow_call_rate": round(slow_rate, 3),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
+            if self.state == self.OPEN:
+                stats["retry_in_s"] = round(max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at)), 1)
+            return stats
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers keyed by model name, all sharing the same configuration
+    """
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        """Get (or create) the breaker for a model"""
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(model, **self.breaker_kwargs)
+        return self.breakers[model]
+
+    def get_stats(self, models: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get breaker state per model
+        """
+        return {model: self.get(model).get_stats() for model in models or list(self.breakers.keys())}
@@ -3,27 +3,58 @@ OpenRouter API Client with Model Fallback
 Handles API calls to OpenRouter with automatic fallback between models
 """
 import requests
+import httpx
+import asyncio
 import json
 import time
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from datetime import datetime
+from urllib.parse import urlparse
+from model_health import ModelLatencyTracker, CircuitBreakerRegistry
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+def build_payload(messages: List[Dict[str, str]], model: str, **kwargs) -> Dict[str, Any]:
+    """
+    Build the chat completion payload shared by the sync and async clients
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": kwargs.get("temperature", 0.7),
+        "max_tokens": kwargs.get("max_tokens", 1000),
+        "top_p": kwargs.get("top_p", 0.9)
+    }
+    
+    # Add any additional parameters
+    for key, value in kwargs.items():
+        if key not in ["temperature", "max_tokens", "top_p"] and key in ["frequency_penalty", "presence_penalty", "stop"]:
+            payload[key] = value
+    
+    return payload
+
+def build_headers(api_key: str) -> Dict[str, str]:
+    """
+    Build the OpenRouter request headers
+    """
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:8000",
+        "X-Title": "College Placement Portal"
+    }
+
 class OpenRouterClient:
-    def __init__(self, api_key: str, primary_model: str, fallback_model: str, api_url: str = "https://openrouter.ai/api/v1/chat/completions"):
+    def __init__(self, api_key: str, primary_model: str, fallback_model: str, api_url: str = DEFAULT_API_URL):
         self.api_key = api_key
         self.primary_model = primary_model
         self.fallback_model = fallback_model
         self.api_url = api_url
         self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:8000",
-            "X-Title": "College Placement Portal"
-        })
+        self.session.headers.update(build_headers(self.api_key))
         
     def call_api(self, messages: List[Dict[str, str]], model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
@@ -32,18 +63,7 @@ class OpenRouterClient:
         if model is None:
             model = self.primary_model
             
-        payload = {
-            "model": model,
-            "messages": messages,
-            "temperature": kwargs.get("temperature", 0.7),
-            "max_tokens": kwargs.get("max_tokens", 1000),
-            "top_p": kwargs.get("top_p", 0.9)
-        }
-        
-        # Add any additional parameters
-        for key, value in kwargs.items():
-            if key not in ["temperature", "max_tokens", "top_p"] and key in ["frequency_penalty", "presence_penalty", "stop"]:
-                payload[key] = value
+        payload = build_payload(messages, model, **kwargs)
         
         try:
             logger.info(f"Calling OpenRouter API with model: {model}")
@@ -156,4 +176,392 @@ class OpenRouterClient:
                 "error": str(e)
             }
         
-        return results
\ No newline at end of file
+        return results
+
+class AsyncOpenRouterClient:
+    """
+    Asyncio-native OpenRouter client used by the /chat path
+    Keeps a pooled keep-alive (HTTP/2 when available) connection to OpenRouter so
+    many chats can be in flight on one worker without blocking the event loop
+    """
+    def __init__(self, api_key: str, primary_model: str, fallback_model: str, api_url: str = DEFAULT_API_URL,
+                 max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, max_concurrency_per_host: int = 64,
+                 http2: bool = True, timeout: float = 30.0,
+                 latency_tracker: Optional[ModelLatencyTracker] = None,
+                 circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+                 first_token_tracker: Optional[ModelLatencyTracker] = None):
+        self.api_key = api_key
+        self.primary_model = primary_model
+        self.fallback_model = fallback_model
+        self.api_url = api_url
+        self.timeout = timeout
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.total_requests = 0
+        self.latency_tracker = latency_tracker or ModelLatencyTracker()  # Completions only; sets the hedge delay
+        self.first_token_tracker = first_token_tracker or ModelLatencyTracker()  # Streams: time to first token
+        self.circuit_breakers = circuit_breakers or CircuitBreakerRegistry()
+        self.hedges_fired = 0
+        self.hedges_won = 0
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client on first use (inside the running event loop)"""
+        if self._client is None or self._client.is_closed:
+            try:
+                self._client = httpx.AsyncClient(
+                    headers=build_headers(self.api_key),
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    http2=self.http2
+                )
+            except ImportError:
+                # http2=True needs the optional h2 package
+                logger.warning("h2 package not installed, falling back to HTTP/1.1 keep-alive pool")
+                self.http2 = False
+                self._client = httpx.AsyncClient(
+                    headers=build_headers(self.api_key),
+                    limits=self.limits,
+                    timeout=self.timeout
+                )
+        return self._client
+    
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Bound the number of concurrent requests sent to a single host"""
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_concurrency_per_host)
+        return self._host_semaphores[host]
+    
+    async def call_api(self, messages: List[Dict[str, str]], model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Call OpenRouter API without blocking the event loop
+        Raises the same exception messages as OpenRouterClient.call_api, and fails
+        immediately when the model's circuit breaker is open
+        """
+        if model is None:
+            model = self.primary_model
+        
+        breaker = self.circuit_breakers.get(model)
+        if not breaker.allow_request():
+            logger.warning(f"Circuit open for model {model}, skipping call")
+            raise Exception(f"Circuit open for model {model}")
+        
+        start_time = time.time()
+        try:
+            result = await self._post(messages, model, **kwargs)
+        except asyncio.CancelledError:
+            # Client disconnect - not the model's fault (hedge losers are recorded by _call_hedged)
+            breaker.release_probe()
+            raise
+        except Exception:
+            breaker.record_failure(time.time() - start_time)
+            raise
+        
+        breaker.record_success(time.time() - start_time)
+        return result
+    
+    async def _post(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send one chat completion request through the connection pool
+        """
+        payload = build_payload(messages, model, **kwargs)
+        timeout = kwargs.get("timeout", self.timeout)
+        client = self._get_client()
+        
+        try:
+            async with self._get_host_semaphore(self.api_url):
+                self.in_flight += 1
+                self.total_requests += 1
+                try:
+                    logger.info(f"Calling OpenRouter API (async) with model: {model}")
+                    start_time = time.time()
+                    
+                    response = await client.post(self.api_url, json=payload, timeout=timeout)
+                    
+                    response_time = time.time() - start_time
+                    logger.info(f"API call completed in {response_time:.2f} seconds")
+                finally:
+                    self.in_flight -= 1
+            
+            response.raise_for_status()
+            result = response.json()
+            self.latency_tracker.record(model, response_time)
+            
+            # Add metadata
+            if "usage" in result:
+                result["metadata"] = {
+                    "model_used": model,
+                    "response_time": f"{response_time:.2f}s",
+                    "tokens_used": result["usage"].get("total_tokens", 0)
+                }
+            
+            return result
+        
+        except httpx.TimeoutException:
+            logger.error(f"Timeout calling OpenRouter API with model {model}")
+            raise Exception(f"API call timed out after {timeout} seconds")
+        
+        except httpx.HTTPError as e:
+            logger.error(f"Request error calling OpenRouter API with model {model}: {str(e)}")
+            raise Exception(f"API request failed: {str(e)}")
+        
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error from OpenRouter API: {str(e)}")
+            raise Exception(f"Failed to parse API response: {str(e)}")
+        
+        except Exception as e:
+            logger.error(f"Unexpected error calling OpenRouter API with model {model}: {str(e)}")
+            raise e
+    
+    async def call_with_fallback(self, messages: List[Dict[str, str]], strategy: str = "sequential", **kwargs) -> Dict[str, Any]:
+        """
+        Call OpenRouter API with automatic fallback to secondary model
+        
+        Args:
+            strategy: "sequential" waits for the primary to fail before trying the fallback,
+                      "hedged" also fires the fallback once the primary exceeds its hedge delay
+        """
+        if strategy == "hedged":
+            return await self._call_hedged(messages, **kwargs)
+        
+        # Try primary model first
+        try:
+            result = await self.call_api(messages, model=self.primary_model, **kwargs)
+            result["model_used"] = self.primary_model
+            return result
+        except Exception as primary_error:
+            logger.warning(f"Primary model {self.primary_model} failed: {str(primary_error)}")
+            
+            # Try fallback model
+            try:
+                logger.info(f"Trying fallback model {self.fallback_model}")
+                result = await self.call_api(messages, model=self.fallback_model, **kwargs)
+                result["model_used"] = self.fallback_model
+                result["fallback_used"] = True
+                return result
+            except Exception as fallback_error:
+                logger.error(f"Fallback model {self.fallback_model} also failed: {str(fallback_error)}")
+                raise Exception(f"Both primary and fallback models failed. Primary: {str(primary_error)}. Fallback: {str(fallback_error)}")
+    
+    async def _call_hedged(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        """
+        Race the primary and fallback models
+        The fallback is fired after the primary's p95-derived hedge delay (or immediately
+        if the primary fails first); the first successful response wins and the loser is cancelled
+        """
+        # No point racing a model whose circuit is open - let the sequential path skip it
+        if not (self.circuit_breakers.get(self.primary_model).is_available()
+                and self.circuit_breakers.get(self.fallback_model).is_available()):
+            return await self.call_with_fallback(messages, strategy="sequential", **kwargs)
+        
+        hedge_delay = self.latency_tracker.hedge_delay(self.primary_model)
+        primary_task = asyncio.create_task(self.call_api(messages, model=self.primary_model, **kwargs))
+        tasks = {primary_task: self.primary_model}
+        started = {primary_task: time.time()}
+        errors = {}
+        hedge_fired = False
+        
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=hedge_delay)
+            if primary_task in done:
+                if primary_task.exception() is None:
+                    return self._hedged_result(primary_task, self.primary_model, hedge_fired)
+                errors[self.primary_model] = primary_task.exception()
+                logger.warning(f"Primary model {self.primary_model} failed: {str(primary_task.exception())}")
+            else:
+                hedge_fired = True
+                self.hedges_fired += 1
+                logger.info(f"Primary model {self.primary_model} exceeded hedge delay {hedge_delay:.2f}s, "
+                            f"firing fallback {self.fallback_model}")
+            
+            fallback_task = asyncio.create_task(self.call_api(messages, model=self.fallback_model, **kwargs))
+            tasks[fallback_task] = self.fallback_model
+            started[fallback_task] = time.time()
+            
+            # First successful response wins
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return self._hedged_result(task, tasks[task], hedge_fired)
+                    errors[tasks[task]] = task.exception()
+                    logger.warning(f"Hedged call to {tasks[task]} failed: {str(task.exception())}")
+            
+            primary_error = errors.get(self.primary_model)
+            fallback_error = errors.get(self.fallback_model)
+            logger.error(f"Fallback model {self.fallback_model} also failed: {str(fallback_error)}")
+            raise Exception(f"Both primary and fallback models failed. Primary: {str(primary_error)}. Fallback: {str(fallback_error)}")
+        
+        finally:
+            # Cancel whichever call lost the race
+            won = any(task.done() and not task.cancelled() and task.exception() is None for task in tasks)
+            for task in tasks:
+                if not task.done():
+                    if won:
+                        # Beaten by the other model: count it as a failure so a hung model opens its
+                        # breaker instead of being hedged on every request (call_api only releases the
+                        # probe on cancellation, which is all a client disconnect should do)
+                        self.circuit_breakers.get(tasks[task]).record_failure(time.time() - started[task])
+                    task.cancel()
+    
+    def _hedged_result(self, task: asyncio.Task, model: str, hedge_fired: bool) -> Dict[str, Any]:
+        """Annotate the winning hedged response"""
+        result = task.result()
+        result["model_used"] = model
+        result["hedged"] = hedge_fired
+        if model == self.fallback_model:
+            result["fallback_used"] = True
+            if hedge_fired:
+                self.hedges_won += 1
+        return result
+    
+    async def stream_chat(self, messages: List[Dict[str, str]], model: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream completion tokens from OpenRouter (stream=true)
+        Yields content deltas as they arrive over the pooled connection
+        """
+        if model is None:
+            model = self.primary_model
+        
+        breaker = self.circuit_breakers.get(model)
+        if not breaker.allow_request():
+            logger.warning(f"Circuit open for model {model}, skipping stream")
+            raise Exception(f"Circuit open for model {model}")
+        
+        payload = build_payload(messages, model, **kwargs)
+        payload["stream"] = True
+        timeout = kwargs.get("timeout", self.timeout)
+        client = self._get_client()
+        start_time = time.time()
+        first_token_time = None
+        
+        try:
+            async with self._get_host_semaphore(self.api_url):
+                self.in_flight += 1
+                self.total_requests += 1
+                try:
+                    logger.info(f"Streaming from OpenRouter API with model: {model}")
+                    async with client.stream("POST", self.api_url, json=payload, timeout=timeout) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            # Skip SSE comments (": OPENROUTER PROCESSING") and blank keep-alives
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            chunk = json.loads(data)
+                            if "error" in chunk:
+                                raise Exception(f"API stream error: {chunk['error']}")
+                            choices = chunk.get("choices") or []
+                            delta = choices[0].get("delta", {}).get("content") if choices else None
+                            if delta:
+                                if first_token_time is None:
+                                    first_token_time = time.time() - start_time
+                                    logger.info(f"First token from {model} after {first_token_time:.2f} seconds")
+                                yield delta
+                finally:
+                    self.in_flight -= 1
+        
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client disconnected mid-stream - not the model's fault
+            breaker.release_probe()
+            raise
+        
+        except httpx.TimeoutException:
+            breaker.record_failure(time.time() - start_time)
+            logger.error(f"Timeout streaming from OpenRouter API with model {model}")
+            raise Exception(f"API call timed out after {timeout} seconds")
+        
+        except httpx.HTTPError as e:
+            breaker.record_failure(time.time() - start_time)
+            logger.error(f"Request error streaming from OpenRouter API with model {model}: {str(e)}")
+            raise Exception(f"API request failed: {str(e)}")
+        
+        except json.JSONDecodeError as e:
+            breaker.record_failure(time.time() - start_time)
+            logger.error(f"JSON decode error in OpenRouter stream: {str(e)}")
+            raise Exception(f"Failed to parse API response: {str(e)}")
+        
+        except Exception:
+            breaker.record_failure(time.time() - start_time)
+            raise
+        
+        response_time = time.time() - start_time
+        # A stream lasts as long as its answer, so only time to first token says how fast the model
+        # was; it is kept out of the completion histogram that the hedge delay is derived from
+        first_token = first_token_time if first_token_time is not None else response_time
+        breaker.record_success(first_token)
+        self.first_token_tracker.record(model, first_token)
+        logger.info(f"Stream from {model} completed in {response_time:.2f} seconds")
+    
+    async def stream_with_fallback(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream from the primary model, falling back to the secondary model if the
+        primary fails before producing any tokens
+        Yields (model, delta) tuples
+        """
+        errors = {}
+        for model in (self.primary_model, self.fallback_model):
+            started = False
+            try:
+                async for delta in self.stream_chat(messages, model=model, **kwargs):
+                    started = True
+                    yield model, delta
+                return
+            except Exception as e:
+                if started:
+                    # Tokens already reached the student - cannot switch models mid-answer
+                    raise
+                errors[model] = e
+                logger.warning(f"Streaming with model {model} failed: {str(e)}")
+        
+        logger.error(f"Fallback model {self.fallback_model} also failed: {str(errors.get(self.fallback_model))}")
+        raise Exception(f"Both primary and fallback models failed. Primary: {str(errors.get(self.primary_model))}. "
+                        f"Fallback: {str(errors.get(self.fallback_model))}")
+    
+    def get_model_health(self) -> Dict[str, Any]:
+        """
+        Get circuit breaker state and latency statistics for both models
+        """
+        models = [self.primary_model, self.fallback_model]
+        breakers = self.circuit_breakers.get_stats(models)
+        latency = self.latency_tracker.get_stats(models)
+        return {
+            model: {**breakers[model], "latency": latency[model],
+                    "first_token_latency": self.first_token_tracker.get(model).get_stats()}
+            for model in models
+        }
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool configuration and in-flight request counts
+        """
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "max_concurrency_per_host": self.max_concurrency_per_host,
+            "in_flight": self.in_flight,
+            "total_requests": self.total_requests,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won
+        }
+    
+    async def aclose(self):
+        """
+        Close pooled connections (called on service shutdown)
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Async OpenRouter client closed")
@@ -0,0 +1,146 @@
+"""
+Prompt Token Budget for ContextHandler._build_enhanced_prompt
+Measures each prompt component with the local token counter and trims conversation history
+(oldest first, summarized in one line) and retrieved documents (least relevant first) to fit
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from tokenizer import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Chat formatting cost per message (role markers, separators) on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+# Smallest useful piece of a retrieved document or history summary
+MIN_PIECE_TOKENS = 24
+
+COMPONENTS = ("system", "knowledge", "history", "user")
+
+
+class PromptBudget:
+    """
+    Allocates max_prompt_tokens across the prompt
+    - system prompt and current question (with the student context) are always kept whole;
+      the assessment list inside the context is capped at max_assessments
+    - retrieved documents (already ordered by relevance) get up to knowledge_tokens, at most
+      max_doc_tokens each; the last one that fits is truncated, the rest are dropped
+    - conversation history gets up to history_tokens from the newest message backwards, at most
+      max_message_tokens per message; dropped student questions are listed in one summary line
+    """
+
+    def __init__(self, max_prompt_tokens: int = 2500, knowledge_tokens: int = 360, history_tokens: int = 400,
+                 max_doc_tokens: int = 150, max_message_tokens: int = 150, max_history_messages: int = 10,
+                 summary_tokens: int = 60, max_assessments: int = 15, counter: Optional[TokenCounter] = None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.knowledge_tokens = knowledge_tokens
+        self.history_tokens = history_tokens
+        self.max_doc_tokens = max_doc_tokens
+        self.max_message_tokens = max_message_tokens
+        self.max_history_messages = max_history_messages
+        self.summary_tokens = summary_tokens
+        self.max_assessments = max_assessments
+        self.counter = counter or get_token_counter()
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.totals = {component: 0 for component in COMPONENTS + ("total",)}
+        self.max_total = 0
+        self.documents_dropped = 0
+        self.history_dropped = 0
+        self.over_budget = 0
+
+    def fit_documents(self, documents: List[str], budget: int) -> List[str]:
+        """Most relevant documents first until budget is spent"""
+        fitted = []
+        remaining = budget
+        for document in documents:
+            allowance = min(self.max_doc_tokens, remaining)
+            if allowance < MIN_PIECE_TOKENS:
+                break
+            document = self.counter.truncate(document, allowance)
+            fitted.append(document)
+            remaining -= self.counter.count(document)
+        return fitted
+
+    def fit_history(self, history: List[Dict[str, str]], budget: int) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Newest messages that fit in budget, preceded by a summary of the dropped student questions
+        Returns (messages, number of original messages dropped)
+        """
+        kept = []
+        remaining = budget
+        for message in reversed(history[-self.max_history_messages:]):
+            content = self.counter.truncate(message['content'], self.max_message_tokens)
+            cost = self.counter.count(content) + MESSAGE_OVERHEAD_TOKENS
+            if cost > remaining:
+                break
+            kept.append({'role': message['role'], 'content': content})
+            remaining -= cost
+        kept.reverse()
+
+        dropped = history[:len(history) - len(kept)]
+        questions = [message['content'].strip() for message in dropped if message['role'] == 'user']
+        allowance = min(self.summary_tokens, remaining - MESSAGE_OVERHEAD_TOKENS)
+        if questions and allowance >= MIN_PIECE_TOKENS:
+            summary = self.counter.truncate(
+                f"Earlier in this conversation ({len(dropped)} older messages omitted) the student asked: "
+                + "; ".join(questions), allowance)
+            kept.insert(0, {'role': 'system', 'content': summary})
+        return kept, len(dropped)
+
+    def allocate(self, system_prompt: str, user_prompt: str, documents: List[str],
+                 history: List[Dict[str, str]],
+                 format_knowledge=None) -> Tuple[List[str], List[Dict[str, str]], Dict[str, int]]:
+        """
+        Fit documents and history around the fixed system prompt and question
+        format_knowledge(documents) -> str renders the knowledge section (its framing is counted too)
+        Returns (documents, history, token breakdown)
+        """
+        fixed = self.counter.count(system_prompt) + self.counter.count(user_prompt) + 2 * MESSAGE_OVERHEAD_TOKENS
+        available = max(self.max_prompt_tokens - fixed, 0)
+
+        framing = self.counter.count(format_knowledge([""])) if (format_knowledge and documents) else 0
+        fitted_documents = self.fit_documents(documents, min(self.knowledge_tokens, available) - framing)
+        knowledge = self.counter.count(format_knowledge(fitted_documents)) if (format_knowledge and fitted_documents) \
+            else sum(self.counter.count(document) for document in fitted_documents)
+
+        fitted_history, history_dropped = self.fit_history(history, min(self.history_tokens, available - knowledge))
+        breakdown = {
+            'system': self.counter.count(system_prompt) + MESSAGE_OVERHEAD_TOKENS,
+            'knowledge': knowledge,
+            'history': sum(self.counter.count(message['content']) + MESSAGE_OVERHEAD_TOKENS
+                           for message in fitted_history),
+            'user': self.counter.count(user_prompt) + MESSAGE_OVERHEAD_TOKENS,
+            'documents_dropped': len(documents) - len(fitted_documents),
+            'history_dropped': history_dropped
+        }
+        breakdown['total'] = sum(breakdown[component] for component in COMPONENTS)
+        self._record(breakdown)
+        return fitted_documents, fitted_history, breakdown
+
+    def _record(self, breakdown: Dict[str, int]):
+        with self._lock:
+            self.requests += 1
+            for component in self.totals:
+                self.totals[component] += breakdown[component]
+            self.max_total = max(self.max_total, breakdown['total'])
+            self.documents_dropped += breakdown['documents_dropped']
+            self.history_dropped += breakdown['history_dropped']
+            if breakdown['total'] > self.max_prompt_tokens:
+                self.over_budget += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.requests or 1
+            return {
+                'requests': self.requests,
+                'max_prompt_tokens': self.max_prompt_tokens,
+                'counter': self.counter.name,
+                'average_tokens': {component: round(total / requests, 1) for component, total in self.totals.items()},
+                'max_total_tokens': self.max_total,
+                'documents_dropped': self.documents_dropped,
+                'history_messages_dropped': self.history_dropped,
+                'over_budget': self.over_budget
+            }
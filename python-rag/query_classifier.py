@@ -0,0 +1,89 @@
+"""
+Query Classifier for ContextHandler
+Declarative keyword rules compiled once into a single Aho–Corasick automaton: one pass over the
+query finds every rule's keywords, and rule order decides the query type (first match wins)
+"""
+import re
+from typing import Any, Dict, List, Sequence
+
+from keyword_automaton import KeywordAutomaton
+
+OFF_TOPIC_KEYWORDS = {
+    'entertainment': ['game', 'gaming', 'video game', 'pubg', 'fortnite', 'minecraft', 'valorant', 'cod', 'gta', 'fifa', 'movie', 'film', 'netflix', 'series', 'tv show', 'youtube', 'tiktok', 'instagram', 'facebook', 'social media', 'twitter', 'music', 'song', 'spotify'],
+    'personal': ['love', 'girlfriend', 'boyfriend', 'dating', 'relationship', 'crush', 'romance', 'marriage', 'wedding'],
+    'sports': ['cricket', 'football', 'soccer', 'basketball', 'ipl', 'world cup', 'match', 'player', 'team sport'],
+    'random': ['weather', 'food', 'recipe', 'cooking', 'travel', 'vacation', 'holiday', 'party', 'shopping', 'fashion', 'celebrity', 'gossip']
+}
+# Off-topic words next to these are about placement prep ("team player for interviews")
+CAREER_TERMS = ["placement", "career", "job", "interview", "skill", "learning", "study"]
+GREETING_KEYWORDS = ["hi", "hello", "hey", "good morning", "good afternoon", "good evening", "greetings", "yo", "sup", "hola"]
+# A greeting that also asks for data is answered as that request
+GREETING_DATA_TERMS = ["assessment", "test", "exam", "result", "score", "available", "show", "what", "when", "where", "how"]
+
+# Checked in order; a rule matches when one of its keywords occurs in the lowercased query
+# ("prefix" rules: the query is the keyword or starts with it followed by " " or "!")
+# and none of its "unless" keywords do
+CLASSIFICATION_RULES: List[Dict[str, Any]] = [
+    *({'name': f'off_topic:{category}', 'type': 'off_topic', 'keywords': keywords, 'unless': CAREER_TERMS}
+      for category, keywords in OFF_TOPIC_KEYWORDS.items()),
+    {'name': 'greeting', 'type': 'greeting', 'keywords': GREETING_KEYWORDS, 'unless': GREETING_DATA_TERMS,
+     'match': 'prefix'},
+    # Assessment-related queries (must be before "what" check)
+    {'name': 'assessments', 'type': 'assessments',
+     'keywords': ["assessment", "test", "exam", "quiz", "available", "pending", "take test", "start test"]},
+    {'name': 'results', 'type': 'results',
+     'keywords': ["result", "score", "grade", "performance", "pass", "fail", "mark", "marks", "percentage"]},
+    {'name': 'help', 'type': 'help',
+     'keywords': ["how to", "how do", "how can", "guide", "tutorial", "instructions", "steps to"]},
+    # Name change requests (check before general profile)
+    {'name': 'name_change', 'type': 'name_change',
+     'keywords': ["change my name", "update my name", "rename me", "my name is", "call me", "change name to", "update name to"]},
+    {'name': 'profile', 'type': 'profile',
+     'keywords': ["profile", "account", "password", "email", "settings", "update profile"]},
+    {'name': 'general', 'type': 'general',
+     'keywords': ["what is", "what are", "when is", "when are", "where is", "where are", "who is", "why is", "explain"]},
+    {'name': 'acknowledgment', 'type': 'acknowledgment',
+     'keywords': ["thank", "thanks", "appreciate", "helpful", "good", "great", "awesome"]},
+]
+DEFAULT_QUERY_TYPE = "general"
+
+
+class QueryClassifier:
+    """
+    Compiles CLASSIFICATION_RULES into one KeywordAutomaton (plus one regex for prefix rules)
+    - classify(query): query type of the first matching rule, else "general"
+    - matches(query): names of every matching rule, in priority order
+    """
+
+    def __init__(self, rules: Sequence[Dict[str, Any]] = CLASSIFICATION_RULES, default: str = DEFAULT_QUERY_TYPE):
+        self.default = default
+        self.automaton = KeywordAutomaton(
+            keyword for rule in rules for keyword in list(rule['keywords']) + list(rule.get('unless', ())))
+        self._rules = []
+        for rule in rules:
+            prefix = None
+            if rule.get('match') == 'prefix':
+                alternatives = "|".join(re.escape(keyword) for keyword in rule['keywords'])
+                prefix = re.compile(rf"(?:{alternatives})(?:\Z|[ !])")
+            self._rules.append((rule['name'], rule['type'], self.automaton.mask(rule['keywords']),
+                                self.automaton.mask(rule.get('unless', ())), prefix))
+
+    def _matching(self, query: str):
+        query_lower = query.lower().strip()
+        found = self.automaton.scan(query_lower)
+        for name, query_type, mask, unless, prefix in self._rules:
+            hit = prefix.match(query_lower) if prefix is not None else found & mask
+            if hit and not found & unless:
+                yield name, query_type
+
+    def classify(self, query: str) -> str:
+        for _, query_type in self._matching(query):
+            return query_type
+        return self.default
+
+    def matches(self, query: str) -> List[str]:
+        return [name for name, _ in self._matching(query)]
+
+
+# Compiled once at import; shared by every ContextHandler
+DEFAULT_CLASSIFIER = QueryClassifier()
@@ -2,101 +2,262 @@
 Response Cache for RAG System
 Caches non-personalized responses to reduce API calls and improve performance
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Iterable
+from collections import defaultdict
+import asyncio
+import functools
 import hashlib
 import json
-import time
+import re
+import threading
 import logging
 
+from cache_backend import (CacheBackend, InMemoryBackend, SHARED_KEY_PREFIX, STUDENT_KEY_PREFIX,
+                           ENTRY_OVERHEAD_BYTES, estimate_size)
+
 logger = logging.getLogger(__name__)
 
+# Query types whose answers do not depend on who is asking; cached once for all students
+SHARED_QUERY_TYPES = ("help", "general", "greeting", "acknowledgment", "off_topic")
+
+# Stored in shared entries in place of the asking student's name
+NAME_PLACEHOLDER = "{{student_name}}"
+
+# Personal data requests are never cached
+PERSONAL_KEYWORDS = re.compile(
+    r"\b(my|mine|result|results|score|scores|performance|profile|account|show me|give me)\b"
+)
+# First-person pronouns only make a query personal outside how-to/FAQ query types
+# ("how do I ..." is the same question for every student)
+PERSONAL_PRONOUNS = re.compile(r"\b(i|i'm|me)\b")
+
+
+def personal_terms(student_context: Dict[str, Any], student_email: Optional[str] = None) -> List[str]:
+    """
+    Strings that make an answer specific to one student if they appear in it
+    (email, and titles of the assessments available to or completed by the student)
+    """
+    terms = [student_email] if student_email else []
+    for key in ("available_assessments", "completed_assessments"):
+        for assessment in student_context.get(key, []) or []:
+            if assessment.get("title"):
+                terms.append(assessment["title"])
+    return [term for term in terms if len(term) >= 3]
+
+
+def name_variants(student_name: Optional[str]) -> List[str]:
+    """Full name and first name, longest first"""
+    if not student_name or not student_name.strip():
+        return []
+    full = student_name.strip()
+    variants = {full, full.split()[0]}
+    return sorted((v for v in variants if len(v) >= 2), key=len, reverse=True)
+
+
 class ResponseCache:
-    def __init__(self, ttl_seconds=300):
+    def __init__(self, ttl_seconds=300, max_entries=5000, max_bytes=50 * 1024 * 1024,
+                 shared_query_types: Iterable[str] = SHARED_QUERY_TYPES, semantic_cache=None,
+                 backend: Optional[CacheBackend] = None):
         """
         Initialize response cache
         
         Args:
             ttl_seconds: Time-to-live for cached responses (default: 5 minutes)
+            max_entries: Maximum number of cached responses (in-memory backend, LRU eviction beyond this)
+            max_bytes: Approximate memory budget for cached responses (in-memory backend, LRU eviction beyond this)
+            shared_query_types: Query types cached in the student-agnostic keyspace
+            semantic_cache: Optional SemanticCache consulted for shared query types on an exact-match miss
+            backend: Storage backend (default: per-process InMemoryBackend; RedisBackend shares entries across workers)
         """
-        self.cache = {}
+        self.backend = backend or InMemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
         self.ttl = ttl_seconds
+        self.shared_query_types = set(shared_query_types)
+        self.semantic_cache = semantic_cache
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        
         self.hits = 0
         self.misses = 0
+        self.shared_hits = 0
+        self.student_hits = 0
+        self.semantic_hits = 0
+        self.type_hits = defaultdict(int)
+        self.type_misses = defaultdict(int)
     
-    def _generate_key(self, query: str, student_id: int) -> str:
+    def _generate_key(self, query: str, student_id: Optional[int]) -> str:
         """
-        Generate cache key from query and student ID
-        Uses MD5 hash of normalized query
+        Generate cache key from query and student ID (None for the shared keyspace)
+        Uses MD5 hash of normalized query, prefixed by keyspace so a student's entries can be invalidated together
         """
         # Normalize query (lowercase, trimmed)
         normalized = query.lower().strip()
-        hash_input = f"{student_id}:{normalized}"
-        return hashlib.md5(hash_input.encode()).hexdigest()
+        digest = hashlib.md5(normalized.encode()).hexdigest()
+        if student_id is None:
+            return f"{SHARED_KEY_PREFIX}{digest}"
+        return f"{STUDENT_KEY_PREFIX}{student_id}:{digest}"
+    
+    def flight_key(self, query: str, student_id: int, query_type: Optional[str] = None) -> str:
+        """
+        Key shared by requests that would be answered from the same cache entry
+        (used to coalesce identical in-flight queries)
+        """
+        return self._generate_key(query, None if self.is_shared(query_type) else student_id)
+    
+    def is_shared(self, query_type: Optional[str]) -> bool:
+        """Whether answers of this query type go in the student-agnostic keyspace"""
+        return query_type in self.shared_query_types
     
-    def get(self, query: str, student_id: int) -> Optional[Dict[str, Any]]:
+    def get(self, query: str, student_id: int, query_type: Optional[str] = None,
+            student_name: Optional[str] = None, query_embedding=None) -> Optional[Dict[str, Any]]:
         """
         Retrieve cached response if available and not expired
+        Shared query types are looked up in the shared keyspace first, then by embedding
+        similarity (when a query_embedding is given), then in the student's own keyspace
+        Both keyspaces are read from the backend in one round trip
         
         Returns:
-            Cached response dict or None if not found/expired
+            Cached response dict (a copy, personalised for this student) or None if not found/expired
         """
-        key = self._generate_key(query, student_id)
+        shared = self.is_shared(query_type)
+        keys = [self._generate_key(query, student_id)]
+        if shared:
+            keys.insert(0, self._generate_key(query, None))
+        values = self.backend.get_many(keys)
         
-        if key in self.cache:
-            cached_data, timestamp = self.cache[key]
+        response = None
+        with self._lock:
+            if shared:
+                template = values[0]
+                if template is not None:
+                    response = self._render(template, student_name)
+                    if response is not None:
+                        self.shared_hits += 1
+                elif self.semantic_cache is not None and query_embedding is not None:
+                    match = self.semantic_cache.lookup(query, query_embedding, query_type)
+                    if match is not None:
+                        response = self._render(match[0], student_name)
+                        if response is not None:
+                            self.semantic_hits += 1
             
-            # Check if cache is still valid
-            if time.time() - timestamp < self.ttl:
+            if response is None:
+                response = values[-1]
+                if response is not None:
+                    response = dict(response)
+                    self.student_hits += 1
+            
+            type_key = query_type or "unknown"
+            if response is not None:
                 self.hits += 1
-                logger.info(f"Cache HIT for query: '{query[:50]}...' (hit rate: {self.get_hit_rate():.1f}%)")
-                return cached_data
+                self.type_hits[type_key] += 1
             else:
-                # Cache expired, remove it
-                del self.cache[key]
-                logger.debug(f"Cache EXPIRED for query: '{query[:50]}...'")
+                self.misses += 1
+                self.type_misses[type_key] += 1
         
-        self.misses += 1
-        logger.debug(f"Cache MISS for query: '{query[:50]}...' (hit rate: {self.get_hit_rate():.1f}%)")
-        return None
+        if response is not None:
+            logger.info(f"Cache HIT for query: '{query[:50]}...' (hit rate: {self.get_hit_rate():.1f}%)")
+        else:
+            logger.debug(f"Cache MISS for query: '{query[:50]}...' (hit rate: {self.get_hit_rate():.1f}%)")
+        return response
     
-    def set(self, query: str, student_id: int, response: Dict[str, Any]):
+    def set(self, query: str, student_id: int, response: Dict[str, Any], query_type: Optional[str] = None,
+            student_name: Optional[str] = None, private_terms: Iterable[str] = (), query_embedding=None):
         """
-        Cache a response
+        Cache a response, evicting least recently used entries to stay within budget
+        Shared query types go in the shared keyspace with the student's name templated out,
+        unless the answer mentions something private to the student (then it stays per-student)
         
         Args:
             query: User query
             student_id: Student ID
             response: Response dict to cache
+            query_type: Query type classification
+            student_name: Name of the asking student (templated out of shared answers)
+            private_terms: Strings that make an answer student-specific (see personal_terms)
+            query_embedding: Embedding of the query, indexed in the semantic cache for shared answers
         """
-        key = self._generate_key(query, student_id)
-        self.cache[key] = (response, time.time())
-        logger.debug(f"Cached response for query: '{query[:50]}...' (cache size: {len(self.cache)})")
+        shared = False
+        response = dict(response)
+        if self.is_shared(query_type):
+            template = self._to_template(response, student_name)
+            # The name may only appear in the (templated) message, private terms nowhere
+            encoded = json.dumps(template, default=str)
+            private = list(private_terms) + name_variants(student_name)
+            if not any(term in encoded for term in private):
+                response, shared = template, True
+            else:
+                logger.debug("Answer mentions student-specific data, caching per student")
+        
+        key = self._generate_key(query, None if shared else student_id)
+        if not self.backend.set(key, response, self.ttl):
+            return
+        
+        if shared and self.semantic_cache is not None and query_embedding is not None:
+            self.semantic_cache.add(query, query_embedding, query_type, response)
+        logger.debug(f"Cached {'shared' if shared else 'student'} response for query: '{query[:50]}...'")
+    
+    async def _offload(self, fn, *args, **kwargs):
+        """
+        Run a cache call for an async caller
+        Backends that wait on the network (Redis) run in a worker thread so a slow server
+        does not stall the event loop; the in-memory backend is called inline
+        """
+        if not self.backend.blocking:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+    
+    async def get_async(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        """get() for async callers (see _offload)"""
+        return await self._offload(self.get, *args, **kwargs)
+    
+    async def set_async(self, *args, **kwargs):
+        """set() for async callers (see _offload)"""
+        return await self._offload(self.set, *args, **kwargs)
+    
+    async def invalidate_async(self, student_id: Optional[int] = None) -> int:
+        """invalidate() for async callers (see _offload)"""
+        return await self._offload(self.invalidate, student_id)
+    
+    def _to_template(self, response: Dict[str, Any], student_name: Optional[str]) -> Dict[str, Any]:
+        """Replace the asking student's name with NAME_PLACEHOLDER in the message"""
+        template = dict(response)
+        message = template.get("message") or ""
+        for name in name_variants(student_name):
+            message = re.sub(rf"\b{re.escape(name)}\b", NAME_PLACEHOLDER, message)
+        template["message"] = message
+        return template
+    
+    def _render(self, template: Dict[str, Any], student_name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Fill the asking student's first name into a shared answer; None if the name is unknown"""
+        response = dict(template)
+        message = response.get("message") or ""
+        if NAME_PLACEHOLDER in message:
+            names = name_variants(student_name)
+            if not names:
+                return None
+            response["message"] = message.replace(NAME_PLACEHOLDER, names[-1])
+        return response
     
     def should_cache(self, query: str, query_type: str = None) -> bool:
         """
         Determine if a query response should be cached
         Don't cache personalized queries (results, scores, my, etc.)
+        First-person questions of shared query types ("how do I ...") are still cached
         
         Args:
             query: User query
             query_type: Optional query type classification
-            
+        
         Returns:
             True if response should be cached
         """
         query_lower = query.lower()
         
-        # Don't cache personalized queries
-        personal_keywords = [
-            'my', 'i ', "i'm", 'me', 'mine',
-            'result', 'score', 'performance', 
-            'profile', 'account',
-            'show me', 'give me'
-        ]
-        
-        for keyword in personal_keywords:
-            if keyword in query_lower:
-                return False
+        # Don't cache personalized queries (whole words, so "time" or "welcome" don't match "me")
+        if PERSONAL_KEYWORDS.search(query_lower):
+            return False
+        if not self.is_shared(query_type) and PERSONAL_PRONOUNS.search(query_lower):
+            return False
         
         # Don't cache certain query types
         non_cacheable_types = ['results', 'profile', 'assessments', 'name_change']
@@ -105,27 +266,64 @@ class ResponseCache:
         
         return True
     
+    def invalidate(self, student_id: Optional[int] = None) -> int:
+        """
+        Remove cached answers without resetting statistics
+        With a student_id only that student's entries go; otherwise every entry (e.g. after a knowledge sync)
+        With a shared backend this applies to every worker
+        """
+        if student_id is not None:
+            return self.backend.delete_prefix(f"{STUDENT_KEY_PREFIX}{student_id}:")
+        removed = self.backend.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+        logger.info(f"Response cache invalidated ({removed} entries removed)")
+        return removed
+    
     def clear(self):
         """
         Clear all cached responses
         """
-        size = len(self.cache)
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
+        size = self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.shared_hits = 0
+            self.student_hits = 0
+            self.semantic_hits = 0
+            self.type_hits.clear()
+            self.type_misses.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
         logger.info(f"Cache cleared ({size} entries removed)")
     
     def get_stats(self) -> Dict[str, Any]:
         """
-        Get cache statistics
+        Get cache statistics, with hit rate per query type and per keyspace
         """
-        return {
-            'size': len(self.cache),
-            'hits': self.hits,
-            'misses': self.misses,
-            'hit_rate': self.get_hit_rate(),
-            'ttl_seconds': self.ttl
-        }
+        with self._lock:
+            by_query_type = {}
+            for query_type in sorted(set(self.type_hits) | set(self.type_misses)):
+                hits, misses = self.type_hits[query_type], self.type_misses[query_type]
+                by_query_type[query_type] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': (hits / (hits + misses)) * 100 if hits + misses else 0.0
+                }
+            stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.get_hit_rate(),
+                'shared_hits': self.shared_hits,
+                'student_hits': self.student_hits,
+                'semantic_hits': self.semantic_hits,
+                'by_query_type': by_query_type,
+                'ttl_seconds': self.ttl,
+                'semantic': self.semantic_cache.get_stats() if self.semantic_cache is not None else None
+            }
+        # Hit counters are per worker; size and eviction figures come from the (possibly shared) backend
+        stats.update(self.backend.get_stats())
+        return stats
     
     def get_hit_rate(self) -> float:
         """
@@ -139,19 +337,45 @@ class ResponseCache:
     def cleanup_expired(self):
         """
         Remove all expired entries from cache
+        Backends with server-side expiry (Redis) have nothing to remove
         """
-        current_time = time.time()
-        expired_keys = []
+        removed = self.backend.cleanup_expired()
         
-        for key, (data, timestamp) in self.cache.items():
-            if current_time - timestamp >= self.ttl:
-                expired_keys.append(key)
+        if self.semantic_cache is not None:
+            self.semantic_cache.cleanup_expired()
         
-        for key in expired_keys:
-            del self.cache[key]
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache entries")
         
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        return removed
+    
+    def start_sweeper(self, interval_seconds: float = 60):
+        """
+        Start a background task that removes expired entries every interval_seconds
+        Must be called from a running event loop (FastAPI startup)
+        """
+        if self._sweeper and not self._sweeper.done():
+            return
         
-        return len(expired_keys)
-
+        async def sweep():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    self.cleanup_expired()
+                except Exception as e:
+                    logger.error(f"Cache sweep failed: {e}")
+        
+        self._sweeper = asyncio.get_event_loop().create_task(sweep())
+        logger.info(f"Cache expiry sweeper started (every {interval_seconds}s)")
+    
+    async def stop_sweeper(self):
+        """
+        Stop the background expiry sweeper
+        """
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
@@ -0,0 +1,141 @@
+"""
+Semantic Response Cache
+Finds previously answered non-personalized queries by embedding similarity so that
+paraphrases ("how to start test?" / "how do I begin an assessment") reuse one answer
+"""
+import logging
+import re
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
+class SemanticCache:
+    """
+    In-memory cosine-similarity index over embeddings of answered queries
+    - Vectors are L2-normalised and stored in one preallocated matrix, so a lookup is a single
+      matrix-vector product
+    - Entries expire after ttl_seconds; the oldest entry is replaced once max_entries is reached
+    - False-hit guards: the cached query must have the same query_type and mention the same
+      numbers ("module 2" never answers "module 3")
+    """
+
+    def __init__(self, dimension: int = 384, threshold: float = 0.9, ttl_seconds: float = 300,
+                 max_entries: int = 2000):
+        self.dimension = dimension
+        self.threshold = threshold
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+
+        self._vectors = np.zeros((max_entries, dimension), dtype=np.float32)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._stored_at = np.full(max_entries, -np.inf)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.lookups = 0
+        self.hits = 0
+        self.guard_rejections = 0
+
+    @staticmethod
+    def _normalise(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _free_slot(self, now: float) -> int:
+        """Pick a slot: first expired/empty one, otherwise the oldest entry (caller holds the lock)"""
+        expired = np.flatnonzero(now - self._stored_at >= self.ttl)
+        if expired.size:
+            return int(expired[0])
+        return int(np.argmin(self._stored_at))
+
+    def add(self, query: str, embedding, query_type: str, response: Dict[str, Any]):
+        """
+        Index an answered query
+        """
+        vector = self._normalise(embedding)
+        if vector.shape[0] != self.dimension:
+            logger.warning(f"Semantic cache expects {self.dimension}-d embeddings, got {vector.shape[0]}")
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = self._free_slot(now)
+            self._vectors[slot] = vector
+            self._stored_at[slot] = now
+            self._entries[slot] = {
+                "query": query,
+                "query_type": query_type,
+                "numbers": NUMBER_PATTERN.findall(query),
+                "response": response
+            }
+
+    def lookup(self, query: str, embedding, query_type: str) -> Optional[Tuple[Dict[str, Any], float, str]]:
+        """
+        Nearest live cached answer above the threshold that passes the false-hit guards
+        Returns (response, similarity, cached_query) or None
+        """
+        vector = self._normalise(embedding)
+        numbers = NUMBER_PATTERN.findall(query)
+        with self._lock:
+            self.lookups += 1
+            now = time.monotonic()
+            similarities = self._vectors @ vector
+            similarities[now - self._stored_at >= self.ttl] = -1.0
+
+            # Best candidates first; stop at the first one under the threshold
+            for slot in np.argsort(-similarities)[:5]:
+                similarity = float(similarities[slot])
+                if similarity < self.threshold:
+                    break
+                entry = self._entries[slot]
+                if entry["query_type"] != query_type or entry["numbers"] != numbers:
+                    self.guard_rejections += 1
+                    continue
+                self.hits += 1
+                logger.info(f"Semantic cache HIT ({similarity:.3f}): '{query[:50]}' ~ '{entry['query'][:50]}'")
+                return entry["response"], similarity, entry["query"]
+        return None
+
+    def cleanup_expired(self) -> int:
+        """
+        Free slots whose entries have expired
+        """
+        with self._lock:
+            expired = np.flatnonzero((time.monotonic() - self._stored_at >= self.ttl) & np.isfinite(self._stored_at))
+            for slot in expired:
+                self._entries[slot] = None
+                self._vectors[slot] = 0.0
+                self._stored_at[slot] = -np.inf
+        return int(expired.size)
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        with self._lock:
+            self._vectors[:] = 0.0
+            self._entries = [None] * self.max_entries
+            self._stored_at[:] = -np.inf
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get semantic cache statistics
+        """
+        with self._lock:
+            live = int(np.count_nonzero(time.monotonic() - self._stored_at < self.ttl))
+            return {
+                "size": live,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": (self.hits / self.lookups) * 100 if self.lookups else 0.0,
+                "guard_rejections": self.guard_rejections
+            }
@@ -0,0 +1,64 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one execution: the first caller runs it,
+later callers wait for its result instead of starting their own upstream request
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Per-process in-flight call registry keyed by string
+    - The leader's result (or exception) is delivered to every waiter
+    - A waiter being cancelled does not cancel the leader
+    - Keys are forgotten as soon as the call completes; nothing is cached here
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() unless a call with this key is already in flight, then wait for that one
+        Returns (result, coalesced) where coalesced is True for waiters
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            logger.debug(f"Coalescing onto in-flight request {key}")
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.failures += 1
+            if isinstance(e, asyncio.CancelledError):
+                e = RuntimeError("Coalesced request was cancelled")
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "coalesced_rate": (self.coalesced / total) * 100 if total else 0.0
+        }
@@ -0,0 +1,68 @@
+"""
+Stage Timings
+Per-request wall-clock milliseconds of the /chat stages (classification, student context fetch,
+retrieval, LLM) and the stages that timed out or failed and were answered without
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimings:
+    """
+    Collects stage durations for one request
+    Stages may overlap (the context fetch and retrieval run concurrently), so their sum can
+    exceed total_ms; "prefetch" is the wall time of the concurrent pair
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.degraded: List[str] = []
+
+    def record(self, stage: str, start: float):
+        self.stages[stage] = round((time.perf_counter() - start) * 1000, 2)
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start)
+
+    async def run(self, stage: str, awaitable: Awaitable[Any], timeout: Optional[float] = None,
+                  default: Any = None) -> Any:
+        """
+        Await one stage, bounded by timeout seconds (None or <= 0: no limit)
+        On timeout or error the stage is marked degraded and default is returned. The work itself
+        is shielded, so a slow context load still completes and fills the student context cache
+        """
+        start = time.perf_counter()
+        task = asyncio.ensure_future(awaitable)
+        try:
+            if timeout and timeout > 0:
+                return await asyncio.wait_for(asyncio.shield(task), timeout)
+            return await task
+        except asyncio.TimeoutError:
+            logger.warning(f"Stage '{stage}' exceeded {timeout}s - continuing without it")
+            # Retrieve the late result/exception so it is not reported as never retrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self.degraded.append(stage)
+            return default
+        except Exception as e:
+            logger.warning(f"Stage '{stage}' failed: {e} - continuing without it")
+            self.degraded.append(stage)
+            return default
+        finally:
+            self.record(stage, start)
+
+    def as_dict(self) -> Dict[str, Any]:
+        timings = {f"{stage}_ms": elapsed for stage, elapsed in self.stages.items()}
+        timings['total_ms'] = round((time.perf_counter() - self.started) * 1000, 2)
+        timings['degraded'] = list(self.degraded)
+        return timings
@@ -0,0 +1,152 @@
+"""
+Student Context Cache
+Short-lived, bounded (LRU) cache in front of KnowledgeSync.get_student_context
+so consecutive chat messages from the same student skip the database
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+
+class StudentContextCache:
+    """
+    LRU + TTL cache of student contexts keyed by student_id
+    - Entries expire after ttl_seconds; the least recently used entry is evicted beyond max_entries
+    - invalidate(student_id) / invalidate_all() are called when a student submits an
+      assessment or an admin changes assessments
+    - A load that started before an invalidation is not written back (no stale refill)
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 2000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # student_id -> (context, stored_at)
+        self._generations: Dict[int, int] = {}
+        self._global_generation = 0
+        self._inflight: Dict[int, tuple] = {}  # student_id -> (future, generation)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _generation(self, student_id: int) -> tuple:
+        return (self._global_generation, self._generations.get(student_id, 0))
+
+    def get(self, student_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Cached context for a student, or None if missing/expired
+        """
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is not None:
+                context, stored_at = entry
+                if time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(student_id)
+                    self.hits += 1
+                    return context
+                del self._entries[student_id]
+            self.misses += 1
+            return None
+
+    def set(self, student_id: int, context: Dict[str, Any], generation: Optional[tuple] = None):
+        """
+        Store a context; skipped if the student was invalidated after `generation` was taken
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation(student_id):
+                logger.debug(f"Dropping stale context load for student {student_id}")
+                return
+            self._entries[student_id] = (context, time.monotonic())
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_load(self, student_id: int,
+                          loader: Callable[[int], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return the cached context or load it with `loader`
+        Concurrent misses for the same student share one load (unless it predates an invalidation)
+        """
+        context = self.get(student_id)
+        if context is not None:
+            return context
+
+        with self._lock:
+            generation = self._generation(student_id)
+        inflight = self._inflight.get(student_id)
+        if inflight is not None and inflight[1] == generation:
+            return await asyncio.shield(inflight[0])
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[student_id] = (future, generation)
+        try:
+            context = await loader(student_id)
+            self.set(student_id, context, generation)
+            future.set_result(context)
+            return context
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved so an unawaited failure is not logged
+            raise
+        finally:
+            if self._inflight.get(student_id, (None,))[0] is future:
+                del self._inflight[student_id]
+
+    async def refresh(self, student_id: int,
+                      loader: Callable[[int], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Invalidate and reload a student's context (login warm-up / after a submission)
+        """
+        self.invalidate(student_id)
+        return await self.get_or_load(student_id, loader)
+
+    def invalidate(self, student_id: int) -> bool:
+        """
+        Drop one student's context; returns True if an entry was removed
+        """
+        with self._lock:
+            self._generations[student_id] = self._generations.get(student_id, 0) + 1
+            self.invalidations += 1
+            removed = self._entries.pop(student_id, None) is not None
+        if removed:
+            logger.info(f"Invalidated cached context for student {student_id}")
+        return removed
+
+    def invalidate_all(self) -> int:
+        """
+        Drop every cached context (assessments changed for everyone); returns entries removed
+        """
+        with self._lock:
+            size = len(self._entries)
+            self._entries.clear()
+            self._generations.clear()
+            self._global_generation += 1
+            self.invalidations += 1
+        logger.info(f"Invalidated all cached student contexts ({size} entries removed)")
+        return size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) * 100 if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
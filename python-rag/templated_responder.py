@@ -0,0 +1,101 @@
+"""
+Templated Responder for Deterministic Query Types
+Answers query types whose reply is fully determined by the student context (assessment list,
+greetings, thanks) from templates, skipping vector search and the LLM
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATED_QUERY_TYPES = ("assessments", "greeting", "acknowledgment")
+# model_used of templated answers (the name the streaming assessment shortcut always reported)
+TEMPLATED_MODEL = "database_context"
+
+# Template signature: (query, student_context, student_name) -> (message, data)
+Template = Callable[[str, Dict[str, Any], Optional[str]], Tuple[str, Dict[str, Any]]]
+
+
+def display_name(context: Dict[str, Any], student_name: Optional[str] = None) -> str:
+    return student_name or context.get('student_info', {}).get('name') or "there"
+
+
+def available_assessments_message(context: Dict[str, Any]) -> str:
+    """The available assessments exactly as the database lists them"""
+    available_assessments = context.get('available_assessments', [])
+    if not available_assessments:
+        return "You have no assessments available at the moment. All assessments have been completed or none are currently active."
+
+    message = f"You have {len(available_assessments)} assessment"
+    message += "s" if len(available_assessments) > 1 else ""
+    message += " available:\n\n"
+    for assessment in available_assessments:
+        name = assessment.get('title', 'Unknown')
+        category = assessment.get('category', 'General')
+        duration = assessment.get('total_time', 30)
+        message += f"📝 **{name}** ({category})\n"
+        message += f"   • Duration: {duration} minutes\n\n"
+    message += "Ready to start? Click 'View Assessments' to begin!"
+    return message
+
+
+def assessments_template(query: str, context: Dict[str, Any], student_name: Optional[str]):
+    return available_assessments_message(context), {}
+
+
+def greeting_template(query: str, context: Dict[str, Any], student_name: Optional[str]):
+    return (f"Hi {display_name(context, student_name)}! 👋 How can I help you with your placement "
+            f"preparation today?", {})
+
+
+def acknowledgment_template(query: str, context: Dict[str, Any], student_name: Optional[str]):
+    return (f"You're welcome, {display_name(context, student_name)}! 😊 Let me know if there's anything "
+            f"else I can help you with.", {})
+
+
+class TemplatedResponder:
+    """
+    Registry of query type -> template; only enabled types are answered
+    Small-talk types (greeting, acknowledgment) are templated only for short messages, so
+    "hello, I need interview tips" still reaches the LLM
+    """
+
+    def __init__(self, enabled_types: Iterable[str] = DEFAULT_TEMPLATED_QUERY_TYPES, small_talk_max_words: int = 4):
+        self.enabled_types = set(enabled_types or [])
+        self._templates: Dict[str, Tuple[Template, Optional[int]]] = {}
+        self._lock = threading.Lock()
+        self.served: Dict[str, int] = {}
+
+        self.register("assessments", assessments_template)
+        self.register("greeting", greeting_template, max_words=small_talk_max_words)
+        self.register("acknowledgment", acknowledgment_template, max_words=small_talk_max_words)
+
+    def register(self, query_type: str, template: Template, max_words: Optional[int] = None):
+        """Add or replace the template for a query type (answered once the type is enabled)"""
+        self._templates[query_type] = (template, max_words)
+
+    def handles(self, query_type: str, query: str) -> bool:
+        if query_type not in self.enabled_types or query_type not in self._templates:
+            return False
+        max_words = self._templates[query_type][1]
+        return max_words is None or len(query.split()) <= max_words
+
+    def respond(self, query_type: str, query: str, student_context: Dict[str, Any],
+                student_name: Optional[str] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(message, data), or None when the type is not templated (answer with the LLM)"""
+        if not self.handles(query_type, query):
+            return None
+        message, data = self._templates[query_type][0](query, student_context, student_name)
+        with self._lock:
+            self.served[query_type] = self.served.get(query_type, 0) + 1
+        logger.info(f"TEMPLATED [{query_type}]: answered without vector search or LLM")
+        return message, data
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': sorted(self.enabled_types & set(self._templates)),
+                'served': dict(self.served),
+                'total': sum(self.served.values())
+            }
@@ -0,0 +1,311 @@
+"""
+Test script for AsyncOpenRouterClient
+Uses an in-process mock transport (no network) to test the connection pool, fallback, hedging and circuit breaking
+"""
+import asyncio
+import json
+
+import httpx
+
+from model_health import CircuitBreaker, CircuitBreakerRegistry
+from openrouter_client import AsyncOpenRouterClient
+
+PRIMARY = "primary/model"
+FALLBACK = "fallback/model"
+MESSAGES = [{"role": "user", "content": "How do I start an assessment?"}]
+
+
+def make_client(latencies, failures=(), **kwargs):
+    """
+    Build a client whose requests are answered by a mock transport
+    latencies: seconds to sleep per model, failures: models that return HTTP 429
+    """
+    calls = []
+
+    async def handler(request: httpx.Request):
+        payload = json.loads(request.content)
+        model = payload["model"]
+        calls.append(model)
+        await asyncio.sleep(latencies.get(model, 0))
+        if model in failures:
+            return httpx.Response(429, json={"error": "rate limited"})
+        if payload.get("stream"):
+            body = ": OPENROUTER PROCESSING\n\n"
+            for word in ["answer ", "from ", model]:
+                body += "data: " + json.dumps({"choices": [{"delta": {"content": word}}]}) + "\n\n"
+            body += "data: [DONE]\n\n"
+            return httpx.Response(200, content=body.encode(), headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": f"answer from {model}"}}],
+            "usage": {"total_tokens": 10}
+        })
+
+    client = AsyncOpenRouterClient("test-key", PRIMARY, FALLBACK, api_url="http://fake/api/v1/chat/completions",
+                                   http2=False, **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, calls
+
+
+def test_call_api_uses_one_pooled_client():
+    async def run():
+        client, calls = make_client({}, failures={FALLBACK})
+        result = await client.call_api(MESSAGES)
+        assert result["choices"][0]["message"]["content"] == f"answer from {PRIMARY}"
+        assert result["metadata"]["model_used"] == PRIMARY and result["metadata"]["tokens_used"] == 10
+        pooled = client._get_client()
+        await client.call_api(MESSAGES)
+        assert client._get_client() is pooled and client.total_requests == 2 and client.in_flight == 0
+        try:
+            await client.call_api(MESSAGES, model=FALLBACK)
+            raise AssertionError("HTTP 429 should raise")
+        except Exception as e:
+            assert str(e).startswith("API request failed")
+        await client.aclose()
+
+        fresh = AsyncOpenRouterClient("test-key", PRIMARY, FALLBACK, max_connections=8, max_keepalive_connections=4,
+                                      http2=False)
+        assert fresh.limits.max_connections == 8 and fresh.limits.max_keepalive_connections == 4
+        assert fresh._get_client() is fresh._get_client()
+        await fresh.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | call_api reuses the pooled client and reports HTTP errors")
+
+
+def test_per_host_concurrency_is_bounded():
+    state = {"active": 0, "peak": 0}
+
+    async def handler(request: httpx.Request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.05)
+        state["active"] -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    async def run():
+        client = AsyncOpenRouterClient("test-key", PRIMARY, FALLBACK, api_url="http://fake/api/v1/chat/completions",
+                                       max_concurrency_per_host=2, http2=False)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        results = await asyncio.gather(*[client.call_api(MESSAGES) for _ in range(6)])
+        await client.aclose()
+        return results
+
+    results = asyncio.run(run())
+    assert len(results) == 6 and state["peak"] == 2
+    print("✓ PASS | At most max_concurrency_per_host requests are sent to a host at once")
+
+
+def test_process_query_async_keeps_event_loop_free():
+    from context_handler import ContextHandler
+
+    async def run():
+        client, calls = make_client({PRIMARY: 0.2})
+        handler = ContextHandler(openrouter_client=None, async_openrouter_client=client)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        message, _, query_type, model_used = await handler.process_query_async(
+            1, "explain the placement process", {'available_assessments': [], 'completed_assessments': [],
+                                                  'performance_summary': {}})
+        ticking.cancel()
+        await client.aclose()
+        return message, model_used, ticks, calls
+
+    message, model_used, ticks, calls = asyncio.run(run())
+    assert message == f"answer from {PRIMARY}" and model_used == PRIMARY and calls == [PRIMARY]
+    assert ticks >= 10, "the event loop was blocked during the LLM call"
+    print(f"✓ PASS | process_query_async awaits OpenRouter without blocking ({ticks} ticks during the call)")
+
+
+def test_sequential_fallback():
+    async def run():
+        client, calls = make_client({}, failures={PRIMARY})
+        result = await client.call_with_fallback(MESSAGES)
+        assert result["model_used"] == FALLBACK
+        assert result["fallback_used"] is True
+        assert calls == [PRIMARY, FALLBACK]
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Sequential fallback after primary failure")
+
+
+def test_hedged_fast_primary_never_fires_fallback():
+    async def run():
+        client, calls = make_client({PRIMARY: 0.01, FALLBACK: 0.01})
+        client.latency_tracker.default_hedge_delay = 0.5
+        result = await client.call_with_fallback(MESSAGES, strategy="hedged")
+        assert result["model_used"] == PRIMARY
+        assert result["hedged"] is False
+        assert calls == [PRIMARY]
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Hedged: fast primary wins without firing fallback")
+
+
+def test_hedged_slow_primary_fallback_wins():
+    async def run():
+        client, calls = make_client({PRIMARY: 5.0, FALLBACK: 0.01})
+        client.latency_tracker.default_hedge_delay = 0.05
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        result = await client.call_with_fallback(MESSAGES, strategy="hedged")
+        elapsed = loop.time() - start
+        assert result["model_used"] == FALLBACK
+        assert result["hedged"] is True
+        assert elapsed < 1.0, f"hedge did not cut latency ({elapsed:.2f}s)"
+        assert client.get_pool_stats()["hedges_won"] == 1
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Hedged: slow primary is cancelled when fallback wins")
+
+
+def test_hedged_primary_failure_starts_fallback_immediately():
+    async def run():
+        client, calls = make_client({FALLBACK: 0.01}, failures={PRIMARY})
+        client.latency_tracker.default_hedge_delay = 5.0
+        result = await asyncio.wait_for(client.call_with_fallback(MESSAGES, strategy="hedged"), timeout=1.0)
+        assert result["model_used"] == FALLBACK
+        assert result["hedged"] is False
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Hedged: primary failure starts fallback without waiting for hedge delay")
+
+
+def test_hung_primary_opens_its_circuit_under_hedging():
+    async def run():
+        breakers = CircuitBreakerRegistry(min_requests=3, cooldown_seconds=60)
+        client, calls = make_client({PRIMARY: 5.0, FALLBACK: 0.01}, circuit_breakers=breakers)
+        client.latency_tracker.default_hedge_delay = 0.02
+        for _ in range(3):
+            result = await client.call_with_fallback(MESSAGES, strategy="hedged")
+            assert result["model_used"] == FALLBACK
+        assert breakers.get(PRIMARY).state == CircuitBreaker.OPEN
+        assert breakers.get(FALLBACK).state == CircuitBreaker.CLOSED
+        
+        # With the primary's circuit open the fallback is called alone, without a hedge
+        calls.clear()
+        fired = client.get_pool_stats()["hedges_fired"]
+        await client.call_with_fallback(MESSAGES, strategy="hedged")
+        assert calls == [FALLBACK], calls
+        assert client.get_pool_stats()["hedges_fired"] == fired
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Hedged: a primary that keeps losing the race opens its circuit")
+
+
+def test_cancelled_caller_does_not_count_against_the_model():
+    async def run():
+        breakers = CircuitBreakerRegistry(min_requests=1, cooldown_seconds=60)
+        client, _ = make_client({PRIMARY: 5.0, FALLBACK: 5.0}, circuit_breakers=breakers)
+        client.latency_tracker.default_hedge_delay = 0.01
+        call = asyncio.ensure_future(client.call_with_fallback(MESSAGES, strategy="hedged"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        assert breakers.get(PRIMARY).get_stats()["state"] == CircuitBreaker.CLOSED
+        assert len(breakers.get(PRIMARY).outcomes) == 0 and len(breakers.get(FALLBACK).outcomes) == 0
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Hedged: a client disconnect only releases the calls")
+
+
+def test_hedge_delay_follows_p95():
+    client, _ = make_client({})
+    tracker = client.latency_tracker
+    for i in range(100):
+        tracker.record(PRIMARY, 1.0 + i / 100)
+    delay = tracker.hedge_delay(PRIMARY)
+    assert 1.9 <= delay <= 2.0, delay
+    print(f"✓ PASS | Hedge delay derived from p95 latency ({delay:.2f}s)")
+
+
+def test_open_circuit_skips_primary():
+    async def run():
+        breakers = CircuitBreakerRegistry(min_requests=3, cooldown_seconds=60)
+        client, calls = make_client({}, failures={PRIMARY}, circuit_breakers=breakers)
+        for _ in range(3):
+            await client.call_with_fallback(MESSAGES)
+        assert breakers.get(PRIMARY).state == CircuitBreaker.OPEN
+        
+        calls.clear()
+        result = await client.call_with_fallback(MESSAGES, strategy="hedged")
+        assert result["model_used"] == FALLBACK
+        assert calls == [FALLBACK], f"primary should be skipped, got {calls}"
+        assert client.get_model_health()[PRIMARY]["health_score"] == 0
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Open circuit skips the primary model immediately")
+
+
+def test_half_open_probe_closes_circuit():
+    breaker = CircuitBreaker("model", min_requests=2, cooldown_seconds=0, half_open_success_threshold=1)
+    breaker.record_failure(1.0)
+    breaker.record_failure(1.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    # Cool-down elapsed: exactly one probe is let through
+    assert breaker.allow_request() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is False
+    breaker.record_success(0.5)
+    assert breaker.state == CircuitBreaker.CLOSED
+    print("✓ PASS | Half-open probe closes the circuit")
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker("model", min_requests=1, cooldown_seconds=0)
+    breaker.record_failure(1.0)
+    assert breaker.allow_request() is True
+    breaker.record_failure(1.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    print("✓ PASS | Failed probe re-opens the circuit")
+
+
+def test_stream_with_fallback():
+    async def run():
+        client, calls = make_client({}, failures={PRIMARY})
+        chunks = [item async for item in client.stream_with_fallback(MESSAGES)]
+        assert [model for model, _ in chunks] == [FALLBACK] * 3
+        assert "".join(delta for _, delta in chunks) == f"answer from {FALLBACK}"
+        assert calls == [PRIMARY, FALLBACK]
+        # Stream durations stay out of the hedge histogram; time to first token is tracked apart
+        assert client.latency_tracker.get(FALLBACK).sample_count() == 0
+        assert client.first_token_tracker.get(FALLBACK).sample_count() == 1
+        assert client.get_model_health()[FALLBACK]["first_token_latency"]["count"] == 1
+        await client.aclose()
+
+    asyncio.run(run())
+    print("✓ PASS | Streaming falls back before the first token")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ASYNC OPENROUTER CLIENT - TEST SUITE")
+    print("=" * 60)
+    test_call_api_uses_one_pooled_client()
+    test_per_host_concurrency_is_bounded()
+    test_process_query_async_keeps_event_loop_free()
+    test_sequential_fallback()
+    test_hedged_fast_primary_never_fires_fallback()
+    test_hedged_slow_primary_fallback_wins()
+    test_hedged_primary_failure_starts_fallback_immediately()
+    test_hung_primary_opens_its_circuit_under_hedging()
+    test_cancelled_caller_does_not_count_against_the_model()
+    test_hedge_delay_follows_p95()
+    test_open_circuit_skips_primary()
+    test_half_open_probe_closes_circuit()
+    test_half_open_probe_failure_reopens()
+    test_stream_with_fallback()
@@ -0,0 +1,68 @@
+"""
+Test script for BackgroundLoader
+"""
+import threading
+
+from background_loader import BackgroundLoader
+
+
+def test_loads_in_background_and_notifies():
+    release = threading.Event()
+    attached = []
+
+    def factory():
+        release.wait(1)
+        return "vector store"
+
+    loader = BackgroundLoader(factory, name="test store")
+    loader.on_ready(attached.append)
+    assert loader.get_status() == {"state": "idle"}
+
+    loader.start()
+    loader.start()  # second call is a no-op
+    assert loader.state == "warming" and not loader.ready and attached == []
+
+    release.set()
+    assert loader.wait(1)
+    assert loader.ready and loader.value == "vector store" and attached == ["vector store"]
+    assert "load_seconds" in loader.get_status()
+
+    late = []
+    loader.on_ready(late.append)
+    assert late == ["vector store"], "callbacks registered after loading run immediately"
+    print("✓ PASS | Object loads off the caller's thread and ready callbacks fire once")
+
+
+def test_ready_only_after_callbacks_finish():
+    seen = []
+    loader = BackgroundLoader(lambda: "vector store", name="test store")
+    # Each callback sees the loader still warming; one registered meanwhile also runs
+    loader.on_ready(lambda value: (seen.append(loader.state), loader.on_ready(lambda v: seen.append(loader.state))))
+    loader.start()
+    assert loader.wait(1)
+    assert seen == ["warming", "warming"] and loader.ready
+    print("✓ PASS | Ready is reported only once every ready callback has run")
+
+
+def test_failed_load_is_reported():
+    def factory():
+        raise RuntimeError("model download failed")
+
+    attached = []
+    loader = BackgroundLoader(factory, name="test store")
+    loader.on_ready(attached.append)
+    loader.start()
+    assert loader.wait(1)
+    status = loader.get_status()
+    assert status["state"] == "failed" and status["error"] == "model download failed"
+    assert loader.value is None and attached == []
+    print("✓ PASS | A failed load is reported and leaves the degraded path in place")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("BACKGROUND LOADER - TEST SUITE")
+    print("=" * 60)
+    test_loads_in_background_and_notifies()
+    test_ready_only_after_callbacks_finish()
+    test_failed_load_is_reported()
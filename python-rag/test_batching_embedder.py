@@ -0,0 +1,106 @@
+"""
+Test script for BatchingEmbedder
+Uses a fake encode function (no model download required)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from batching_embedder import BatchingEmbedder
+
+
+class FakeModel:
+    """Encodes a text as [len(text), 1.0] and records every batch it receives"""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.threads = set()
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_encodes_are_batched():
+    model = FakeModel(delay=0.01)
+    embedder = BatchingEmbedder(model.encode, max_batch_size=8, max_wait_ms=20)
+    texts = [f"query {'x' * i}" for i in range(20)]
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        vectors = list(pool.map(embedder.encode, texts))
+    embedder.close()
+
+    assert [int(v[0]) for v in vectors] == [len(t) for t in texts], "each caller gets its own vector"
+    assert max(len(batch) for batch in model.batches) == 8
+    assert len(model.batches) < 20
+    assert model.threads == {"embedder"}
+    stats = embedder.get_stats()
+    assert stats["encoded"] == 20 and stats["largest_batch"] == 8
+    print(f"✓ PASS | 20 concurrent encodes in {stats['batches']} batches "
+          f"(average {stats['average_batch_size']:.1f})")
+
+
+def test_async_callers_do_not_block_the_loop():
+    model = FakeModel(delay=0.05)
+    embedder = BatchingEmbedder(model.encode, max_batch_size=32, max_wait_ms=5)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        return await asyncio.gather(ticker(), *(embedder.encode_async("how to start") for _ in range(10)))
+
+    results = asyncio.run(run())[1:]
+    embedder.close()
+    assert all(np.array_equal(result, results[0]) for result in results)
+    assert model.batches == [["how to start"]], "identical texts in one batch are encoded once"
+    assert len(ticks) == 5
+    print("✓ PASS | encode_async leaves the event loop free and dedupes identical texts")
+
+
+def test_encode_errors_fail_the_batch_only():
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise ValueError("model crashed")
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    embedder = BatchingEmbedder(flaky, max_wait_ms=0)
+    with pytest.raises(ValueError):
+        embedder.encode("first")
+    assert embedder.encode("second").shape == (2,)
+    assert embedder.get_stats()["errors"] == 1
+    embedder.close()
+    print("✓ PASS | An encode error fails its batch and the worker keeps running")
+
+
+def test_close_drains_and_rejects_new_work():
+    model = FakeModel(delay=0.02)
+    embedder = BatchingEmbedder(model.encode, max_batch_size=2, max_wait_ms=0)
+    futures = [embedder.submit(f"q{i}") for i in range(5)]
+    embedder.close()
+    assert all(future.done() for future in futures)
+    with pytest.raises(RuntimeError):
+        embedder.submit("late")
+    print("✓ PASS | close() finishes queued encodes and stops the worker")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("BATCHING EMBEDDER - TEST SUITE")
+    print("=" * 60)
+    test_concurrent_encodes_are_batched()
+    test_async_callers_do_not_block_the_loop()
+    test_encode_errors_fail_the_batch_only()
+    test_close_drains_and_rejects_new_work()
@@ -0,0 +1,172 @@
+"""
+Test script for the response cache backends
+Runs the Redis backend against fakeredis (no Redis server required)
+"""
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from cache_backend import CacheBackend, InMemoryBackend, RedisBackend
+from response_cache import ResponseCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def response(text: str):
+    return {"success": True, "message": text, "query_type": "help"}
+
+
+def make_workers(server, count=2, **kwargs):
+    """ResponseCaches in separate 'workers' that share one Redis server"""
+    return [ResponseCache(backend=RedisBackend(fakeredis.FakeRedis(server=server)), **kwargs) for _ in range(count)]
+
+
+def test_workers_share_answers():
+    worker_a, worker_b = make_workers(fakeredis.FakeServer())
+    worker_a.set("How do I reset the timer?", 1, response("Hi Asha, click Settings."), "help", student_name="Asha")
+    cached = worker_b.get("How do I reset the timer?", 2, "help", student_name="Ben")
+    assert cached["message"] == "Hi Ben, click Settings."
+    assert worker_b.get_stats()["shared_hits"] == 1
+    print("✓ PASS | A shared answer cached by one worker is served by another")
+
+
+def test_ttl_is_handled_by_the_server():
+    server = fakeredis.FakeServer()
+    cache, = make_workers(server, count=1, ttl_seconds=0.05)
+    cache.set("what is aptitude", 1, response("a"), "general")
+    client = fakeredis.FakeRedis(server=server)
+    key = next(iter(client.scan_iter()))
+    assert 0 < client.pttl(key) <= 50
+    time.sleep(0.06)
+    assert cache.get("what is aptitude", 1, "general") is None
+    assert cache.cleanup_expired() == 0, "nothing to sweep with server-side expiry"
+    print("✓ PASS | Entries expire on the server")
+
+
+def test_lookup_is_one_pipelined_round_trip():
+    client = fakeredis.FakeRedis()
+    calls = {"commands": 0, "pipelines": 0}
+    original_execute, original_pipeline = client.execute_command, client.pipeline
+
+    def execute_command(*args, **kwargs):
+        calls["commands"] += 1
+        return original_execute(*args, **kwargs)
+
+    def pipeline(*args, **kwargs):
+        calls["pipelines"] += 1
+        return original_pipeline(*args, **kwargs)
+
+    client.execute_command, client.pipeline = execute_command, pipeline
+    cache = ResponseCache(backend=RedisBackend(client))
+    assert cache.get("how to start", 1, "help", student_name="Asha") is None
+    assert calls == {"commands": 0, "pipelines": 1}, calls
+    print("✓ PASS | Shared and per-student keys are read in one pipeline")
+
+
+def test_invalidation_reaches_every_worker():
+    worker_a, worker_b = make_workers(fakeredis.FakeServer())
+    worker_a.set("what is next", 1, response("Try Round 2."), "general", private_terms=["Round 2"])
+    worker_a.set("what is next", 2, response("Try Round 3."), "general", private_terms=["Round 3"])
+    worker_a.set("how to start", 1, response("Click Start."), "help")
+
+    assert worker_b.invalidate(1) == 1
+    assert worker_a.get("what is next", 1, "general") is None
+    assert worker_a.get("what is next", 2, "general") is not None
+
+    assert worker_b.invalidate() == 2
+    assert worker_a.get("how to start", 3, "help") is None
+    print("✓ PASS | Per-student and full invalidation apply to all workers")
+
+
+def test_serialization_round_trip():
+    backend = RedisBackend(fakeredis.FakeRedis())
+    value = {"message": "hi", "sources": ["a", "b"], "confidence": 0.5, "at": datetime(2024, 1, 1)}
+    assert backend.set("shared:x", value, 60)
+    assert backend.get_many(["shared:x", "shared:missing"]) == [dict(value, at="2024-01-01 00:00:00"), None]
+    print("✓ PASS | Responses are stored as JSON")
+
+
+def test_server_errors_are_misses():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    backend = RedisBackend(fakeredis.FakeRedis(server=server))
+    cache = ResponseCache(backend=backend)
+    cache.set("how to start", 1, response("Click Start."), "help")
+    assert cache.get("how to start", 1, "help") is None
+    assert backend.errors == 2
+    print("✓ PASS | An unreachable server degrades to cache misses")
+
+
+def test_async_calls_keep_the_event_loop_free():
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server)
+    original_pipeline = client.pipeline
+
+    def slow_pipeline(*args, **kwargs):
+        time.sleep(0.2)  # a Redis server answering at the socket timeout
+        return original_pipeline(*args, **kwargs)
+
+    client.pipeline = slow_pipeline
+    cache = ResponseCache(backend=RedisBackend(client))
+    cache.set("how to start", 1, response("Click Start."), "help")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        cached = await cache.get_async("how to start", 2, "help")
+        ticking.cancel()
+        return cached, ticks
+
+    cached, ticks = asyncio.run(scenario())
+    assert cached["message"] == "Click Start."
+    assert ticks >= 10, f"event loop stalled during the Redis read ({ticks} ticks)"
+    print("✓ PASS | Redis reads from async callers run off the event loop")
+
+
+def test_stats_do_not_touch_the_server():
+    client = fakeredis.FakeRedis()
+    backend = RedisBackend(client)
+    backend.set("shared:x", response("a"), 60)
+    client.execute_command = client.scan_iter = None  # any server call would raise
+    assert backend.get_stats() == {"backend": "redis", "prefix": "rag:response:", "errors": 0}
+    print("✓ PASS | Redis stats are local counters (no keyspace scan)")
+
+
+def test_incomplete_backend_fails_on_construction():
+    class WriteOnlyBackend(CacheBackend):
+        def set(self, key, value, ttl_seconds):
+            return True
+
+    with pytest.raises(TypeError, match="get_many"):
+        WriteOnlyBackend()
+    print("✓ PASS | A backend missing required methods cannot be instantiated")
+
+
+def test_in_memory_backend_is_the_default():
+    assert isinstance(ResponseCache().backend, InMemoryBackend)
+    print("✓ PASS | In-memory backend is used by default")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CACHE BACKENDS - TEST SUITE")
+    print("=" * 60)
+    test_workers_share_answers()
+    test_ttl_is_handled_by_the_server()
+    test_lookup_is_one_pipelined_round_trip()
+    test_invalidation_reaches_every_worker()
+    test_serialization_round_trip()
+    test_server_errors_are_misses()
+    test_async_calls_keep_the_event_loop_free()
+    test_stats_do_not_touch_the_server()
+    test_incomplete_backend_fails_on_construction()
+    test_in_memory_backend_is_the_default()
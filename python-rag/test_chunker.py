@@ -0,0 +1,103 @@
+"""
+Test script for the token-aware knowledge base chunker
+"""
+import pytest
+
+from chunker import Chunker
+from tokenizer import HFTokenCounter, RegexTokenCounter, TokenCounter, load_token_counter
+
+GUIDE = "# Guide\nWelcome text\n## Aptitude Tips\nPractice daily\n## Verbal\nRead more\n"
+
+LONG_SECTION = "\n".join(
+    f"- Tip {i}: practice question set {i} with a timer and review every wrong answer afterwards." for i in range(40)
+)
+
+
+def test_section_ids_do_not_depend_on_position():
+    chunker = Chunker(counter=RegexTokenCounter())
+    ids = [doc_id for _, _, doc_id in chunker.chunk_markdown("guide.md", GUIDE)]
+    assert ids == ["guide.md_intro", "guide.md_aptitude-tips", "guide.md_verbal"]
+    inserted = GUIDE.replace("## Verbal", "## Coding\nPractice problems\n## Verbal")
+    assert [doc_id for _, _, doc_id in chunker.chunk_markdown("guide.md", inserted)] == \
+        ["guide.md_intro", "guide.md_aptitude-tips", "guide.md_coding", "guide.md_verbal"]
+    duplicate = [doc_id for _, _, doc_id in chunker.chunk_markdown("faq.md", "## Tips\na\n## Tips\nb")]
+    assert duplicate == ["faq.md_tips", "faq.md_tips-2"]
+    print("✓ PASS | Section IDs come from titles, so inserts do not shift other sections")
+
+
+def test_short_sections_stay_whole():
+    documents = Chunker(counter=RegexTokenCounter()).chunk_markdown("guide.md", GUIDE)
+    document, metadata, _ = documents[1]
+    assert document == "## Aptitude Tips\nPractice daily"
+    assert metadata == {'source': 'guide.md', 'type': 'knowledge_base', 'section': 'Aptitude Tips',
+                        'chunk': 0, 'chunks': 1, 'tokens': 6}
+    print("✓ PASS | Sections under the limit are one chunk, same text as before")
+
+
+def test_long_sections_are_bounded_and_overlap():
+    counter = RegexTokenCounter()
+    chunker = Chunker(max_tokens=120, overlap_tokens=25, counter=counter)
+    documents = chunker.chunk_markdown("tips.md", f"## Practice Plan\n{LONG_SECTION}")
+    assert len(documents) > 3
+    assert [doc_id for _, _, doc_id in documents[:3]] == ["tips.md_practice-plan", "tips.md_practice-plan_1",
+                                                          "tips.md_practice-plan_2"]
+    for (document, metadata, _), (following, _, _) in zip(documents, documents[1:]):
+        assert metadata['tokens'] <= 120 and metadata['section'] == "Practice Plan"
+        assert document.startswith("## Practice Plan\n- Tip ")  # title kept, cut at a line break
+        last_line = document.rsplit("\n", 1)[1]
+        assert following.split("\n")[1] == last_line  # the next chunk repeats the last line
+    covered = "\n".join(document.split("\n", 1)[1] for document, _, _ in documents)
+    assert all(f"- Tip {i}:" in covered for i in range(40))
+    print(f"✓ PASS | 40-line section -> {len(documents)} chunks <= 120 tokens, line-aligned with overlap")
+
+
+def test_unbreakable_text_is_cut_by_tokens():
+    chunks = Chunker(max_tokens=50, overlap_tokens=10, counter=RegexTokenCounter()).split(" ".join(["word"] * 200))
+    assert all(RegexTokenCounter().count(chunk) <= 50 for chunk in chunks)
+    assert sum(RegexTokenCounter().count(chunk) for chunk in chunks) >= 200
+    with pytest.raises(ValueError):
+        Chunker(max_tokens=40, overlap_tokens=20, counter=RegexTokenCounter())
+    print(f"✓ PASS | Text without line or sentence breaks still fits ({len(chunks)} chunks)")
+
+
+def test_incomplete_token_counter_fails_on_construction():
+    class NoSpansCounter(TokenCounter):
+        name = "broken"
+
+    with pytest.raises(TypeError, match="spans"):
+        NoSpansCounter()
+    print("✓ PASS | A token counter without spans() cannot be instantiated")
+
+
+def test_tokenizer_json_counter(tmp_path):
+    tokenizers = pytest.importorskip("tokenizers")
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+
+    tokenizer = tokenizers.Tokenizer(WordLevel({"[UNK]": 0, "practice": 1, "daily": 2, ".": 3}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    path = str(tmp_path / "tokenizer.json")
+    tokenizer.save(path)
+
+    counter = load_token_counter(path)
+    assert isinstance(counter, HFTokenCounter)
+    assert counter.count("Practice daily. Practice weekly.") == 6
+    assert counter.truncate("practice daily. practice weekly.", 3) == "practice daily."
+    assert isinstance(load_token_counter(str(tmp_path / "missing.json")), RegexTokenCounter)
+    print("✓ PASS | tokenizer.json is used when present, regex approximation otherwise")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("KNOWLEDGE BASE CHUNKER - TEST SUITE")
+    print("=" * 60)
+    test_section_ids_do_not_depend_on_position()
+    test_short_sections_stay_whole()
+    test_long_sections_are_bounded_and_overlap()
+    test_unbreakable_text_is_cut_by_tokens()
+    test_incomplete_token_counter_fails_on_construction()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_tokenizer_json_counter(Path(tmp))
@@ -0,0 +1,210 @@
+"""
+Test script for PostgresPool
+Replaces psycopg2.connect with in-memory fake connections (no database required)
+"""
+import asyncio
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from db_pool import PostgresPool, AsyncPostgresPool, PoolTimeout
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.conn.executed.append(sql)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.executed = []
+        self.rollbacks = 0
+        self.in_transaction = False
+
+    def cursor(self):
+        self.in_transaction = True
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def get_transaction_status(self):
+        if self.in_transaction:
+            return psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**kwargs):
+    """Build a pool whose connections are FakeConnection instances"""
+    opened = []
+
+    def fake_connect(**_):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    pool = PostgresPool("localhost", "5432", "postgres", "postgres", "secret", connect=fake_connect, **kwargs)
+    return pool, opened
+
+
+def test_connections_are_reused():
+    pool, opened = make_pool(max_size=2)
+    for _ in range(5):
+        with pool.connection() as conn:
+            conn.cursor().execute("SELECT 1")
+    assert len(opened) == 1
+    assert opened[0].rollbacks == 5, "open transaction should be rolled back on release"
+    stats = pool.get_stats()
+    assert stats["acquisitions"] == 5 and stats["connections_created"] == 1 and stats["idle"] == 1
+    print("✓ PASS | One connection reused across requests")
+
+
+def test_acquire_timeout_when_exhausted():
+    pool, _ = make_pool(max_size=1)
+    conn = pool.acquire()
+    start = time.monotonic()
+    try:
+        pool.acquire(timeout=0.1)
+        assert False, "expected PoolTimeout"
+    except PoolTimeout:
+        pass
+    assert time.monotonic() - start < 1.0
+    assert pool.get_stats()["acquire_timeouts"] == 1
+    pool.release(conn)
+    print("✓ PASS | Exhausted pool raises PoolTimeout")
+
+
+def test_waiter_gets_released_connection():
+    pool, opened = make_pool(max_size=1)
+    conn = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(conn,)).start()
+    assert pool.acquire(timeout=2.0) is conn
+    assert len(opened) == 1
+    print("✓ PASS | Waiting caller receives the released connection")
+
+
+def test_broken_connection_is_discarded():
+    pool, opened = make_pool()
+    try:
+        with pool.connection() as conn:
+            conn.broken = True
+            conn.cursor().execute("SELECT 1")
+    except psycopg2.OperationalError:
+        pass
+    assert opened[0].closed
+    with pool.connection() as conn:
+        assert conn is opened[1]
+    print("✓ PASS | Connection that raised OperationalError is replaced")
+
+
+def test_idle_health_check_and_max_lifetime():
+    pool, opened = make_pool(health_check_after=0, max_lifetime=3600)
+    with pool.connection():
+        pass
+    opened[0].broken = True
+    with pool.connection() as conn:
+        assert conn is opened[1], "unhealthy idle connection should be replaced"
+    assert pool.get_stats()["health_check_failures"] == 1
+
+    pool, opened = make_pool(max_lifetime=0)
+    with pool.connection():
+        pass
+    with pool.connection():
+        pass
+    assert len(opened) == 2 and opened[0].closed
+    print("✓ PASS | Unhealthy and expired connections are not reused")
+
+
+def test_async_pool_and_health_check():
+    pool, opened = make_pool()
+    async_pool = AsyncPostgresPool(pool)
+
+    async def run():
+        result = await async_pool.run(lambda conn, value: value * 2, 21)
+        healthy = await async_pool.check()
+        return result, healthy
+
+    result, healthy = asyncio.run(run())
+    assert result == 42 and healthy is True
+    assert len(opened) == 1
+
+    opened[0].broken = True
+    pool.health_check_after = 0
+    assert pool.check() is True, "check should recover with a fresh connection"
+    pool.close()
+    assert pool.check() is False
+    print("✓ PASS | Async front-end and health check")
+
+
+def test_cancelled_callers_do_not_leak_or_share_connections():
+    pool, opened = make_pool(max_size=1, acquire_timeout=2)
+    async_pool = AsyncPostgresPool(pool)
+    query_started, finish_query = threading.Event(), threading.Event()
+
+    def slow_query(conn):
+        query_started.set()
+        finish_query.wait(2)
+        return "rows"
+
+    async def scenario():
+        # Cancelled mid-query: the connection stays checked out until the worker is done with it
+        task = asyncio.ensure_future(async_pool.run(slow_query))
+        await asyncio.get_event_loop().run_in_executor(None, query_started.wait, 2)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        in_use_during_query = pool.get_stats()['in_use']
+        finish_query.set()
+        await asyncio.sleep(0.1)
+        after_query = pool.get_stats()
+
+        # Cancelled while waiting for a connection: the late acquisition is given back
+        held = pool.acquire()
+        waiter = asyncio.ensure_future(async_pool.run(lambda conn: "unused"))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        pool.release(held)
+        await asyncio.sleep(0.1)
+
+        context_waiter = asyncio.ensure_future(async_pool.connection().__aenter__())
+        await asyncio.sleep(0)
+        context_waiter.cancel()
+        await asyncio.sleep(0.1)
+        return in_use_during_query, after_query, pool.get_stats()
+
+    in_use_during_query, after_query, final = asyncio.run(scenario())
+    assert in_use_during_query == 1
+    assert after_query['in_use'] == 0 and after_query['idle'] == 1
+    assert final['in_use'] == 0 and final['idle'] == 1 and len(opened) == 1
+    print("✓ PASS | Cancelled callers neither leak connections nor release one still in use")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("POSTGRES CONNECTION POOL - TEST SUITE")
+    print("=" * 60)
+    test_connections_are_reused()
+    test_acquire_timeout_when_exhausted()
+    test_waiter_gets_released_connection()
+    test_broken_connection_is_discarded()
+    test_idle_health_check_and_max_lifetime()
+    test_async_pool_and_health_check()
+    test_cancelled_callers_do_not_leak_or_share_connections()
@@ -0,0 +1,84 @@
+"""
+Test script for the embedding backends
+The parity test compares the ONNX export against the PyTorch SentenceTransformer model;
+it needs sentence-transformers, onnxruntime and an export (python export_onnx_embedder.py)
+"""
+import os
+
+import numpy as np
+import pytest
+
+from embedder import DEFAULT_ONNX_PATH, Embedder, create_embedder, mean_pool
+
+SENTENCES = [
+    "How do I start an assessment?",
+    "What is the passing percentage for the aptitude test?",
+    "Tips for improving logical reasoning",
+    "Can I retake an assessment after failing?",
+    "hello",
+    "The verbal ability section has 30 questions and a 20 minute time limit.",
+]
+
+CORPUS = [
+    "To start an assessment, open Assessments and click Start on an available test.",
+    "The passing percentage is shown on each assessment card, usually 60%.",
+    "Practice puzzles and syllogisms daily to improve logical reasoning.",
+    "Retakes are allowed once the assessment window reopens.",
+    "Verbal ability covers grammar, vocabulary and reading comprehension.",
+]
+
+
+def test_mean_pool_ignores_padding():
+    tokens = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]])
+    mask = np.array([[1, 1, 0]])
+    assert np.allclose(mean_pool(tokens, mask), [[2.0, 2.0]])
+    print("✓ PASS | Mean pooling averages only real tokens")
+
+
+def test_incomplete_embedder_fails_on_construction():
+    class NoEncodeEmbedder(Embedder):
+        dimension = 384
+
+    with pytest.raises(TypeError, match="encode"):
+        NoEncodeEmbedder()
+    print("✓ PASS | An embedder without encode() cannot be instantiated")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_embedder("tensorflow")
+    print("✓ PASS | Unknown EMBEDDING_BACKEND raises ValueError")
+
+
+@pytest.mark.parametrize("backend,min_cosine", [("onnx-fp32", 0.9999), ("onnx", 0.98)])
+def test_onnx_parity_with_sentence_transformers(backend, min_cosine):
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    onnx_path = os.getenv("EMBEDDING_ONNX_PATH", DEFAULT_ONNX_PATH)
+    if not os.path.isdir(onnx_path):
+        pytest.skip(f"no ONNX export at {onnx_path} (run export_onnx_embedder.py)")
+
+    reference = create_embedder("sentence-transformers")
+    candidate = create_embedder(backend, onnx_path=onnx_path)
+    assert candidate.dimension == reference.dimension
+
+    expected, actual = reference.encode(SENTENCES), candidate.encode(SENTENCES)
+    cosines = (expected * actual).sum(axis=1)
+    assert cosines.min() >= min_cosine, cosines
+
+    # Retrieval must rank the same document first for every query
+    expected_top = (reference.encode(SENTENCES[:4]) @ reference.encode(CORPUS).T).argmax(axis=1)
+    actual_top = (candidate.encode(SENTENCES[:4]) @ candidate.encode(CORPUS).T).argmax(axis=1)
+    assert list(expected_top) == list(actual_top)
+    print(f"✓ PASS | {backend} matches SentenceTransformer (min cosine {cosines.min():.5f}, same top-1)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EMBEDDING BACKENDS - TEST SUITE")
+    print("=" * 60)
+    test_mean_pool_ignores_padding()
+    test_incomplete_embedder_fails_on_construction()
+    test_unknown_backend_is_rejected()
+    test_onnx_parity_with_sentence_transformers("onnx-fp32", 0.9999)
+    test_onnx_parity_with_sentence_transformers("onnx", 0.98)
@@ -0,0 +1,44 @@
+"""
+Test script for the query embedding cache
+"""
+import numpy as np
+
+from embedding_cache import EmbeddingCache, normalize_query
+
+
+def test_normalized_queries_share_an_entry():
+    cache = EmbeddingCache()
+    assert normalize_query("  What assessments\tare  AVAILABLE ") == "what assessments are available"
+    cache.put(normalize_query("What assessments are available"), [0.1, 0.2, 0.3])
+    vector = cache.get(normalize_query("what assessments   are available"))
+    assert vector is not None and vector.dtype == np.float32 and not vector.flags.writeable
+    assert cache.get(normalize_query("what is aptitude")) is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 50.0
+    print("✓ PASS | Case and whitespace variants reuse one float32 embedding")
+
+
+def test_lru_bounded_by_count_and_bytes():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", np.ones(384))
+    cache.put("b", np.ones(384))
+    cache.get("a")
+    cache.put("c", np.ones(384))
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.get_stats()["evictions"] == 1
+
+    vector_bytes = np.ones(384, dtype=np.float32).nbytes
+    cache = EmbeddingCache(max_entries=100, max_bytes=vector_bytes * 3)
+    for i in range(10):
+        cache.put(str(i), np.ones(384))
+    stats = cache.get_stats()
+    assert stats["size"] == 3 and stats["bytes"] == vector_bytes * 3
+    print(f"✓ PASS | LRU bounded by entries and bytes ({vector_bytes} bytes per 384-d vector)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("QUERY EMBEDDING CACHE - TEST SUITE")
+    print("=" * 60)
+    test_normalized_queries_share_an_entry()
+    test_lru_bounded_by_count_and_bytes()
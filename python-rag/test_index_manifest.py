@@ -0,0 +1,66 @@
+"""
+Test script for the vector index manifest
+"""
+import json
+
+from index_manifest import IndexManifest, document_hash
+
+
+def test_hash_covers_text_and_metadata():
+    base = document_hash("## Aptitude\nPractice daily", {"source": "tips.md", "section": "Aptitude"})
+    assert base == document_hash("## Aptitude\nPractice daily", {"section": "Aptitude", "source": "tips.md"})
+    assert base != document_hash("## Aptitude\nPractice weekly", {"source": "tips.md", "section": "Aptitude"})
+    assert base != document_hash("## Aptitude\nPractice daily", {"source": "faq.md", "section": "Aptitude"})
+    print("✓ PASS | Hash changes with text or metadata, not with key order")
+
+
+def test_round_trip_and_model_check(tmp_path):
+    path = tmp_path / "index" / "index_manifest.json"
+    manifest = IndexManifest(str(path))
+    assert not manifest.load()
+    manifest.reset("all-MiniLM-L6-v2", 384, "placement_knowledge")
+    manifest.record(["a", "b"], ["h1", "h2"])
+    manifest.save()
+
+    reopened = IndexManifest(str(path))
+    assert reopened.load()
+    assert reopened.documents == {"a": "h1", "b": "h2"}
+    assert reopened.matches("all-MiniLM-L6-v2", 384, "placement_knowledge")
+    assert not reopened.matches("all-MiniLM-L6-v2-onnx-int8", 384, "placement_knowledge")
+    assert not reopened.matches("all-MiniLM-L6-v2", 768, "placement_knowledge")
+    assert not (tmp_path / "index" / "index_manifest.json.tmp").exists()
+    print("✓ PASS | Manifest survives a reopen and rejects a different model or dimension")
+
+
+def test_changed_documents_only(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "index_manifest.json"))
+    manifest.reset("all-MiniLM-L6-v2", 384, "placement_knowledge")
+    manifest.record(["a", "b", "c"], ["h1", "h2", "h3"])
+    assert manifest.changed(["a", "b", "c", "d"], ["h1", "h2-edited", "h3", "h4"]) == [1, 3]
+    manifest.forget(["c", "missing"])
+    assert manifest.documents == {"a": "h1", "b": "h2"}
+    print("✓ PASS | Only new and edited documents are re-embedded")
+
+
+def test_unreadable_or_old_manifest_is_ignored(tmp_path):
+    path = tmp_path / "index_manifest.json"
+    path.write_text("{not json")
+    assert not IndexManifest(str(path)).load()
+    path.write_text(json.dumps({"version": 0, "documents": {"a": "h1"}}))
+    manifest = IndexManifest(str(path))
+    assert not manifest.load() and manifest.documents == {}
+    print("✓ PASS | Corrupt or outdated manifests force a rebuild")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("VECTOR INDEX MANIFEST - TEST SUITE")
+    print("=" * 60)
+    test_hash_covers_text_and_metadata()
+    for test in (test_round_trip_and_model_check, test_changed_documents_only,
+                 test_unreadable_or_old_manifest_is_ignored):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
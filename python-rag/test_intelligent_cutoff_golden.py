@@ -0,0 +1,119 @@
+"""
+Test script for the compiled IntelligentCutoff scoring
+intelligent_cutoff_golden.jsonl was recorded from the list-scanning IntelligentCutoff before its
+keyword lists were compiled into one automaton, on real queries (test_intelligent_cutoff.py,
+test_unclear_queries.py, classify_query_golden.jsonl, the cache and topic eval sets and recorded
+conversations); scores, off-topic categories and unclear flags must all be unchanged. Arbitrary
+inputs are covered by test_fuzz_parity against ListScanningCutoff in benchmark_intelligent_cutoff.py
+"""
+import json
+import logging
+import random
+
+from benchmark_intelligent_cutoff import ListScanningCutoff, evaluate
+from intelligent_cutoff import IntelligentCutoff
+
+GOLDEN_FILE = "intelligent_cutoff_golden.jsonl"
+FUZZ_QUERIES = 20000
+
+
+def load_golden():
+    with open(GOLDEN_FILE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_golden_parity():
+    logging.disable(logging.WARNING)  # thousands of per-query log lines
+    try:
+        cutoff = IntelligentCutoff()
+        rows = load_golden()
+        mismatches = []
+        for row in rows:
+            score = cutoff.calculate_relevance_score(row['query'])
+            off_topic, category, _ = cutoff.is_off_topic(row['query'])
+            got = (score, off_topic, category, cutoff.is_unclear_query(row['query'], score))
+            if got != (row['relevance_score'], row['is_off_topic'], row['category'], row['is_unclear']):
+                mismatches.append((row['query'], got))
+    finally:
+        logging.disable(logging.NOTSET)
+    assert not mismatches, mismatches[:10]
+    print(f"✓ PASS | {len(rows)} recorded queries score and route exactly as before")
+
+
+def fuzz_queries(cutoff: IntelligentCutoff, count: int, seed: int = 22):
+    """
+    Random mixes of every keyword list, slang, gibberish, digits and punctuation, with case and
+    spacing noise, sized to cross the short-word, no-vowel and special-character thresholds
+    """
+    rng = random.Random(seed)
+    words = sorted({word for keywords in [cutoff.high_relevance, cutoff.medium_relevance, cutoff.low_relevance,
+                                          cutoff.career_terms, cutoff.question_words, cutoff.action_words,
+                                          cutoff.dismissive_patterns, cutoff.unclear_phrases, cutoff.slang_words,
+                                          *cutoff.off_topic_keywords.values()] for word in keywords})
+    noise = ["hi", "ok", "no", "a", "x", "me", "my", "is", "the", "42", "111", "aaa", "zzzz", "brrr", "qwrtp",
+             "xyz", "!!!", "?", "...", "@#$", "-", "hmm"]
+    for _ in range(count):
+        parts = [rng.choice(words if rng.random() < 0.5 else noise) for _ in range(rng.randint(0, 8))]
+        if len(parts) > 1 and rng.random() < 0.2:
+            i = rng.randrange(len(parts) - 1)
+            parts[i:i + 2] = ["".join(parts[i:i + 2])]
+        query = " ".join(parts)
+        if rng.random() < 0.3:
+            query += rng.choice(["?", "!", "!!!", " ?", "...", "??"])
+        if rng.random() < 0.2:
+            query = rng.choice([" ", "  ", "\t", "\n"]) + query + rng.choice(["", " "])
+        if rng.random() < 0.3:
+            query = query.upper() if rng.random() < 0.5 else query.title()
+        yield query
+
+
+def test_fuzz_parity():
+    logging.disable(logging.WARNING)
+    try:
+        reference, cutoff = ListScanningCutoff(), IntelligentCutoff()
+        mismatches = []
+        for query in fuzz_queries(cutoff, FUZZ_QUERIES):
+            expected = evaluate(reference, query)
+            got = evaluate(cutoff, query)
+            if got != expected or cutoff.is_off_topic_batch([query])[0] != expected[0]:
+                mismatches.append((query, expected, got))
+    finally:
+        logging.disable(logging.NOTSET)
+    assert not mismatches, mismatches[:10]
+    print(f"✓ PASS | {FUZZ_QUERIES} random queries score and route like the list-scanning scorer")
+
+
+def test_batch_matches_single_queries():
+    queries = ["Show me available assessments", "What's the weather like?", "", "lol", "what about",
+               "Show me available assessments", "How do I get a girlfriend?"]
+    single = IntelligentCutoff(cache_size=0)
+    batch = IntelligentCutoff()
+    assert batch.calculate_relevance_scores(queries) == [single.calculate_relevance_score(q) for q in queries]
+    assert batch.is_off_topic_batch(queries) == [single.is_off_topic(q) for q in queries]
+    assert batch.is_off_topic_batch(["What's the weather like?"])[0] == (True, "random", 35)
+    print("✓ PASS | Batch scoring matches one-at-a-time scoring")
+
+
+def test_recent_scores_cached():
+    cutoff = IntelligentCutoff(cache_size=2)
+    for query in ["show my results", "show my results", "explain algorithms", "help me", "show my results"]:
+        cutoff.calculate_relevance_score(query)
+    stats = cutoff.get_stats()
+    assert stats['cache_hits'] == 1 and stats['cache_misses'] == 4 and stats['cache_size'] == 2
+    # is_off_topic/is_unclear_query after scoring reuse the cached scan
+    query = "can you tell me something about the placement process"
+    score = cutoff.calculate_relevance_score(query)
+    cutoff.is_off_topic(query)
+    cutoff.is_unclear_query(query, score)
+    assert cutoff.get_stats()['cache_hits'] == 3
+    print("✓ PASS | Scores of recent queries are cached (LRU)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("INTELLIGENT CUTOFF SCORING - TEST SUITE")
+    print("=" * 60)
+    test_golden_parity()
+    test_fuzz_parity()
+    test_batch_matches_single_queries()
+    test_recent_scores_cached()
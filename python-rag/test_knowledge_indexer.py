@@ -0,0 +1,113 @@
+"""
+Test script for incremental knowledge base indexing
+"""
+from index_manifest import document_hash
+from chunker import Chunker
+from knowledge_indexer import KnowledgeBaseIndexer, KnowledgeBaseWatcher
+from tokenizer import RegexTokenCounter
+
+
+class RecordingStore:
+    """VectorStore stand-in: hash-skipping upserts, like the real add_documents"""
+
+    def __init__(self):
+        self.documents = {}
+        self.encoded = []
+
+    def add_documents(self, documents, metadatas, ids, batch_size=64):
+        changed = [i for i, doc_id in enumerate(ids)
+                   if self.documents.get(doc_id, (None, None))[1] != document_hash(documents[i], metadatas[i])]
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            self.encoded.append(len(batch))
+            for i in batch:
+                self.documents[ids[i]] = (metadatas[i], document_hash(documents[i], metadatas[i]))
+        return {'embedded': len(changed), 'unchanged': len(ids) - len(changed)}
+
+    def document_ids(self, where=None):
+        return [doc_id for doc_id, (metadata, _) in self.documents.items()
+                if not where or all(metadata.get(k) == v for k, v in where.items())]
+
+    def delete_documents(self, ids):
+        for doc_id in ids:
+            del self.documents[doc_id]
+        return len(ids)
+
+
+GUIDE = "# Guide\nWelcome text\n## Aptitude Tips\nPractice daily\n## Verbal\nRead more\n"
+
+
+def make_indexer(store, kb_dir, batch_size=64):
+    return KnowledgeBaseIndexer(store, kb_dir=str(kb_dir), batch_size=batch_size,
+                                chunker=Chunker(counter=RegexTokenCounter()))
+
+
+def test_sync_embeds_changes_and_deletes_vanished_sections(tmp_path):
+    (tmp_path / "guide.md").write_text(GUIDE, encoding="utf-8")
+    (tmp_path / "faq.md").write_text("## Login\nUse your email\n", encoding="utf-8")
+    store = RecordingStore()
+    store.documents["other_source"] = ({'type': 'assessment'}, "h")
+    indexer = make_indexer(store, tmp_path, batch_size=2)
+
+    first = indexer.sync()
+    assert (first['files'], first['chunks'], first['embedded'], first['deleted']) == (2, 4, 4, 0)
+    assert store.encoded == [2, 2]
+    assert indexer.sync()['embedded'] == 0
+
+    (tmp_path / "guide.md").write_text(GUIDE.replace("Practice daily", "Practice twice a day")
+                                       .replace("## Verbal\nRead more\n", ""), encoding="utf-8")
+    (tmp_path / "faq.md").unlink()
+    second = indexer.sync()
+    assert (second['embedded'], second['unchanged'], second['deleted']) == (1, 1, 2)
+    assert sorted(store.documents) == ["guide.md_aptitude-tips", "guide.md_intro", "other_source"]
+    print("✓ PASS | Only edited chunks are re-embedded; removed sections and files are deleted")
+
+
+def test_empty_directory_leaves_index_alone(tmp_path):
+    store = RecordingStore()
+    store.documents["guide.md_intro"] = ({'type': 'knowledge_base'}, "h")
+    assert make_indexer(store, tmp_path / "missing").sync()['files'] == 0
+    assert "guide.md_intro" in store.documents
+    print("✓ PASS | A missing knowledge_base/ does not wipe the index")
+
+
+def test_watcher_reindexes_on_edit(tmp_path):
+    path = tmp_path / "guide.md"
+    path.write_text(GUIDE, encoding="utf-8")
+    changes = []
+    watcher = KnowledgeBaseWatcher(make_indexer(RecordingStore(), tmp_path), on_change=changes.append)
+    assert watcher.check()['embedded'] == 3
+    assert watcher.check() is None  # nothing changed, no sync
+
+    path.write_text(GUIDE + "## Coding\nPractice problems\n", encoding="utf-8")
+    assert watcher.check()['embedded'] == 1
+    assert [stats['embedded'] for stats in changes] == [3, 1]
+    assert watcher.get_stats()['syncs'] == 2
+    print("✓ PASS | Watcher reindexes only when a file changes and notifies the service")
+
+
+def test_primed_watcher_skips_the_initial_sync(tmp_path):
+    path = tmp_path / "guide.md"
+    path.write_text(GUIDE, encoding="utf-8")
+    indexer = make_indexer(RecordingStore(), tmp_path)
+    indexer.sync()
+    watcher = KnowledgeBaseWatcher(indexer)
+    watcher.prime()
+    assert watcher.check() is None and watcher.get_stats()['syncs'] == 0
+
+    path.write_text(GUIDE + "## Coding\nPractice problems\n", encoding="utf-8")
+    assert watcher.check()['embedded'] == 1
+    print("✓ PASS | A primed watcher only syncs files edited after priming")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("KNOWLEDGE BASE INDEXER - TEST SUITE")
+    print("=" * 60)
+    for test in (test_sync_embeds_changes_and_deletes_vanished_sections, test_empty_directory_leaves_index_alone,
+                 test_watcher_reindexes_on_edit, test_primed_watcher_skips_the_initial_sync):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
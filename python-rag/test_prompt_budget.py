@@ -0,0 +1,93 @@
+"""
+Test script for the prompt token budget
+"""
+from context_handler import ContextHandler
+from prompt_budget import PromptBudget
+from tokenizer import RegexTokenCounter
+
+COUNTER = RegexTokenCounter()
+
+CONTEXT = {
+    'student_info': {'id': 7, 'name': 'Asha', 'email': 'asha@example.com'},
+    'available_assessments': [{'title': f'Mock Test {i}', 'category': 'Aptitude', 'total_time': 30}
+                              for i in range(1, 41)],
+    'completed_assessments': [],
+}
+
+DOCUMENTS = [f"## Tip {i}\n" + " ".join(["Practice timed question sets and review mistakes."] * 40)
+             for i in range(3)]
+
+
+def conversation(turns):
+    history = []
+    for i in range(turns):
+        history.append({'role': 'user', 'content': f'question {i} about aptitude preparation'})
+        history.append({'role': 'assistant', 'content': " ".join([f'Answer {i} with detailed advice.'] * 30)})
+    return history
+
+
+def build(budget, history, documents=DOCUMENTS):
+    handler = ContextHandler(openrouter_client=None, prompt_budget=budget)
+    return handler._build_enhanced_prompt("how do I improve my aptitude score", CONTEXT, "general",
+                                          None, None, list(documents), history)
+
+
+def prompt_tokens(messages):
+    return sum(COUNTER.count(message['content']) + 4 for message in messages)
+
+
+def test_legacy_prompt_unchanged_without_budget():
+    messages = build(None, conversation(8))
+    assert len(messages) == 12  # system + last 10 history messages + question
+    assert messages[1] == conversation(8)[-10]
+    assert DOCUMENTS[0][:500] + "\n" in messages[0]['content'] and DOCUMENTS[0][:501] not in messages[0]['content']
+    assert "40. Mock Test 40" in messages[-1]['content']
+    print(f"✓ PASS | No budget keeps the legacy prompt ({prompt_tokens(messages)} tokens)")
+
+
+def test_budget_bounds_long_conversations():
+    budget = PromptBudget(max_prompt_tokens=1800, knowledge_tokens=500, history_tokens=400,
+                          max_doc_tokens=200, max_message_tokens=120, counter=COUNTER)
+    history = conversation(8)
+    messages = build(budget, history)
+    legacy = build(None, history)
+
+    assert prompt_tokens(messages) <= 1800 < prompt_tokens(legacy)
+    assert messages[-2] == {'role': 'assistant', 'content': COUNTER.truncate(history[-1]['content'], 120)}
+    summary = messages[1]
+    assert summary['role'] == 'system' and summary['content'].startswith("Earlier in this conversation")
+    assert "question 0 about aptitude" in summary['content']
+    assert "15. Mock Test 15" in messages[-1]['content'] and "Mock Test 16" not in messages[-1]['content']
+    assert "... and 25 more (total: 40 available)" in messages[-1]['content']
+
+    stats = budget.get_stats()
+    assert stats['requests'] == 1 and stats['over_budget'] == 0 and stats['history_messages_dropped'] > 0
+    assert stats['average_tokens']['knowledge'] <= 500 + 8 and stats['average_tokens']['history'] <= 400
+    print(f"✓ PASS | 8-turn conversation: {prompt_tokens(legacy)} -> {prompt_tokens(messages)} prompt tokens")
+
+
+def test_documents_trimmed_by_relevance():
+    budget = PromptBudget(knowledge_tokens=300, max_doc_tokens=200, counter=COUNTER)
+    documents, _, breakdown = budget.allocate("system", "question", DOCUMENTS, [])
+    assert len(documents) == 2 and documents[0] == COUNTER.truncate(DOCUMENTS[0], 200)
+    assert DOCUMENTS[1].startswith(documents[1]) and COUNTER.count(documents[1]) == 100
+    assert breakdown['documents_dropped'] == 1
+    print("✓ PASS | Most relevant documents kept first; the last one truncated, the rest dropped")
+
+
+def test_short_history_kept_whole():
+    budget = PromptBudget(counter=COUNTER)
+    history = [{'role': 'user', 'content': 'hi'}, {'role': 'assistant', 'content': 'Hello! How can I help?'}]
+    _, fitted, breakdown = budget.allocate("system", "question", [], history)
+    assert fitted == history and breakdown['history_dropped'] == 0
+    print("✓ PASS | Short conversations are not summarized or trimmed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PROMPT TOKEN BUDGET - TEST SUITE")
+    print("=" * 60)
+    test_legacy_prompt_unchanged_without_budget()
+    test_budget_bounds_long_conversations()
+    test_documents_trimmed_by_relevance()
+    test_short_history_kept_whole()
@@ -0,0 +1,109 @@
+"""
+Test script for the compiled query classifier
+classify_query_golden.jsonl was recorded from the if-chain ContextHandler._classify_query before
+it was replaced, on real student queries (the test suites, the cache and topic eval sets, recorded
+conversations and hand-written phrasings for the rarer query types); every row must still classify
+the same way. Arbitrary inputs are covered by test_fuzz_parity, which checks seeded random keyword
+mixes against the if-chain kept in benchmark_classifier.py
+"""
+import json
+import random
+
+from benchmark_classifier import legacy_classify
+from context_handler import ContextHandler
+from keyword_automaton import KeywordAutomaton
+from query_classifier import CLASSIFICATION_RULES, DEFAULT_CLASSIFIER, QueryClassifier
+
+GOLDEN_FILE = "classify_query_golden.jsonl"
+FUZZ_QUERIES = 20000
+
+
+def load_golden():
+    with open(GOLDEN_FILE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_golden_parity():
+    handler = ContextHandler(openrouter_client=None)
+    rows = load_golden()
+    mismatches = [(row['query'], row['query_type'], handler._classify_query(row['query']))
+                  for row in rows if handler._classify_query(row['query']) != row['query_type']]
+    assert not mismatches, mismatches[:10]
+    assert len({row['query_type'] for row in rows}) == 9
+    print(f"✓ PASS | {len(rows)} recorded queries classify exactly as before")
+
+
+def fuzz_queries(count: int, seed: int = 21):
+    """Random mixes of every rule keyword, filler words and stray characters, with case/spacing noise"""
+    rng = random.Random(seed)
+    keywords = sorted({keyword for rule in CLASSIFICATION_RULES
+                       for keyword in list(rule['keywords']) + list(rule.get('unless', ()))})
+    fillers = ["my", "the", "please", "i", "me", "about", "for", "ok", "x", "a", "?", "!", ",", "..."]
+    for _ in range(count):
+        parts = [rng.choice(keywords if rng.random() < 0.6 else fillers) for _ in range(rng.randint(1, 6))]
+        if rng.random() < 0.3:
+            # Glue neighbouring words together to probe substring matches ("thanksgiving", "hint")
+            i = rng.randrange(len(parts))
+            parts[i:i + 2] = ["".join(parts[i:i + 2])]
+        query = " ".join(parts)
+        if rng.random() < 0.2:
+            query += rng.choice(["!", "?", " !", "  "])
+        if rng.random() < 0.2:
+            query = rng.choice([" ", "\t", "  "]) + query
+        if rng.random() < 0.3:
+            query = query.upper() if rng.random() < 0.5 else query.title()
+        yield query
+
+
+def test_fuzz_parity():
+    handler = ContextHandler(openrouter_client=None)
+    mismatches = []
+    for query in fuzz_queries(FUZZ_QUERIES):
+        expected = legacy_classify(query)
+        if DEFAULT_CLASSIFIER.classify(query) != expected or handler._classify_query(query) != expected:
+            mismatches.append((query, expected, DEFAULT_CLASSIFIER.classify(query)))
+    assert not mismatches, mismatches[:10]
+    print(f"✓ PASS | {FUZZ_QUERIES} random keyword mixes classify like the old if-chain")
+
+
+def test_automaton_finds_overlapping_and_nested_keywords():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers", "test", "take test"])
+    assert automaton.find("ushers") == ["he", "she", "hers"]
+    assert automaton.find("please take test now") == ["test", "take test"]
+    assert automaton.find("") == [] and automaton.find("xyz") == []
+    for text in ["ahishers", "shehe", "tes test", "take tes"]:
+        assert automaton.find(text) == [k for k in automaton.keywords if k in text], text
+    print("✓ PASS | Automaton reports overlapping and nested keywords like `in`")
+
+
+def test_matches_reports_every_category():
+    assert DEFAULT_CLASSIFIER.matches("how to check my test score") == ["assessments", "results", "help"]
+    assert DEFAULT_CLASSIFIER.matches("play football after the game") == ["off_topic:entertainment",
+                                                                          "off_topic:sports"]
+    assert DEFAULT_CLASSIFIER.classify("play football after the game") == "off_topic"
+    # Career terms veto off-topic; the data terms veto a greeting
+    assert DEFAULT_CLASSIFIER.matches("team player skills for interview") == []
+    assert DEFAULT_CLASSIFIER.classify("hi, show my test") == "assessments"
+    assert DEFAULT_CLASSIFIER.classify("hello!") == "greeting" and DEFAULT_CLASSIFIER.classify("history") == "general"
+    print("✓ PASS | matches() returns all categories in priority order")
+
+
+def test_custom_rules():
+    rules = [{'name': 'billing', 'type': 'billing', 'keywords': ["invoice", "refund"], 'unless': ["test"]}]
+    rules += CLASSIFICATION_RULES
+    classifier = QueryClassifier(rules)
+    assert classifier.classify("refund for my invoice") == "billing"
+    assert classifier.classify("refund my test fee") == "assessments"
+    assert ContextHandler(openrouter_client=None, query_classifier=classifier)._classify_query("Refund?") == "billing"
+    print("✓ PASS | Rule table can be extended without code changes")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("QUERY CLASSIFIER - TEST SUITE")
+    print("=" * 60)
+    test_golden_parity()
+    test_fuzz_parity()
+    test_automaton_finds_overlapping_and_nested_keywords()
+    test_matches_reports_every_category()
+    test_custom_rules()
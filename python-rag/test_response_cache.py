@@ -0,0 +1,127 @@
+"""
+Test script for ResponseCache
+Checks LRU eviction, the byte budget, TTL expiry, the background sweeper
+and the shared (cross-student) keyspace
+"""
+import asyncio
+import time
+
+from response_cache import ResponseCache, estimate_size, personal_terms
+
+
+def response(text: str):
+    return {"success": True, "message": text, "query_type": "help"}
+
+
+def test_lru_eviction_by_entries():
+    cache = ResponseCache(max_entries=2)
+    cache.set("how to start", 1, response("a"))
+    cache.set("what is aptitude", 1, response("b"))
+    assert cache.get("how to start", 1) is not None  # now most recently used
+    cache.set("how long is a test", 1, response("c"))
+    assert cache.get("what is aptitude", 1) is None
+    assert cache.get("how to start", 1) is not None
+    assert cache.get_stats()["evictions"] == 1
+    print("✓ PASS | Least recently used entry is evicted at max_entries")
+
+
+def test_byte_budget():
+    entry_size = estimate_size(response("x" * 1000))
+    cache = ResponseCache(max_entries=100, max_bytes=entry_size * 3)
+    for i in range(10):
+        cache.set(f"question {i}", 1, response("x" * 1000))
+    stats = cache.get_stats()
+    assert stats["size"] == 3 and stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 7
+
+    cache.set("huge", 1, response("y" * entry_size * 4))
+    assert cache.get("huge", 1) is None, "entries larger than the whole budget are not cached"
+    print(f"✓ PASS | Byte budget enforced ({stats['bytes']} / {stats['max_bytes']} bytes)")
+
+
+def test_expiry_and_cleanup():
+    cache = ResponseCache(ttl_seconds=0.05)
+    cache.set("old", 1, response("a"))
+    time.sleep(0.06)
+    cache.set("new", 1, response("b"))
+    assert cache.cleanup_expired() == 1
+    stats = cache.get_stats()
+    assert stats["size"] == 1 and stats["expirations"] == 1
+    assert stats["bytes"] == estimate_size(response("b"))
+    print("✓ PASS | cleanup_expired removes only expired entries")
+
+
+def test_background_sweeper():
+    cache = ResponseCache(ttl_seconds=0.02)
+
+    async def run():
+        cache.start_sweeper(interval_seconds=0.01)
+        cache.set("how to start", 1, response("a"))
+        await asyncio.sleep(0.1)
+        await cache.stop_sweeper()
+
+    asyncio.run(run())
+    assert cache.get_stats()["size"] == 0
+    assert cache.get_stats()["bytes"] == 0
+    print("✓ PASS | Background sweeper removes expired entries")
+
+
+def test_overwrite_keeps_accounting():
+    cache = ResponseCache()
+    cache.set("how to start", 1, response("short"))
+    cache.set("how to start", 1, response("a much longer answer"))
+    stats = cache.get_stats()
+    assert stats["size"] == 1
+    assert stats["bytes"] == estimate_size(response("a much longer answer"))
+    print("✓ PASS | Overwriting an entry keeps byte accounting exact")
+
+
+def test_shared_keyspace_across_students():
+    cache = ResponseCache()
+    query = "How do I reset the timer?"
+    assert cache.should_cache(query, "help") is True
+    assert cache.should_cache(query, None) is False, "first-person questions stay uncached outside FAQ types"
+
+    cache.set(query, 1, response("Hi Asha, click Settings."), "help", student_name="Asha Rao")
+    cached = cache.get(query, 2, "help", student_name="Ben Kumar")
+    assert cached["message"] == "Hi Ben, click Settings."
+    assert cache.get(query, 3, "help") is None, "templated answer needs the asker's name"
+
+    stats = cache.get_stats()
+    assert stats["shared_entries"] == 1 and stats["shared_hits"] == 1
+    assert stats["by_query_type"]["help"] == {"hits": 1, "misses": 1, "hit_rate": 50.0}
+    print("✓ PASS | FAQ answer cached once and personalised for every student")
+
+
+def test_student_specific_answers_stay_private():
+    cache = ResponseCache()
+    context = {"available_assessments": [{"title": "Aptitude Round 2"}], "completed_assessments": []}
+    terms = personal_terms(context, "asha@college.edu")
+    cache.set("what is next", 1, response("Try Aptitude Round 2 next."), "general",
+              student_name="Asha", private_terms=terms)
+    assert cache.get("what is next", 2, "general", student_name="Ben") is None
+    assert cache.get("what is next", 1, "general", student_name="Asha")["message"] == "Try Aptitude Round 2 next."
+    assert cache.get_stats()["shared_entries"] == 0
+    print("✓ PASS | Answers mentioning student data fall back to the per-student keyspace")
+
+
+def test_personal_keywords_match_whole_words():
+    cache = ResponseCache()
+    assert cache.should_cache("what is the time limit", "general") is True
+    assert cache.should_cache("what is my score", "general") is False
+    assert cache.should_cache("show me the rules", "general") is False
+    print("✓ PASS | Personal keywords match whole words only")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RESPONSE CACHE - TEST SUITE")
+    print("=" * 60)
+    test_lru_eviction_by_entries()
+    test_byte_budget()
+    test_expiry_and_cleanup()
+    test_background_sweeper()
+    test_overwrite_keeps_accounting()
+    test_shared_keyspace_across_students()
+    test_student_specific_answers_stay_private()
+    test_personal_keywords_match_whole_words()
@@ -0,0 +1,78 @@
+"""
+Test script for SemanticCache and its use by ResponseCache
+Uses synthetic embeddings (no model download required)
+"""
+import time
+
+import numpy as np
+
+from response_cache import ResponseCache
+from semantic_cache import SemanticCache
+
+DIMENSION = 8
+
+
+def vector(*components):
+    """Embedding with the given leading components"""
+    v = np.zeros(DIMENSION, dtype=np.float32)
+    v[:len(components)] = components
+    return v
+
+
+def test_paraphrase_hits_above_threshold():
+    cache = SemanticCache(dimension=DIMENSION, threshold=0.9)
+    cache.add("how to start test?", vector(1, 0.1), "help", {"message": "Click Start."})
+    match = cache.lookup("how do I begin a test", vector(1, 0.2), "help")
+    assert match is not None and match[0]["message"] == "Click Start."
+    assert cache.lookup("what is verbal ability", vector(0.2, 1), "help") is None
+    print(f"✓ PASS | Paraphrase served from cache (similarity {match[1]:.3f})")
+
+
+def test_query_type_and_number_guards():
+    cache = SemanticCache(dimension=DIMENSION, threshold=0.9)
+    cache.add("what is module 2 about", vector(1), "general", {"message": "Module 2 covers..."})
+    assert cache.lookup("what is module 3 about", vector(1), "general") is None
+    assert cache.lookup("what is module 2", vector(1), "help") is None
+    assert cache.lookup("explain module 2", vector(1), "general") is not None
+    assert cache.get_stats()["guard_rejections"] == 2
+    print("✓ PASS | query_type and number guards reject near-duplicates with different answers")
+
+
+def test_ttl_and_slot_reuse():
+    cache = SemanticCache(dimension=DIMENSION, threshold=0.9, ttl_seconds=0.05, max_entries=2)
+    cache.add("a", vector(1), "help", {"message": "a"})
+    time.sleep(0.06)
+    assert cache.lookup("a", vector(1), "help") is None
+    assert cache.cleanup_expired() == 1
+
+    cache.ttl = 60
+    cache.add("a", vector(1), "help", {"message": "a"})
+    cache.add("b", vector(0, 1), "help", {"message": "b"})
+    cache.add("c", vector(0, 0, 1), "help", {"message": "c"})  # replaces the oldest entry
+    assert cache.lookup("a", vector(1), "help") is None
+    assert cache.lookup("c", vector(0, 0, 1), "help") is not None
+    assert cache.get_stats()["size"] == 2
+    print("✓ PASS | Expired entries are skipped and the oldest slot is reused when full")
+
+
+def test_response_cache_semantic_fallback():
+    semantic = SemanticCache(dimension=DIMENSION, threshold=0.9)
+    cache = ResponseCache(semantic_cache=semantic)
+    cache.set("how to start test?", 1, {"message": "Hi Asha, click Start."}, "help",
+              student_name="Asha", query_embedding=vector(1, 0.1))
+
+    cached = cache.get("how do I begin a test", 2, "help", student_name="Ben", query_embedding=vector(1, 0.15))
+    assert cached["message"] == "Hi Ben, click Start."
+    assert cache.get("how do I begin a test", 2, "help", student_name="Ben") is None, "no embedding, no semantic lookup"
+    assert cache.get_stats()["semantic_hits"] == 1
+    print("✓ PASS | ResponseCache falls back to the semantic index for shared query types")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SEMANTIC CACHE - TEST SUITE")
+    print("=" * 60)
+    test_paraphrase_hits_above_threshold()
+    test_query_type_and_number_guards()
+    test_ttl_and_slot_reuse()
+    test_response_cache_semantic_fallback()
@@ -0,0 +1,84 @@
+"""
+Test script for SingleFlight request coalescing
+"""
+import asyncio
+
+import pytest
+
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"message": "Click Start."}
+
+    async def run():
+        return await asyncio.gather(*(flights.do("how to start", upstream) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"message": "Click Start."} for result, _ in results)
+    assert sum(coalesced for _, coalesced in results) == 19
+    stats = flights.get_stats()
+    assert stats["leaders"] == 1 and stats["coalesced"] == 19 and stats["in_flight"] == 0
+    print(f"✓ PASS | 20 concurrent identical calls -> 1 upstream call ({stats['coalesced_rate']:.0f}% coalesced)")
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flights = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def run():
+        await asyncio.gather(flights.do("a", upstream), flights.do("b", upstream))
+        await flights.do("a", upstream)
+
+    asyncio.run(run())
+    assert len(calls) == 3, "completed calls are not cached"
+    print("✓ PASS | Only calls in flight at the same time are coalesced")
+
+
+def test_leader_failure_reaches_waiters():
+    flights = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flights.do("q", upstream) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.get_stats()["failures"] == 1 and flights.get_stats()["in_flight"] == 0
+
+    with pytest.raises(ValueError):
+        asyncio.run(flights.do("q", upstream))
+    print("✓ PASS | Leader errors are delivered to every waiter and the key is released")
+
+
+def test_flight_key_follows_cacheability():
+    cache = ResponseCache()
+    assert cache.flight_key("How to start?", 1, "help") == cache.flight_key("how to start? ", 2, "help")
+    assert cache.flight_key("what is next", 1, "assessments") != cache.flight_key("what is next", 2, "assessments")
+    print("✓ PASS | Shared query types coalesce across students, others only per student")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SINGLE-FLIGHT COALESCING - TEST SUITE")
+    print("=" * 60)
+    test_concurrent_calls_share_one_execution()
+    test_different_keys_and_later_calls_run_separately()
+    test_leader_failure_reaches_waiters()
+    test_flight_key_follows_cacheability()
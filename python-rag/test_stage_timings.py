@@ -0,0 +1,116 @@
+"""
+Test script for the concurrent pre-LLM stages of /chat
+The student context fetch and retrieval run side by side, each bounded by its own timeout
+"""
+import asyncio
+import time
+
+from context_handler import ContextHandler, empty_student_context
+from stage_timings import StageTimings
+
+CONTEXT = {'student_info': {'name': 'Asha'}, 'available_assessments': [], 'completed_assessments': [],
+           'performance_summary': {}}
+
+
+class SlowVectorStore:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.searches = 0
+
+    async def embed_query_async(self, query):
+        await asyncio.sleep(self.delay)
+        return [1.0, 0.0]
+
+    def search(self, query, n_results=3, query_embedding=None):
+        self.searches += 1
+        time.sleep(self.delay)
+        return {'documents': [["Practice daily."]]}
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def call_with_fallback(self, messages, strategy="sequential"):
+        self.prompts.append(messages)
+        return {"choices": [{"message": {"content": "LLM answer"}}], "model_used": "fake/model"}
+
+
+async def slow_context(delay):
+    await asyncio.sleep(delay)
+    return CONTEXT
+
+
+def test_timeout_degrades_but_work_completes():
+    async def scenario():
+        timings = StageTimings()
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            finished.append(True)
+            return CONTEXT
+
+        result = await timings.run("context", slow(), timeout=0.02, default=empty_student_context())
+        assert result == empty_student_context() and timings.degraded == ["context"]
+        await asyncio.sleep(0.15)
+        assert finished == [True]  # shielded: the load still fills its cache
+        assert await timings.run("retrieval", asyncio.sleep(0, result="docs"), timeout=0) == "docs"
+
+        async def broken():
+            raise RuntimeError("database down")
+        assert await timings.run("history", broken(), default="fallback") == "fallback"
+        return timings.as_dict()
+
+    timings = asyncio.run(scenario())
+    assert timings['degraded'] == ["context", "history"] and 15 <= timings['context_ms'] < 50
+    assert set(timings) == {'context_ms', 'retrieval_ms', 'history_ms', 'total_ms', 'degraded'}
+    print("✓ PASS | Late or failing stages return their default and are listed as degraded")
+
+
+def test_context_and_retrieval_overlap():
+    store = SlowVectorStore(delay=0.1)
+    handler = ContextHandler(openrouter_client=None, vector_store=store, async_openrouter_client=FakeLLM())
+    timings = StageTimings()
+
+    async def scenario():
+        with timings.measure("prefetch"):
+            return await asyncio.gather(
+                timings.run("context", slow_context(0.2), 1.0, empty_student_context()),
+                timings.run("retrieval", handler.prefetch_async("explain recursion", "general", timings=timings), 1.0)
+            )
+
+    student_context, prefetched = asyncio.run(scenario())
+    stages = timings.as_dict()
+    assert student_context == CONTEXT and prefetched == ([1.0, 0.0], None, ["Practice daily."])
+    # embed (0.1s) + search (0.1s) overlap the 0.2s context fetch instead of adding to it
+    assert stages['retrieval_ms'] >= 190 and stages['context_ms'] >= 190
+    assert stages['prefetch_ms'] < 300 and stages['embed_ms'] >= 90 and stages['search_ms'] >= 90
+    print(f"✓ PASS | Context and retrieval ran concurrently ({stages['prefetch_ms']:.0f} ms instead of "
+          f"{stages['context_ms'] + stages['retrieval_ms']:.0f} ms)")
+
+
+def test_prefetched_results_are_used():
+    store = SlowVectorStore()
+    llm = FakeLLM()
+    handler = ContextHandler(openrouter_client=None, vector_store=store, async_openrouter_client=llm)
+    # Templated query types need no retrieval
+    assert asyncio.run(handler.prefetch_async("hi", "greeting")) is None
+
+    timings = StageTimings()
+    message, _, query_type, model_used = asyncio.run(handler.process_query_async(
+        1, "explain recursion", CONTEXT, prefetched=([1.0, 0.0], None, ["Timed-out search is skipped."]),
+        timings=timings))
+    assert (message, query_type, model_used) == ("LLM answer", "general", "fake/model")
+    assert store.searches == 0 and "Timed-out search is skipped." in str(llm.prompts[0])
+    assert 'llm_ms' in timings.as_dict()
+    print("✓ PASS | process_query_async answers from the prefetched documents without searching again")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CHAT STAGE TIMINGS - TEST SUITE")
+    print("=" * 60)
+    test_timeout_degrades_but_work_completes()
+    test_context_and_retrieval_overlap()
+    test_prefetched_results_are_used()
@@ -0,0 +1,115 @@
+"""
+Test script for StudentContextCache
+Checks TTL, LRU eviction, invalidation and load coalescing with an in-memory loader
+"""
+import asyncio
+import time
+
+from student_context_cache import StudentContextCache
+
+
+def make_loader(delay: float = 0.0):
+    """Loader that records every database load it would have made"""
+    calls = []
+
+    async def loader(student_id: int):
+        calls.append(student_id)
+        await asyncio.sleep(delay)
+        return {"student_info": {"id": student_id}, "load": len(calls)}
+
+    return loader, calls
+
+
+def test_hit_after_first_load():
+    cache = StudentContextCache(ttl_seconds=60)
+    loader, calls = make_loader()
+
+    async def run():
+        for _ in range(5):
+            await cache.get_or_load(1, loader)
+
+    asyncio.run(run())
+    assert calls == [1]
+    assert cache.get_stats()["hits"] == 4
+    print("✓ PASS | Five messages from one student hit the database once")
+
+
+def test_ttl_expiry():
+    cache = StudentContextCache(ttl_seconds=0.05)
+    cache.set(1, {"load": 1})
+    assert cache.get(1) is not None
+    time.sleep(0.06)
+    assert cache.get(1) is None
+    print("✓ PASS | Entries expire after the TTL")
+
+
+def test_lru_eviction():
+    cache = StudentContextCache(max_entries=2)
+    cache.set(1, {})
+    cache.set(2, {})
+    cache.get(1)  # 1 is now most recently used
+    cache.set(3, {})
+    assert cache.get(2) is None and cache.get(1) is not None and cache.get(3) is not None
+    assert cache.get_stats()["evictions"] == 1
+    print("✓ PASS | Least recently used student is evicted")
+
+
+def test_invalidation_and_refresh():
+    cache = StudentContextCache()
+    loader, calls = make_loader()
+
+    async def run():
+        await cache.get_or_load(1, loader)
+        await cache.get_or_load(2, loader)
+        assert cache.invalidate(1) is True
+        await cache.get_or_load(1, loader)
+        refreshed = await cache.refresh(2, loader)
+        assert refreshed["load"] == 4
+        assert cache.invalidate_all() == 2
+
+    asyncio.run(run())
+    assert calls == [1, 2, 1, 2]
+    assert cache.get_stats()["size"] == 0
+    print("✓ PASS | Invalidation and refresh reload from the database")
+
+
+def test_concurrent_misses_share_one_load():
+    cache = StudentContextCache()
+    loader, calls = make_loader(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load(1, loader) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    print("✓ PASS | Concurrent misses for one student share a single load")
+
+
+def test_load_started_before_invalidation_is_not_cached():
+    cache = StudentContextCache()
+    loader, calls = make_loader(delay=0.05)
+
+    async def run():
+        stale = asyncio.ensure_future(cache.get_or_load(1, loader))
+        await asyncio.sleep(0.01)
+        cache.invalidate(1)  # student submitted an assessment mid-load
+        await stale
+        assert cache.get(1) is None
+        fresh = await cache.get_or_load(1, loader)
+        assert fresh["load"] == 2
+
+    asyncio.run(run())
+    print("✓ PASS | A load that raced an invalidation is not written back")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("STUDENT CONTEXT CACHE - TEST SUITE")
+    print("=" * 60)
+    test_hit_after_first_load()
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_invalidation_and_refresh()
+    test_concurrent_misses_share_one_load()
+    test_load_started_before_invalidation_is_not_cached()
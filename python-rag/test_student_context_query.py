@@ -0,0 +1,92 @@
+"""
+Test script for the single round-trip student context query
+Uses fake pooled connections (no database required) to check result mapping and prepared-statement mode
+"""
+from db_pool import PostgresPool
+from knowledge_sync import KnowledgeSync, STUDENT_CONTEXT_STATEMENT
+
+ROW = (
+    {"id": 7, "name": "Asha", "email": "asha@college.edu"},
+    [{"id": 3, "title": "Aptitude Test", "description": None, "category": "Aptitude", "total_time": 30}],
+    [{"assessment_id": 1, "title": "Logical Test", "category": "Logical", "score": 40, "total": 50,
+      "percentage": 80.0, "status": "pass", "completed_at": "2025-10-01T10:00:00.000000Z"}],
+    {"total_completed": 1, "average_percentage": 80.0, "highest_score": 80.0, "lowest_score": 80.0,
+     "passed_count": 1, "failed_count": 0}
+)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql.strip().split()[0])
+
+    def fetchone(self):
+        return self.conn.row
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return 0
+
+    def close(self):
+        self.closed = 1
+
+
+def make_sync(row=ROW, **kwargs):
+    opened = []
+
+    def fake_connect(**_):
+        opened.append(FakeConnection(row))
+        return opened[-1]
+
+    pool = PostgresPool("localhost", "5432", "postgres", "postgres", "secret", connect=fake_connect)
+    return KnowledgeSync("localhost", "5432", "postgres", "postgres", "secret", pool=pool, **kwargs), opened
+
+
+def test_single_round_trip():
+    sync, opened = make_sync()
+    context = sync.get_student_context(7)
+    assert opened[0].executed == ["WITH"], opened[0].executed
+    assert context["student_info"]["name"] == "Asha"
+    assert context["available_assessments"][0]["total_time"] == 30
+    assert context["performance_summary"]["passed_count"] == 1
+    print("✓ PASS | Whole context fetched with one query")
+
+
+def test_no_completed_assessments():
+    summary = {"total_completed": 0, "average_percentage": None, "highest_score": None,
+               "lowest_score": None, "passed_count": 0, "failed_count": 0}
+    sync, _ = make_sync((None, [], [], summary))
+    context = sync.get_student_context(99)
+    assert "student_info" not in context
+    assert context["performance_summary"] == {"total_completed": 0, "message": "No assessments completed yet"}
+    print("✓ PASS | Unknown student and empty history keep the old context shape")
+
+
+def test_prepared_statement_prepared_once_per_connection():
+    sync, opened = make_sync(use_prepared_statements=True)
+    for _ in range(3):
+        sync.get_student_context(7)
+    assert opened[0].executed == ["PREPARE", "EXECUTE", "EXECUTE", "EXECUTE"], opened[0].executed
+    assert sync.pool.session(opened[0])[STUDENT_CONTEXT_STATEMENT] is True
+    print("✓ PASS | Prepared statement created once and reused on the pooled connection")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("STUDENT CONTEXT QUERY - TEST SUITE")
+    print("=" * 60)
+    test_single_round_trip()
+    test_no_completed_assessments()
+    test_prepared_statement_prepared_once_per_connection()
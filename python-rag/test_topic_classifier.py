@@ -0,0 +1,147 @@
+"""
+Test script for the embedding topic pre-filter
+Uses synthetic embeddings (no model download required): each label lives on its own axis
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from context_handler import ContextHandler, TOPIC_FILTER_MODEL
+from topic_classifier import TopicClassifier
+
+DIMENSION = 8
+AXES = {"assessments": 0, "preparation": 1, "entertainment": 2, "sports": 3, "unclear": 4}
+
+CONTEXT = {
+    'student_info': {'name': 'Asha'},
+    'available_assessments': [{'title': 'Aptitude Test'}],
+    'completed_assessments': [],
+    'performance_summary': {}
+}
+
+
+def vector(label, weight=0.0, towards=None):
+    v = np.zeros(DIMENSION, dtype=np.float32)
+    v[AXES[label]] = 1.0
+    if towards is not None:
+        v[AXES[towards]] = weight
+    return v
+
+
+def trained(**kwargs):
+    """Three noisy examples per label (noise on an axis no label uses)"""
+    labels, embeddings = [], []
+    for label in AXES:
+        for i in range(3):
+            example = vector(label)
+            example[DIMENSION - 1] = 0.1 * i
+            labels.append(label)
+            embeddings.append(example)
+    return TopicClassifier(**kwargs).fit(embeddings, labels)
+
+
+class FakeVectorStore:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.searched_with = []
+
+    async def embed_query_async(self, query):
+        return self.embeddings[query].tolist()
+
+    def embed_query(self, query):
+        return self.embeddings[query].tolist()
+
+    def search(self, query, n_results=3, query_embedding=None):
+        self.searched_with.append(query_embedding)
+        return {'documents': [["Practice daily."]]}
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def call_with_fallback(self, messages, strategy="sequential"):
+        self.calls += 1
+        return {"choices": [{"message": {"content": "LLM answer"}}], "model_used": "fake/model"}
+
+    async def stream_with_fallback(self, messages):
+        self.calls += 1
+        yield "fake/model", "LLM answer"
+
+
+def handler(embeddings, classifier):
+    llm = FakeLLM()
+    store = FakeVectorStore(embeddings)
+    return ContextHandler(openrouter_client=None, vector_store=store, async_openrouter_client=llm,
+                          topic_filter=classifier), llm, store
+
+
+def test_nearest_centroid_decisions():
+    classifier = trained(min_similarity=0.6, min_margin=0.1)
+    assert classifier.predict(vector("sports"))[0] == "sports"
+    assert classifier.decide(vector("sports")) == ("off_topic", "sports", pytest.approx(1.0, abs=0.01))
+    assert classifier.decide(vector("unclear"))[:2] == ("unclear", "unclear")
+    assert classifier.decide(vector("assessments")) is None
+    # Halfway between an off-topic and an on-topic centroid: not confident enough to skip the LLM
+    assert classifier.decide(vector("entertainment", 0.9, "preparation")) is None
+    stats = classifier.get_stats()
+    assert stats['decisions'] == 4 and stats['off_topic'] == 1 and stats['unclear'] == 1
+    assert stats['mean_decide_us'] < 1000
+    print(f"✓ PASS | Off-topic/unclear centroids short-circuit ({stats['mean_decide_us']} us per decision)")
+
+
+def test_untrained_or_one_sided_training():
+    assert TopicClassifier().decide(vector("sports")) is None
+    with pytest.raises(ValueError):
+        TopicClassifier().fit([vector("sports"), vector("entertainment")], ["sports", "entertainment"])
+    print("✓ PASS | Untrained filter passes everything through; one-sided training is rejected")
+
+
+def test_off_topic_query_skips_llm():
+    context_handler, llm, store = handler({"who won yesterday": vector("sports")}, trained())
+    message, data, query_type, model_used = asyncio.run(
+        context_handler.process_query_async(1, "who won yesterday", CONTEXT))
+    assert llm.calls == 0 and store.searched_with == []
+    assert model_used == TOPIC_FILTER_MODEL and query_type == "off_topic"
+    assert data['category'] == "sports" and "Asha" in message and "Sports are fun" in message
+    print("✓ PASS | Off-topic query answered from the redirect template without an LLM call")
+
+
+def test_on_topic_query_reuses_embedding():
+    embedding = vector("preparation")
+    context_handler, llm, store = handler({"explain recursion": embedding}, trained())
+    message, _, query_type, model_used = asyncio.run(
+        context_handler.process_query_async(1, "explain recursion", CONTEXT))
+    assert llm.calls == 1 and message == "LLM answer" and model_used == "fake/model"
+    assert store.searched_with == [embedding.tolist()]
+    print("✓ PASS | On-topic query goes to the LLM; vector search reuses the pre-filter embedding")
+
+
+def test_stream_clarification_and_keyword_types():
+    context_handler, llm, _ = handler({"hmm": vector("unclear"), "show my results": vector("unclear"),
+                                       "how to use the portal": vector("unclear")}, trained())
+
+    async def collect(query):
+        return [event async for event in context_handler.stream_query_async(1, query, CONTEXT)]
+
+    events = asyncio.run(collect("hmm"))
+    assert llm.calls == 0 and events[-1]['query_type'] == "unclear_redirect"
+    assert events[0]['content'].startswith("Hi Asha! I understand you're asking about")
+    # Keyword types outside TOPIC_FILTER_QUERY_TYPES are never overruled
+    events = asyncio.run(collect("show my results"))
+    assert llm.calls == 1 and events[-1]['model_used'] == "fake/model"
+    events = asyncio.run(collect("how to use the portal"))
+    assert events[-1]['query_type'] == "help" and llm.calls == 2
+    print("✓ PASS | Streaming sends the clarification template; results and help queries are not filtered")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TOPIC PRE-FILTER - TEST SUITE")
+    print("=" * 60)
+    test_nearest_centroid_decisions()
+    test_untrained_or_one_sided_training()
+    test_off_topic_query_skips_llm()
+    test_on_topic_query_reuses_embedding()
+    test_stream_clarification_and_keyword_types()
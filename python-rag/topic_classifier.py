@@ -0,0 +1,133 @@
+"""
+Embedding Topic Pre-filter
+Nearest-centroid classifier over query embeddings (on-topic categories, off-topic categories and
+unclear queries, trained from a small labelled file) so junk queries are answered without an LLM call
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Labels answered from IntelligentCutoff templates; every other label is on-topic
+OFF_TOPIC_LABELS = ("entertainment", "personal", "sports", "random")
+UNCLEAR_LABEL = "unclear"
+
+
+def load_labelled_queries(path: str) -> List[Dict[str, str]]:
+    """JSONL of {"query": ..., "label": ...}"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class TopicClassifier:
+    """
+    One L2-normalised centroid per label; a decision is a single matrix-vector product
+    decide(embedding) short-circuits only when the nearest centroid is off-topic or unclear,
+    its similarity is at least min_similarity and it beats the nearest on-topic centroid by at
+    least min_margin - anything else goes to the LLM as before
+    """
+
+    def __init__(self, min_similarity: float = 0.5, min_margin: float = 0.05):
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.labels: List[str] = []
+        self.examples = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._on_topic: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.decisions = 0
+        self.off_topic = 0
+        self.unclear = 0
+        self.decide_seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._centroids is not None
+
+    def fit(self, embeddings, labels: Sequence[str]) -> "TopicClassifier":
+        """Centroids from example embeddings (rows) and their labels"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        labels = list(labels)
+        names = sorted(set(labels))
+        if not any(name in OFF_TOPIC_LABELS or name == UNCLEAR_LABEL for name in names) \
+                or all(name in OFF_TOPIC_LABELS or name == UNCLEAR_LABEL for name in names):
+            raise ValueError("Training data needs on-topic and off-topic/unclear examples")
+
+        centroids = np.stack([vectors[[i for i, label in enumerate(labels) if label == name]].mean(axis=0)
+                              for name in names])
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.labels = names
+        self.examples = len(labels)
+        self._on_topic = np.array([name not in OFF_TOPIC_LABELS and name != UNCLEAR_LABEL for name in names])
+        self._centroids = centroids
+        logger.info(f"Topic classifier trained: {len(names)} labels from {len(labels)} examples")
+        return self
+
+    def fit_file(self, path: str, encode: Callable[[List[str]], Any]) -> "TopicClassifier":
+        """Train from a labelled JSONL file; encode(texts) -> embeddings (the service's embedder)"""
+        rows = load_labelled_queries(path)
+        return self.fit(encode([normalize_query(row['query']) for row in rows]), [row['label'] for row in rows])
+
+    def predict(self, embedding) -> Tuple[str, float, float]:
+        """
+        Nearest label, its cosine similarity and its margin over the best centroid on the other
+        side (on-topic vs off-topic/unclear)
+        """
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        scores = self._centroids @ (vector / norm if norm else vector)
+        best = int(np.argmax(scores))
+        other = scores[self._on_topic != self._on_topic[best]]
+        return self.labels[best], float(scores[best]), float(scores[best] - other.max())
+
+    def decide(self, embedding) -> Optional[Tuple[str, str, float]]:
+        """
+        ("off_topic", category, similarity), ("unclear", "unclear", similarity) or None
+        (None also while untrained)
+        """
+        if not self.ready:
+            return None
+        start = time.perf_counter()
+        label, similarity, margin = self.predict(embedding)
+        decision = None
+        if label in OFF_TOPIC_LABELS or label == UNCLEAR_LABEL:
+            if similarity >= self.min_similarity and margin >= self.min_margin:
+                decision = ("unclear" if label == UNCLEAR_LABEL else "off_topic", label, similarity)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.decisions += 1
+            self.decide_seconds += elapsed
+            if decision is not None:
+                if decision[0] == "unclear":
+                    self.unclear += 1
+                else:
+                    self.off_topic += 1
+        return decision
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            short_circuited = self.off_topic + self.unclear
+            return {
+                'ready': self.ready,
+                'labels': self.labels,
+                'examples': self.examples,
+                'min_similarity': self.min_similarity,
+                'min_margin': self.min_margin,
+                'decisions': self.decisions,
+                'off_topic': self.off_topic,
+                'unclear': self.unclear,
+                'llm_calls_avoided_rate': (short_circuited / self.decisions) * 100 if self.decisions else 0.0,
+                'mean_decide_us': round(self.decide_seconds / self.decisions * 1e6, 1) if self.decisions else 0.0
+            }
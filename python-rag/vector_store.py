@@ -4,77 +4,188 @@ Handles document embeddings and semantic search
 """
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import logging
+import os
 from typing import List, Dict, Any
 
+from batching_embedder import BatchingEmbedder
+from embedder import Embedder, create_embedder
+from embedding_cache import EmbeddingCache, normalize_query
+from index_manifest import IndexManifest, document_hash
+
 logger = logging.getLogger(__name__)
 
+COLLECTION_NAME = "placement_knowledge"
+MANIFEST_FILE = "index_manifest.json"
+
 class VectorStore:
-    def __init__(self, persist_directory="./chroma_db"):
+    def __init__(self, persist_directory="./chroma_db", persistent=True, embed_batch_size=32, embed_max_wait_ms=5.0,
+                 embed_cache_max_entries=10000, embed_cache_max_bytes=16 * 1024 * 1024, embedder: Embedder = None):
         """
         Initialize ChromaDB vector store with sentence transformer embeddings
+        persistent: Reopen the on-disk index in persist_directory and verify it against its manifest
+                    (otherwise an in-memory collection that is empty after every restart)
+        embedder: Embedding backend (default: create_embedder(), i.e. EMBEDDING_BACKEND)
+        Query encodes go through a BatchingEmbedder worker thread (embed_batch_size, embed_max_wait_ms)
+        and are cached per normalized query (embed_cache_max_entries, embed_cache_max_bytes)
         """
         try:
-            self.client = chromadb.Client(Settings(
-                persist_directory=persist_directory,
-                anonymized_telemetry=False
-            ))
+            self.manifest = None
+            self.index_state = "memory"
+            if persistent:
+                self.client = chromadb.PersistentClient(
+                    path=persist_directory,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+                self.manifest = IndexManifest(os.path.join(persist_directory, MANIFEST_FILE))
+            else:
+                self.client = chromadb.Client(Settings(anonymized_telemetry=False))
             
-            # Use all-MiniLM-L6-v2 for efficient sentence embeddings
-            logger.info("Loading sentence transformer model...")
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            # all-MiniLM-L6-v2 for efficient sentence embeddings (PyTorch or ONNX Runtime)
+            self.embedding_model = embedder or create_embedder()
+            self.embedder = BatchingEmbedder(
+                lambda texts: self.embedding_model.encode(texts, normalize=True, batch_size=len(texts)),
+                max_batch_size=embed_batch_size,
+                max_wait_ms=embed_max_wait_ms,
+                name="query-embedder"
+            )
+            self.query_embeddings = EmbeddingCache(
+                max_entries=embed_cache_max_entries,
+                max_bytes=embed_cache_max_bytes
+            )
             
             # Get or create collection
             self.collection = self.client.get_or_create_collection(
-                name="placement_knowledge",
+                name=COLLECTION_NAME,
                 metadata={"hnsw:space": "cosine"}
             )
+            if self.manifest is not None:
+                self._verify_index()
             
-            logger.info(f"Vector store initialized. Collection size: {self.collection.count()}")
+            logger.info(f"Vector store initialized ({self.index_state}). Collection size: {self.collection.count()}")
             
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {e}")
             raise
     
-    def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+    def _verify_index(self):
+        """
+        Check the reopened index against its manifest
+        - Same model, dimension and collection: reuse it as is (no re-embedding)
+        - Different model or no manifest for a non-empty index: vectors are not comparable, start empty
+        - Manifest and collection disagree (interrupted write): drop entries only one side knows about
+        """
+        model, dimension = self.embedding_model.name, self.embedding_model.dimension
+        loaded = self.manifest.load()
+        count = self.collection.count()
+        
+        if loaded and not self.manifest.matches(model, dimension, COLLECTION_NAME):
+            logger.warning(f"Index was built with {self.manifest.embedding_model} ({self.manifest.dimension}d), "
+                           f"now using {model} ({dimension}d); rebuilding")
+            self.clear_collection()
+            self.index_state = "rebuilt"
+        elif not loaded:
+            if count:
+                logger.warning(f"Index has {count} documents but no manifest; rebuilding")
+                self.clear_collection()
+                self.index_state = "rebuilt"
+            else:
+                self.manifest.reset(model, dimension, COLLECTION_NAME)
+                self.manifest.save()
+                self.index_state = "new"
+        elif count != len(self.manifest.documents):
+            stored_ids = set(self.document_ids())
+            untracked = [doc_id for doc_id in stored_ids if doc_id not in self.manifest.documents]
+            if untracked:
+                self.collection.delete(ids=untracked)
+            self.manifest.forget([doc_id for doc_id in list(self.manifest.documents) if doc_id not in stored_ids])
+            self.manifest.save()
+            logger.warning(f"Index and manifest disagreed; {len(self.manifest.documents)} documents kept")
+            self.index_state = "reconciled"
+        else:
+            self.index_state = "reused"
+    
+    def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str],
+                      batch_size: int = 64) -> Dict[str, int]:
         """
-        Add documents to the vector store with embeddings
+        Add or update documents in the vector store with embeddings
+        Documents whose content hash matches the manifest are skipped, so re-running the
+        indexer only embeds what changed
         
         Args:
             documents: List of text documents to add
             metadatas: List of metadata dicts for each document
             ids: List of unique IDs for each document
+            batch_size: Documents encoded and upserted per batch (the manifest is saved after
+                        each batch, so an interrupted run resumes where it stopped)
+        
+        Returns:
+            {'embedded': n, 'unchanged': n}
         """
         try:
             if not documents:
                 logger.warning("No documents to add")
-                return
+                return {'embedded': 0, 'unchanged': 0}
             
-            logger.info(f"Generating embeddings for {len(documents)} documents...")
-            embeddings = self.embedding_model.encode(documents).tolist()
+            hashes = [document_hash(document, metadata) for document, metadata in zip(documents, metadatas)]
+            changed = self.manifest.changed(ids, hashes) if self.manifest is not None else list(range(len(ids)))
+            if not changed:
+                logger.info(f"All {len(documents)} documents unchanged, nothing to embed")
+                return {'embedded': 0, 'unchanged': len(documents)}
             
-            logger.info(f"Adding {len(documents)} documents to collection...")
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
+            logger.info(f"Generating embeddings for {len(changed)} documents (batches of {batch_size})...")
+            for start in range(0, len(changed), batch_size):
+                batch = changed[start:start + batch_size]
+                batch_documents = [documents[i] for i in batch]
+                batch_ids = [ids[i] for i in batch]
+                embeddings = self.embedding_model.encode(batch_documents, batch_size=batch_size).tolist()
+                self.collection.upsert(
+                    documents=batch_documents,
+                    embeddings=embeddings,
+                    metadatas=[metadatas[i] for i in batch],
+                    ids=batch_ids
+                )
+                if self.manifest is not None:
+                    self.manifest.record(batch_ids, [hashes[i] for i in batch])
+                    self.manifest.save()
             
-            logger.info(f"Successfully added {len(documents)} documents. Total: {self.collection.count()}")
+            logger.info(f"Successfully added {len(changed)} documents. Total: {self.collection.count()}")
+            return {'embedded': len(changed), 'unchanged': len(hashes) - len(changed)}
             
         except Exception as e:
             logger.error(f"Failed to add documents: {e}")
             raise
     
-    def search(self, query: str, n_results: int = 3) -> Dict[str, Any]:
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a single query (L2-normalised, so dot product equals cosine similarity)
+        Shared by vector search and the semantic response cache
+        Cached per normalized query; blocks the calling thread on a miss (async callers use embed_query_async)
+        """
+        key = normalize_query(query)
+        vector = self.query_embeddings.get(key)
+        if vector is None:
+            vector = self.query_embeddings.put(key, self.embedder.encode(key))
+        return vector.tolist()
+    
+    async def embed_query_async(self, query: str) -> List[float]:
+        """
+        Embed a single query on the batching worker without blocking the event loop
+        """
+        key = normalize_query(query)
+        vector = self.query_embeddings.get(key)
+        if vector is None:
+            vector = self.query_embeddings.put(key, await self.embedder.encode_async(key))
+        return vector.tolist()
+    
+    def search(self, query: str, n_results: int = 3, query_embedding: List[float] = None) -> Dict[str, Any]:
         """
         Search for relevant documents using semantic similarity
         
         Args:
             query: Search query text
             n_results: Number of results to return
+            query_embedding: Precomputed embedding of the query (skips encoding)
             
         Returns:
             Dictionary with 'documents', 'metadatas', 'distances', and 'ids'
@@ -83,11 +194,12 @@ class VectorStore:
             logger.info(f"Searching for: '{query}' (top {n_results} results)")
             
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query]).tolist()
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
             
             # Search in collection
             results = self.collection.query(
-                query_embeddings=query_embedding,
+                query_embeddings=[query_embedding],
                 n_results=n_results
             )
             
@@ -106,16 +218,42 @@ class VectorStore:
             logger.error(f"Search failed: {e}")
             return {'documents': [[]], 'metadatas': [[]], 'distances': [[]], 'ids': [[]]}
     
+    def document_ids(self, where: Dict[str, Any] = None) -> List[str]:
+        """
+        IDs of stored documents, optionally filtered by metadata (e.g. {'type': 'knowledge_base'})
+        """
+        return self.collection.get(where=where, include=[])['ids']
+    
+    def delete_documents(self, ids: List[str]) -> int:
+        """
+        Remove documents (and their manifest entries) by ID
+        """
+        if not ids:
+            return 0
+        try:
+            self.collection.delete(ids=ids)
+            if self.manifest is not None:
+                self.manifest.forget(ids)
+                self.manifest.save()
+            logger.info(f"Deleted {len(ids)} documents. Total: {self.collection.count()}")
+            return len(ids)
+        except Exception as e:
+            logger.error(f"Failed to delete documents: {e}")
+            raise
+    
     def clear_collection(self):
         """
         Clear all documents from the collection
         """
         try:
-            self.client.delete_collection(name="placement_knowledge")
+            self.client.delete_collection(name=COLLECTION_NAME)
             self.collection = self.client.create_collection(
-                name="placement_knowledge",
+                name=COLLECTION_NAME,
                 metadata={"hnsw:space": "cosine"}
             )
+            if self.manifest is not None:
+                self.manifest.reset(self.embedding_model.name, self.embedding_model.dimension, COLLECTION_NAME)
+                self.manifest.save()
             logger.info("Collection cleared successfully")
         except Exception as e:
             logger.error(f"Failed to clear collection: {e}")
@@ -129,11 +267,20 @@ class VectorStore:
             count = self.collection.count()
             return {
                 'total_documents': count,
-                'collection_name': 'placement_knowledge',
-                'embedding_model': 'all-MiniLM-L6-v2',
-                'embedding_dimension': 384
+                'collection_name': COLLECTION_NAME,
+                'index_state': self.index_state,
+                'tracked_documents': len(self.manifest.documents) if self.manifest is not None else None,
+                'embedding_model': self.embedding_model.name,
+                'embedding_dimension': self.embedding_model.dimension,
+                'embedder': self.embedder.get_stats(),
+                'query_embedding_cache': self.query_embeddings.get_stats()
             }
         except Exception as e:
             logger.error(f"Failed to get stats: {e}")
             return {}
-
+    
+    def close(self):
+        """
+        Stop the query embedding worker
+        """
+        self.embedder.close()
@@ -188,6 +188,7 @@
     
     // OpenRouter RAG Chatbot routes (OpenRouter AI)
     Route::post('/rag-chat', [\App\Http\Controllers\Student\OpenRouterChatbotController::class, 'chat'])->name('student.rag.chat');
+    Route::post('/rag-chat/stream', [\App\Http\Controllers\Student\OpenRouterChatbotController::class, 'chatStream'])->name('student.rag.chat.stream');
     Route::get('/rag-health', [\App\Http\Controllers\Student\OpenRouterChatbotController::class, 'health'])->name('student.rag.health');
     
     // Test route for chatbot mode verification